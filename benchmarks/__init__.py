@@ -0,0 +1,10 @@
+"""
+Benchmarks for build_digest.py
+
+Usage (from the repository root):
+    python -m benchmarks.generate -n 10000 -o big.txt   # Synthetic content file
+    python -m benchmarks.run                            # Time parse/render/write
+    python -m benchmarks.run --sizes 10 1000 1000000    # Custom item counts
+    python -m benchmarks.compare                        # Check for regressions
+    python -m benchmarks.escape                         # HTML escaping throughput
+"""
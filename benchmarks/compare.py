@@ -0,0 +1,131 @@
+"""
+Compare benchmark results against a baseline
+
+Flags any stage whose wall time, or any size whose peak RSS, grew by more than
+the threshold. Exits 1 when a regression is found, 2 when either file is
+missing.
+
+Timings only compare on one machine, so no results are committed (the inputs
+are: the sizes in benchmarks.run and the seeded generator). With --rev, the
+baseline is measured in the same run: the given commit is exported to a temp
+dir and benchmarked with this tree's harness and inputs, then the working
+tree is, and the two are compared.
+
+Usage:
+    python -m benchmarks.compare --rev main                    # main vs the working tree
+    python -m benchmarks.compare --rev HEAD~3 --sizes 10 1000
+    python -m benchmarks.compare                               # results.json vs baseline.json
+    python -m benchmarks.compare old.json new.json --threshold 0.2
+"""
+
+import io
+import sys
+import json
+import shutil
+import tarfile
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+ROOT = BENCH_DIR.parent
+BASELINE_PATH = BENCH_DIR / 'baseline.json'
+RESULTS_PATH = BENCH_DIR / 'results.json'
+
+# Differences below these are treated as noise regardless of ratio
+MIN_SECONDS = 0.005
+MIN_RSS_KB = 1024
+
+
+def compare(baseline, current, threshold=0.10):
+    """Return (lines, regressions) describing current vs baseline results."""
+    base_by_size = {r['items']: r for r in baseline['results']}
+    lines = []
+    regressions = 0
+
+    def check(label, old, new, floor, fmt):
+        nonlocal regressions
+        if old is None or new is None:
+            return
+        ratio = new / old if old else float('inf')
+        flag = ''
+        if new - old > floor and ratio > 1 + threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        lines.append(f"  {label:<8} {fmt(old):>14} -> {fmt(new):>14}  {ratio:6.2f}x{flag}")
+
+    for result in current['results']:
+        base = base_by_size.get(result['items'])
+        if base is None:
+            continue
+        lines.append(f"{result['items']:,} items")
+        for stage, seconds in result['stages'].items():
+            check(stage, base['stages'].get(stage), seconds, MIN_SECONDS,
+                  lambda v: f'{v * 1000:.1f} ms')
+        check('rss', base.get('peak_rss_kb'), result.get('peak_rss_kb'), MIN_RSS_KB,
+              lambda v: f'{v:,} KiB')
+
+    return lines, regressions
+
+
+def export_rev(rev, dest):
+    """Write the tree of git revision `rev` to `dest`, with this tree's benchmarks package."""
+    archive = subprocess.run(['git', 'archive', '--format=tar', rev], cwd=ROOT,
+                             capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(dest)
+    shutil.rmtree(Path(dest) / 'benchmarks', ignore_errors=True)
+    shutil.copytree(BENCH_DIR, Path(dest) / 'benchmarks',
+                    ignore=shutil.ignore_patterns('__pycache__', '*.json'))
+
+
+def run_benchmarks(tree, output, sizes, workdir):
+    """Run benchmarks.run in `tree`, writing its results to `output`."""
+    print(f"Benchmarking {tree}", flush=True)
+    cmd = [sys.executable, '-m', 'benchmarks.run', '-o', str(output), '--workdir', str(workdir)]
+    subprocess.run(cmd + (['--sizes', *map(str, sizes)] if sizes else []), cwd=tree, check=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare benchmark results to a baseline')
+    parser.add_argument('baseline', nargs='?', default=str(BASELINE_PATH), help='Baseline results JSON')
+    parser.add_argument('current', nargs='?', default=str(RESULTS_PATH), help='Current results JSON')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Allowed fractional slowdown before flagging (default: 0.10)')
+    parser.add_argument('--rev', help='Measure this git revision and the working tree now, '
+                                      'writing the two result files, then compare them')
+    parser.add_argument('--sizes', type=int, nargs='+', help='Item counts for --rev (default: benchmarks.run\'s)')
+    args = parser.parse_args()
+
+    if args.rev:
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                export_rev(args.rev, Path(tmp) / 'tree')
+            except subprocess.CalledProcessError as e:
+                print(f"error: cannot export {args.rev}: {e.stderr.decode().strip()}", file=sys.stderr)
+                sys.exit(2)
+            inputs = Path(tmp) / 'inputs'   # generated once, read by both runs
+            run_benchmarks(Path(tmp) / 'tree', Path(args.baseline).resolve(), args.sizes, inputs)
+            run_benchmarks(ROOT, Path(args.current).resolve(), args.sizes, inputs)
+
+    loaded = []
+    for path, make in ((args.baseline, 'python -m benchmarks.compare --rev <commit>'),
+                       (args.current, f'python -m benchmarks.run -o {args.current}')):
+        try:
+            with open(path) as f:
+                loaded.append(json.load(f))
+        except FileNotFoundError:
+            print(f"error: {path} not found; create it with `{make}` "
+                  f"(see the notes at the top of benchmarks/compare.py)", file=sys.stderr)
+            sys.exit(2)
+    baseline, current = loaded
+
+    lines, regressions = compare(baseline, current, args.threshold)
+    print('\n'.join(lines))
+    print(f"\n{regressions} regression(s) over {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
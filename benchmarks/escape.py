@@ -0,0 +1,114 @@
+"""
+HTML escaping throughput microbenchmarks
+
+Compares build_digest.html_escape with the alternatives it was chosen over,
+on multi-megabyte summary text: dense (escapable characters throughout, as
+benchmarks.generate writes), clean (nothing to escape, like most real copy)
+and as many short summaries. Also times the per-build escape cache on
+repeated low-cardinality values (sources, dates).
+
+Usage:
+    python -m benchmarks.escape               # 8 MB of summaries
+    python -m benchmarks.escape --mb 32 -r 5
+"""
+
+import re
+import html
+import time
+import random
+import argparse
+
+import build_digest
+from benchmarks.generate import SOURCES, sentence
+
+ESCAPES = {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}
+_TABLE = str.maketrans(ESCAPES)
+_ESCAPABLE_RE = re.compile('[&<>"\']')
+
+
+def escape_translate(text):
+    """Single pass with str.translate."""
+    return text.translate(_TABLE)
+
+
+def escape_regex(text):
+    """Single pass with re.sub."""
+    return _ESCAPABLE_RE.sub(lambda m: ESCAPES[m.group()], text)
+
+
+def escape_replace(text):
+    """Unconditional chained str.replace."""
+    return (text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+            .replace('"', '&quot;').replace("'", '&#39;'))
+
+
+STRATEGIES = {
+    'html_escape': build_digest.html_escape,
+    'str.replace x5': escape_replace,
+    'str.translate': escape_translate,
+    're.sub': escape_regex,
+    'html.escape': html.escape,
+}
+
+
+def corpora(megabytes, seed=1):
+    """Return {name: list of strings} of roughly `megabytes` each."""
+    rng = random.Random(seed)
+    summaries = []
+    size = 0
+    while size < megabytes * 1_000_000:
+        summaries.append(sentence(rng, 40))
+        size += len(summaries[-1])
+    dense = ' '.join(summaries)
+    clean = _ESCAPABLE_RE.sub('', dense)
+    return {'dense': [dense], 'clean': [clean], 'summaries': summaries}
+
+
+def throughput(escape, texts, repeat):
+    """Return the best MB/s of `escape` over `texts`."""
+    size = sum(len(t) for t in texts)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            escape(text)
+        best = min(best, time.perf_counter() - start)
+    return size / best / 1e6
+
+
+def cache_throughput(values, repeat):
+    """Return (uncached, cached) values/s escaping repeated short strings."""
+    plain = cached = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for value in values:
+            build_digest.html_escape(value)
+        plain = min(plain, time.perf_counter() - start)
+
+        view = build_digest.EscapedSections({})
+        start = time.perf_counter()
+        for value in values:
+            view.cached(value)
+        cached = min(cached, time.perf_counter() - start)
+    return len(values) / plain, len(values) / cached
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTML escaping throughput')
+    parser.add_argument('--mb', type=float, default=8, help='Megabytes of text per corpus (default: 8)')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Runs per measurement, best kept')
+    args = parser.parse_args()
+
+    texts = corpora(args.mb)
+    print(f"{'strategy':<16}" + ''.join(f"{name:>14}" for name in texts) + '   (MB/s)')
+    for name, escape in STRATEGIES.items():
+        print(f"{name:<16}" + ''.join(f"{throughput(escape, t, args.repeat):>14,.0f}" for t in texts.values()))
+
+    rng = random.Random(2)
+    values = [rng.choice(SOURCES + ['Jan 20, 2026', 'Jan 21, 2026']) for _ in range(200_000)]
+    plain, cached = cache_throughput(values, args.repeat)
+    print(f"\nrepeated sources/dates: {plain:,.0f}/s uncached, {cached:,.0f}/s via the escape cache")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Synthetic digest content generator
+
+Writes valid structured content in the format consumed by build_digest.py, at
+any size. Output is deterministic for a given seed.
+
+Usage:
+    python -m benchmarks.generate -n 10000 -o big.txt
+    python -m benchmarks.generate -n 100 --subsections 5 --calendar 40 --grantees 12
+"""
+
+import sys
+import random
+import argparse
+
+# Low-cardinality values repeat across items, as they do in real digests
+SOURCES = ['Utility Dive', 'FERC', 'E&E News', 'Reuters', 'Canary Media',
+           'Heatmap', 'Department of Energy', 'RTO Insider', 'Latitude Media']
+TAGS = ['Nuclear', 'Data Center', 'Grid', 'Wind', 'Solar', 'Storage', 'Policy']
+SIGNIFICANCE = ['high', 'medium', 'low']
+SECTIONS = ['PUBLICATIONS', 'CONGRESSIONAL', 'BUSINESS', 'CHINA']
+
+# Includes characters that need HTML escaping
+WORDS = ('grid transmission <765-kV> interconnection "queue" capacity & load '
+         'FERC PJM MISO co-location tariff SMR\'s offshore wind permitting '
+         'data center storage >GW< reform docket').split()
+
+
+def sentence(rng, words):
+    """Return a pseudo-random sentence of `words` words."""
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def write_item(out, rng, n, summary_words):
+    """Write one ITEM: block."""
+    tags = ', '.join(rng.sample(TAGS, rng.randint(1, 3)))
+    out.write(
+        f'ITEM:\n'
+        f'tags: [{tags}]\n'
+        f'significance: {rng.choice(SIGNIFICANCE)}\n'
+        f'title: Item {n}: {sentence(rng, 8)}\n'
+        f'source: {rng.choice(SOURCES)}\n'
+        f'date: January {rng.randint(1, 28)}, 2026\n'
+        f'summary: {sentence(rng, summary_words)}\n'
+        f'url: https://example.com/news/{n}?ref=digest&id={n}\n\n'
+    )
+
+
+def generate(out, items=100, subsections=4, calendar=10, grantees=8,
+             summary_words=60, seed=0):
+    """Write a complete content document with `items` ITEM: blocks to `out`.
+
+    Half of the items go to ===NEWS=== (spread over `subsections`), the rest
+    are split across the other item sections.
+    """
+    rng = random.Random(seed)
+
+    out.write('===TOP_DEVELOPMENTS===\n')
+    for i in range(3):
+        out.write(f'- **Top story {i}** — {sentence(rng, 20)}\n')
+
+    news = (items + 1) // 2
+    out.write('\n===NEWS===\n')
+    n = 0
+    for s in range(subsections):
+        out.write(f'\n##SUBSECTION: Subsection {s + 1}\n\n')
+        for _ in range(news // subsections + (s < news % subsections)):
+            write_item(out, rng, n, summary_words)
+            n += 1
+
+    rest = items - news
+    for i, name in enumerate(SECTIONS):
+        out.write(f'\n==={name}===\n\n')
+        for _ in range(rest // len(SECTIONS) + (i < rest % len(SECTIONS))):
+            write_item(out, rng, n, summary_words)
+            n += 1
+
+    out.write('\n===MACRO_TRENDS===\n')
+    for _ in range(3):
+        out.write(f'**Trend.** {sentence(rng, 40)}\n\n')
+
+    out.write('===CALENDAR===\n| Date | Event | Significance |\n|------|-------|--------------|\n')
+    for i in range(calendar):
+        out.write(f'| Jan {i % 28 + 1} | {sentence(rng, 6)} | {sentence(rng, 10)} |\n')
+
+    out.write('\n===KEY_QUESTIONS===\n')
+    for _ in range(3):
+        out.write(f'- {sentence(rng, 12)}\n')
+
+    out.write('\n===GRANTEES===\n\n')
+    for i in range(grantees):
+        out.write(
+            f'ORG: Grantee {i} & Partners\n'
+            f'title: {sentence(rng, 8)}\n'
+            f'date: January {rng.randint(1, 28)}, 2026\n'
+            f'summary: {sentence(rng, summary_words // 2)}\n'
+            f'url: https://example.org/grantee/{i}\n\n'
+        )
+    out.write('NO_PUBLICATIONS: Org A, Org B, Org C\n')
+
+    out.write('\n===LIMITATIONS===\n')
+    for _ in range(3):
+        out.write(f'- {sentence(rng, 10)}\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic digest content')
+    parser.add_argument('-n', '--items', type=int, default=100, help='Total ITEM: blocks')
+    parser.add_argument('--subsections', type=int, default=4, help='##SUBSECTION: blocks in NEWS')
+    parser.add_argument('--calendar', type=int, default=10, help='Calendar table rows')
+    parser.add_argument('--grantees', type=int, default=8, help='ORG: blocks')
+    parser.add_argument('--summary-words', type=int, default=60, help='Words per item summary')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+    args = parser.parse_args()
+
+    kwargs = dict(items=args.items, subsections=args.subsections, calendar=args.calendar,
+                  grantees=args.grantees, summary_words=args.summary_words, seed=args.seed)
+    if args.output:
+        with open(args.output, 'w') as f:
+            generate(f, **kwargs)
+    else:
+        generate(sys.stdout, **kwargs)
+
+
+if __name__ == '__main__':
+    main()
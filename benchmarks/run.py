@@ -0,0 +1,139 @@
+"""
+Timed parse/render/write runs at increasing input sizes
+
+Each size is measured in a fresh interpreter so peak RSS reflects that size
+alone. Results (wall time per stage, peak RSS, input and output bytes) are
+written as JSON for benchmarks.compare.
+
+Usage:
+    python -m benchmarks.run                          # Default sizes
+    python -m benchmarks.run --sizes 10 1000 1000000  # Custom item counts
+    python -m benchmarks.run -o old.json              # Any results file
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+import build_digest
+from benchmarks.generate import generate
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+RESULTS_PATH = Path(__file__).parent / 'results.json'
+DATE = 'Jan 21, 2026'
+
+
+def peak_rss_kb():
+    """Return this process's peak resident set size in KiB (None if unavailable)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def measure(path):
+    """Time each build stage for one content file and return a result dict."""
+    stages = {}
+
+    start = time.perf_counter()
+    with open(path, 'r') as f:
+        sections = build_digest.parse_content(f)
+    for name in sections:
+        sections[name]  # sections parse lazily; parse them all here
+    stages['parse'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in build_digest.iter_digest(sections, DATE):
+        pass
+    stages['render'] = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = Path(tmp) / 'digest.html'
+        start = time.perf_counter()
+        with open(out_path, 'w') as out:
+            build_digest.render_digest(sections, out, DATE)
+        stages['write'] = time.perf_counter() - start
+        output_bytes = out_path.stat().st_size
+
+    rss = peak_rss_kb()
+
+    # Escaping throughput over the raw input, in bounded blocks
+    start = time.perf_counter()
+    with open(path, 'r') as f:
+        for block in iter(lambda: f.read(1 << 20), ''):
+            build_digest.html_escape(block)
+    stages['escape'] = time.perf_counter() - start
+
+    return {
+        'input_bytes': os.path.getsize(path),
+        'output_bytes': output_bytes,
+        'peak_rss_kb': rss,
+        'stages': stages,
+    }
+
+
+def run(sizes, workdir):
+    """Generate inputs for each size and measure each in a subprocess."""
+    results = []
+    for items in sizes:
+        path = Path(workdir) / f'content-{items}.txt'
+        if not path.exists():
+            with open(path, 'w') as f:
+                generate(f, items=items, subsections=max(1, min(items // 10, 20)),
+                         calendar=min(items, 200), grantees=min(items, 50))
+        proc = subprocess.run([sys.executable, '-m', 'benchmarks.run', '--worker', str(path)],
+                              capture_output=True, text=True, check=True,
+                              cwd=Path(__file__).parent.parent)
+        result = {'items': items, **json.loads(proc.stdout)}
+        results.append(result)
+        stages = result['stages']
+        print(f"{items:>9,} items  "
+              + '  '.join(f"{k} {v * 1000:9.1f} ms" for k, v in stages.items())
+              + f"  rss {result['peak_rss_kb'] or 0:>9,} KiB  out {result['output_bytes']:>13,} B",
+              flush=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark build_digest.py stages')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Item counts to benchmark')
+    parser.add_argument('-o', '--output', default=str(RESULTS_PATH), help='Results JSON file')
+    parser.add_argument('--workdir', help='Directory for generated inputs (default: temp dir)')
+    parser.add_argument('--worker', metavar='FILE', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        json.dump(measure(args.worker), sys.stdout)
+        return
+
+    if args.workdir:
+        os.makedirs(args.workdir, exist_ok=True)
+        results = run(args.sizes, args.workdir)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            results = run(args.sizes, tmp)
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
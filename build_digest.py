@@ -5,14 +5,57 @@ Build Digest - Converts structured content into branded HTML
 Usage:
     python build_digest.py content.txt              # Read from file
     python build_digest.py content.txt -o out.html  # Specify output
+    python build_digest.py content.txt -o -         # Write to stdout
     cat content.txt | python build_digest.py        # Read from stdin
+    python build_digest.py --batch archive/ -j 8    # Rebuild many files in parallel
+    python build_digest.py content.txt --profile    # Per-stage timings on stderr
+    python build_digest.py content.txt --watch      # Rebuild on every save
+    python build_digest.py content.txt --emit-model m.json   # Save the parsed model
+    python build_digest.py --model m.json -o out.html        # Render it, no parsing
+    python build_digest.py content.txt --repeats drop        # Leave out stories already sent
+    python build_digest.py content.txt --editions editions.json   # One file per audience
+    python build_digest.py archive latest           # Path of the most recent digest
+    python build_digest.py archive backfill -j 8    # Index items of digests built before models
+    python build_digest.py serve --port 8000        # Preview server
+    python build_digest.py merge a.txt b.txt -o content.txt  # Combine partial content files
+    python build_digest.py check-links content.txt  # Find dead item/grantee URLs
+    python build_digest.py search pjm co-location --since 2026-01-01   # Search past items
 """
 
+import io
+import os
+import mmap
+import json
+import random
 import sys
 import re
+import sqlite3
+import glob
+import gzip
+import lzma
+import time
+import hashlib
 import argparse
+import asyncio
+import shutil
+import ssl
+import stat
+import tempfile
+import threading
+import zlib
+from array import array
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
+from collections import namedtuple, Counter, OrderedDict
 from datetime import datetime
+from enum import Enum
+from functools import lru_cache, wraps
 from pathlib import Path
+from types import SimpleNamespace
+from html.parser import HTMLParser
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, urljoin, unquote, quote
 
 # =============================================================================
 # BRAND COLORS
@@ -41,33 +84,511 @@ TAG_COLORS = {
 }
 
 # =============================================================================
-# CONTENT PARSER
+# PROFILING
 # =============================================================================
-def parse_content(text):
-    """Parse the structured content format into a dictionary."""
-    sections = {}
+# Instrumentation is off unless a Profiler is installed (profile() or
+# --profile/--trace-json). When off, hot paths pay a single `is None` check.
+_profiler = None
+
+
+class Profiler:
+    """Collects timed stages and counters for one or more builds."""
+
+    def __init__(self):
+        self.start_ns = time.perf_counter_ns()
+        self.events = []     # (name, category, start_ns, duration_ns, self_ns)
+        self.counters = Counter()
+        self._stack = []     # child time accumulated by each open stage
+
+    @contextmanager
+    def stage(self, name, category='build'):
+        """Time the enclosed block as a stage; nested stages are excluded from self time."""
+        self._stack.append(0)
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter_ns() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += duration
+            self.events.append((name, category, start - self.start_ns, duration, duration - children))
+
+    def count(self, name, n=1):
+        """Add `n` to a named counter."""
+        self.counters[name] += n
+
+    def report(self):
+        """Return a human-readable table of stage timings and counters."""
+        totals = {}
+        for name, _, _, duration, self_ns in self.events:
+            calls, total, own = totals.get(name, (0, 0, 0))
+            totals[name] = (calls + 1, total + duration, own + self_ns)
+        wall = sum(event[4] for event in self.events) or 1  # all instrumented time
+
+        lines = [f"{'stage':<32} {'calls':>6} {'total ms':>10} {'self ms':>10} {'self %':>7}"]
+        for name, (calls, total, own) in sorted(totals.items(), key=lambda kv: -kv[1][2]):
+            lines.append(f"{name:<32} {calls:>6} {total / 1e6:>10.2f} {own / 1e6:>10.2f} "
+                         f"{100 * own / wall:>6.1f}%")
+        if self.counters:
+            lines.append('')
+            lines.append(f"{'counter':<32} {'value':>17}")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"{name:<32} {value:>17,}")
+
+        # Hit rates for every '<cache> hits' / '<cache> misses' counter pair
+        caches = sorted({name.rsplit(' ', 1)[0] for name in self.counters
+                         if name.endswith((' hits', ' misses'))})
+        if caches:
+            lines.append('')
+            lines.append(f"{'cache':<32} {'lookups':>9} {'hit rate':>9}")
+            for name in caches:
+                hits, misses = self.counters[f'{name} hits'], self.counters[f'{name} misses']
+                lines.append(f"{name:<32} {hits + misses:>9,} {100 * hits / (hits + misses):>8.1f}%")
+        return '\n'.join(lines)
+
+    def trace(self):
+        """Return the profile as a Chrome trace-event (about://tracing) document."""
+        pid = os.getpid()
+        events = [{'name': name, 'cat': category, 'ph': 'X', 'pid': pid, 'tid': 0,
+                   'ts': start / 1000, 'dur': duration / 1000}
+                  for name, category, start, duration, _ in self.events]
+        if self.counters:
+            end = max((e['ts'] + e['dur'] for e in events), default=0)
+            events.append({'name': 'counters', 'ph': 'C', 'pid': pid, 'tid': 0,
+                           'ts': end, 'args': dict(self.counters)})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+@contextmanager
+def profile():
+    """Profile builds run inside the block, yielding the Profiler.
+
+        with profile() as prof:
+            build_html(parse_content(text))
+        print(prof.report())
+    """
+    global _profiler
+    previous = _profiler
+    _profiler = prof = Profiler()
+    try:
+        yield prof
+    finally:
+        _profiler = previous
+
+
+def stage(name, category='build'):
+    """Time a block as a profiling stage; a no-op unless profiling is enabled."""
+    if _profiler is None:
+        return nullcontext()
+    return _profiler.stage(name, category)
+
 
-    # Split by section markers
-    section_pattern = r'===(\w+)==='
-    parts = re.split(section_pattern, text)
+# =============================================================================
+# CONTENT PARSER
+# =============================================================================
+# parse_content() only locates the ===SECTION=== markers, in one regex scan,
+# and returns a lazy mapping of section offsets into the input text. A
+# section is parsed on first access and memoized, so sections that are never
+# rendered (absent, cached, or left out of a partial edition) cost nothing.
+# Parsing runs tokenize() over the section's lines: each line is classified
+# into a typed event that the section's parser consumes in a single pass.
+SECTION = 'section'
+SUBSECTION = 'subsection'
+ITEM = 'item'
+ORG = 'org'
+NO_PUBS = 'no_pubs'
+FIELD = 'field'
+ROW = 'row'
+BULLET = 'bullet'
+TEXT = 'text'
+
+Token = namedtuple('Token', 'kind key value')
+
+FIELD_NAMES = ('tags', 'significance', 'title', 'source', 'date', 'summary', 'url')
+
+_SECTION_RE = re.compile(r'===(\w+)===')
+_ITEM_LINE_RE = re.compile(r'^\s*ITEM:\s*$', re.M)
+_ORG_LINE_RE = re.compile(r'^ORG:', re.M)
+_FIELD_RE = re.compile(r'(%s):(.*)' % '|'.join(FIELD_NAMES))
+
+
+def _classify(line):
+    """Classify one line of a structured section, or return None to skip it."""
+    line = line.rstrip()
+    stripped = line.lstrip()
+    if not stripped:
+        return None
+    if line.startswith('##SUBSECTION:'):
+        return Token(SUBSECTION, None, line[13:].strip())
+    if stripped == 'ITEM:':
+        return Token(ITEM, None, None)
+    if line.startswith('ORG:'):
+        return Token(ORG, None, line[4:].strip())
+    if line.startswith('NO_PUBLICATIONS:'):
+        return Token(NO_PUBS, None, line[16:].strip())
+    if stripped.startswith('- '):
+        return Token(BULLET, None, stripped[2:])
+    if stripped.startswith('|'):
+        if '---' in line:
+            return None
+        return Token(ROW, None, tuple(c.strip() for c in stripped.split('|')[1:-1]))
+    m = _FIELD_RE.match(line)
+    if m:
+        return Token(FIELD, m.group(1), m.group(2).strip())
+    return None
+
+
+def tokenize(lines, raw=False):
+    """Yield Token events for an iterable of lines in a single pass.
+
+    Section markers switch between structured sections, whose lines are
+    classified into SUBSECTION/ITEM/ORG/FIELD/ROW/BULLET events, and free-text
+    sections (see parse_text), whose lines are passed through as TEXT events.
+    `raw` sets the mode used before the first section marker.
+    """
+    for line in lines:
+        if line.endswith('\n'):
+            line = line[:-1]
+        m = _SECTION_RE.match(line)
+        if m:
+            name = m.group(1)
+            raw = SECTION_PARSERS.get(name, parse_text) is parse_text
+            yield Token(SECTION, None, name)
+            line = line[m.end():]
+            if not line.strip():
+                continue
+        if raw:
+            yield Token(TEXT, None, line)
+        else:
+            tok = _classify(line)
+            if tok is not None:
+                yield tok
+
+
+def _tokens(content, raw=False):
+    """Accept raw section text or an already-tokenized event stream."""
+    if isinstance(content, str):
+        return tokenize(content.split('\n'), raw)
+    return content
 
-    # parts[0] is before first section, then alternating: section_name, content
-    for i in range(1, len(parts), 2):
-        section_name = parts[i].strip()
-        section_content = parts[i + 1].strip() if i + 1 < len(parts) else ''
-        sections[section_name] = section_content
 
-    return sections
+def parse_content(text):
+    """Parse the structured content format into a mapping of parsed sections.
+
+    `text` may be a string or a file. The result is a RawSections: sections
+    are parsed on first access. Text before the first section marker is ignored.
+    """
+    return RawSections(text)
+
+
+def parse_section(name, content):
+    """Run the parser registered for section `name` over its text or events."""
+    parse = SECTION_PARSERS.get(name, parse_text)
+    if _profiler is None:
+        return parse(content)
+    with _profiler.stage(f'parse {name}', 'parse'):
+        result = parse(content)
+    size = section_size(name, result)
+    if size is not None:
+        _profiler.count(f'items {name}', size)
+    return result
+
+
+def section_size(name, value):
+    """Return the number of entries in a parsed section (None for free text)."""
+    if name == 'NEWS':
+        return sum(len(sub['items']) for sub in value)
+    if name == 'GRANTEES':
+        return len(value[0])
+    if isinstance(value, Sequence) and not isinstance(value, str):
+        return len(value)
+    return None
+
+
+def count_items(sections):
+    """Return {section: item count} for the item-bearing sections present."""
+    fast = getattr(sections, 'item_count', None)
+    return {name: fast(name) if fast else section_size(name, section(sections, name))
+            for name in ITEM_SECTIONS + ('GRANTEES',) if name in sections}
+
+
+def section(sections, name):
+    """Return a parsed section, or the empty result of its parser if absent."""
+    if name in sections:
+        return sections[name]
+    return SECTION_PARSERS.get(name, parse_text)(())
+
+
+class RawSections(Mapping):
+    """Sections located by offset in the input text and parsed on first access.
+
+    Only (start, end) offsets of each section body are kept, with no copies
+    (CRLF input is normalized to \\n first, as open() would).
+    Besides the mapping of parsed sections it exposes body(), a content hash
+    per section (body_hash) so callers such as the render cache can tell
+    unchanged sections apart without parsing them, and item_count().
+    """
+
+    def __init__(self, text):
+        if not isinstance(text, str):
+            text = text.read()
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')   # as open() would
+        self.text = text
+        self.spans = {}      # name -> (start, end) of the stripped body
+        self._parsed = {}
+        self._hashes = {}
+
+        # Section markers at line starts, found in one regex scan (an unanchored
+        # pattern is several times faster to scan for than a multiline ^)
+        markers = [m for m in _SECTION_RE.finditer(text)
+                   if m.start() == 0 or text[m.start() - 1] == '\n']
+        for m, end in zip(markers, [m.start() for m in markers[1:]] + [len(text)]):
+            start = m.end()
+            while start < end and text[start].isspace():
+                start += 1
+            while end > start and text[end - 1].isspace():
+                end -= 1
+            self.spans[m.group(1)] = (start, end)
+
+    def body(self, name):
+        """Return a section's raw body text ('' if absent)."""
+        start, end = self.spans.get(name, (0, 0))
+        return self.text[start:end]
+
+    def __getitem__(self, name):
+        if name not in self._parsed:
+            if name not in self.spans:
+                raise KeyError(name)
+            self._parsed[name] = parse_section(name, self.body(name))
+        return self._parsed[name]
+
+    def __contains__(self, name):
+        return name in self.spans
+
+    def __iter__(self):
+        return iter(self.spans)
+
+    def __len__(self):
+        return len(self.spans)
+
+    def item_count(self, name):
+        """Count a section's ITEM:/ORG: entries without parsing it, unless already parsed."""
+        if name in self._parsed:
+            return section_size(name, self._parsed[name])
+        pattern = _ORG_LINE_RE if name == 'GRANTEES' else _ITEM_LINE_RE
+        start, end = self.spans.get(name, (0, 0))
+        return len(pattern.findall(self.text, start, end))
+
+    def body_hash(self, name):
+        """Return a hex digest of a section's raw body ('' if absent)."""
+        if name not in self._hashes:
+            self._hashes[name] = hashlib.sha256(self.body(name).encode()).hexdigest()
+        return self._hashes[name]
+
+
+# Very large inputs (e.g. a year of research dumps for a backfill) are memory-
+# mapped instead of read: MappedSections finds the section markers, and ITEM:
+# and ##SUBSECTION: lines within item sections, by scanning the mapped bytes in
+# line-aligned windows, handing each scanned window's pages back to the OS.
+# Item sections hold only the byte offsets of their ITEM: blocks (ItemSpans),
+# and each item is decoded and parsed when it is rendered, so peak memory
+# stays far below the input size. The file must not be truncated while mapped.
+MMAP_WINDOW = 16 * 1024 * 1024
+STDIN_BUFFER = 1024 * 1024
+
+_SECTION_BYTES_RE = re.compile(rb'===(\w+)===')
+_ITEM_BYTES_RE = re.compile(rb'^[^\S\n]*ITEM:[^\S\n]*$', re.M)
+_ORG_BYTES_RE = re.compile(rb'^ORG:', re.M)
+_NEWS_BYTES_RE = re.compile(rb'^(?:[^\S\n]*ITEM:[^\S\n]*$|##SUBSECTION:(.*))', re.M)
+
+
+def _release(mm, start, end):
+    """Let the OS drop the pages of mm[start:end] (they are re-read if touched again)."""
+    if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_DONTNEED'):
+        start -= start % mmap.PAGESIZE
+        mm.madvise(mmap.MADV_DONTNEED, start, end - start)
+
+
+def _windows(mm, start, end, size=MMAP_WINDOW):
+    """Yield line-aligned (start, end) windows of mm[start:end], releasing each once scanned."""
+    while start < end:
+        stop = min(start + size, end)
+        if stop < end:
+            newline = mm.rfind(b'\n', start, stop)
+            if newline >= 0:
+                stop = newline + 1
+        yield start, stop
+        _release(mm, start, stop)
+        start = stop
+
+
+def _finditer(mm, pattern, start, end):
+    """Yield matches of a line-anchored bytes pattern in mm[start:end], window by window."""
+    for lo, hi in _windows(mm, start, end):
+        yield from pattern.finditer(mm, lo, hi)
+
+
+class ItemSpans(Sequence):
+    """The ITEM: blocks of a mapped section, each decoded and parsed on access."""
+
+    def __init__(self, source, starts, ends):
+        self.source = source
+        self.starts = starts
+        self.ends = ends
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return parse_items(self.source.decode(self.starts[i], self.ends[i]))[0]
+
+    def __iter__(self):
+        decode = self.source.decode
+        for start, end in zip(self.starts, self.ends):
+            yield parse_items(decode(start, end))[0]
+
+
+class MappedSections(RawSections):
+    """RawSections over a memory-mapped file, decoding only what is parsed.
+
+    `source` is a path or a binary file object. Sections and items are located
+    by byte offset; body_hash() and item_count() never decode.
+    """
+
+    def __init__(self, source):
+        self.spans = {}
+        self._parsed = {}
+        self._hashes = {}
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                self.mm = self._map(f)
+        else:
+            self.mm = self._map(source)
+        self.size = len(self.mm)
+
+        mm = self.mm
+        markers = [m for m in _finditer(mm, _SECTION_BYTES_RE, 0, self.size)
+                   if m.start() == 0 or mm[m.start() - 1] == 10]
+        for m, end in zip(markers, [m.start() for m in markers[1:]] + [self.size]):
+            self.spans[m.group(1).decode()] = self._strip(m.end(), end)
+
+    @staticmethod
+    def _map(f):
+        """Map a file read-only (mmap rejects empty files, which map to b'')."""
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _strip(self, start, end):
+        """Return (start, end) narrowed past surrounding whitespace."""
+        mm = self.mm
+        while start < end and mm[start] in b' \t\r\n\x0b\x0c':
+            start += 1
+        while end > start and mm[end - 1] in b' \t\r\n\x0b\x0c':
+            end -= 1
+        return start, end
+
+    def decode(self, start, end):
+        """Decode mm[start:end] as text with newlines normalized, as open() would."""
+        text = self.mm[start:end].decode()
+        _release(self.mm, start, end)
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
+
+    def body(self, name):
+        start, end = self.spans.get(name, (0, 0))
+        return self.decode(start, end)
+
+    def __getitem__(self, name):
+        if name not in self._parsed:
+            if name not in self.spans:
+                raise KeyError(name)
+            if name == 'NEWS' or name in ITEM_SECTIONS:
+                with stage(f'parse {name}', 'parse'):
+                    self._parsed[name] = self._item_section(name, *self.spans[name])
+                if _profiler is not None:
+                    _profiler.count(f'items {name}', section_size(name, self._parsed[name]))
+            else:
+                self._parsed[name] = parse_section(name, self.body(name))
+        return self._parsed[name]
+
+    def _item_section(self, name, start, end):
+        """Locate the items of NEWS (as Subsections) or of another item section."""
+        if name != 'NEWS':
+            starts = array('q', (m.start() for m in _finditer(self.mm, _ITEM_BYTES_RE, start, end)))
+            return ItemSpans(self, starts, array('q', list(starts[1:]) + [end]))
+
+        subsections = []
+        starts = ends = None     # ITEM: block offsets of the current subsection
+        for m in _finditer(self.mm, _NEWS_BYTES_RE, start, end):
+            if starts is not None and len(ends) < len(starts):
+                ends.append(m.start())           # the open ITEM: block ends here
+            if m.group(1) is not None:           # ##SUBSECTION:
+                starts, ends = array('q'), array('q')
+                subsections.append(Subsection(sys.intern(m.group(1).decode().strip()),
+                                              ItemSpans(self, starts, ends)))
+            elif starts is not None:             # ITEM: (dropped before the first subsection)
+                starts.append(m.start())
+        if starts is not None and len(ends) < len(starts):
+            ends.append(end)
+        return subsections
+
+    def item_count(self, name):
+        if name in self._parsed:
+            return section_size(name, self._parsed[name])
+        pattern = _ORG_BYTES_RE if name == 'GRANTEES' else _ITEM_BYTES_RE
+        start, end = self.spans.get(name, (0, 0))
+        return sum(1 for _ in _finditer(self.mm, pattern, start, end))
+
+    def body_hash(self, name):
+        if name not in self._hashes:
+            h = hashlib.sha256()
+            start, end = self.spans.get(name, (0, 0))
+            for lo, hi in _windows(self.mm, start, end):
+                h.update(self.mm[lo:hi])
+            self._hashes[name] = h.hexdigest()
+        return self._hashes[name]
+
+
+def map_content(source):
+    """Return MappedSections for a content file path, or for a stream such as stdin.
+
+    A stream that is not a regular file is first spooled to a temporary file
+    through a bounded buffer, so it is never held in memory whole.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return MappedSections(source)
+    stream = getattr(source, 'buffer', source)
+    try:
+        regular = stat.S_ISREG(os.fstat(stream.fileno()).st_mode)
+    except (OSError, ValueError, io.UnsupportedOperation):
+        regular = False
+    if regular:
+        return MappedSections(stream)   # e.g. `< content.txt`: map it directly
+    with tempfile.TemporaryFile() as spool:
+        shutil.copyfileobj(stream, spool, STDIN_BUFFER)
+        spool.flush()
+        return MappedSections(spool)
+
+
+def parse_text(content):
+    """Parse a free-text section (e.g. macro trends) into a stripped string."""
+    return '\n'.join(tok.value for tok in _tokens(content, raw=True)
+                     if tok.kind == TEXT).strip()
 
 
 def parse_top_developments(content):
     """Parse top developments bullet points."""
     items = []
-    for line in content.strip().split('\n'):
-        line = line.strip()
-        if line.startswith('- '):
+    for tok in _tokens(content):
+        if tok.kind == BULLET:
             # Parse "- **Title** — Summary" or "- Title — Summary"
-            line = line[2:]  # Remove "- "
+            line = tok.value
             if ' — ' in line:
                 parts = line.split(' — ', 1)
                 title = parts[0].strip().strip('*')
@@ -78,56 +599,177 @@ def parse_top_developments(content):
     return items
 
 
+# Parsed ITEM:/ORG: entries and news subsections are compact __slots__ records
+# rather than dicts: a month of news merged into one build holds hundreds of
+# thousands of them. Low-cardinality fields (sources, dates, tags, org names)
+# are interned so repeats share one string. Records also answer dict-style
+# reads (item['title'], item.get('url', '#')), so renderers written against
+# the original dicts work unchanged.
+class Significance(str, Enum):
+    """Item significance; compares equal to its lowercase text ('' if unset)."""
+
+    HIGH = 'high'
+    MEDIUM = 'medium'
+    LOW = 'low'
+    NONE = ''
+
+    def __str__(self):
+        return self.value
+
+    __format__ = str.__format__
+
+
+def significance(value):
+    """Return the Significance for `value` (NONE if unrecognised)."""
+    return _SIGNIFICANCE.get(value.strip().lower(), Significance.NONE)
+
+
+_SIGNIFICANCE = {s.value: s for s in Significance}
+
+
+@lru_cache(maxsize=4096)
+def parse_tags(value):
+    """Parse a `[tag1, tag2]` field into a shared tuple of interned tags."""
+    return tuple(sys.intern(t.strip()) for t in value.strip('[]').split(',') if t.strip())
+
+
+class Record:
+    """Base for parsed records: __slots__ storage with read-only dict access."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def keys(self):
+        return self.__slots__
+
+    def as_dict(self):
+        """Return the record as a plain dict (nested records converted too)."""
+        return {key: _plain(getattr(self, key)) for key in self.__slots__}
+
+    def replace(self, **changes):
+        """Return a copy with some fields changed."""
+        return type(self)(**{**{key: getattr(self, key) for key in self.__slots__}, **changes})
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, key) == getattr(other, key) for key in self.__slots__)
+
+    def __repr__(self):
+        fields = ', '.join(f'{key}={getattr(self, key)!r}' for key in self.__slots__)
+        return f'{type(self).__name__}({fields})'
+
+
+def _plain(value):
+    if isinstance(value, Record):
+        return value.as_dict()
+    if isinstance(value, (list, ItemSpans)):
+        return [_plain(v) for v in value]
+    return value
+
+
+class Item(Record):
+    """An ITEM: entry of NEWS, PUBLICATIONS, CONGRESSIONAL, BUSINESS or CHINA."""
+
+    __slots__ = ('tags', 'significance', 'title', 'source', 'date', 'summary', 'url')
+
+    def __init__(self, tags=(), significance=Significance.NONE, title='', source='', date='',
+                 summary='', url=''):
+        self.tags = tags
+        self.significance = significance
+        self.title = title
+        self.source = source
+        self.date = date
+        self.summary = summary
+        self.url = url
+
+
+class Org(Record):
+    """An ORG: entry of GRANTEES."""
+
+    __slots__ = ('name', 'title', 'date', 'summary', 'url')
+
+    def __init__(self, name='', title='', date='', summary='', url=''):
+        self.name = name
+        self.title = title
+        self.date = date
+        self.summary = summary
+        self.url = url
+
+
+class Subsection(Record):
+    """A ### subsection of NEWS and its items."""
+
+    __slots__ = ('name', 'items')
+
+    def __init__(self, name='', items=None):
+        self.name = name
+        self.items = [] if items is None else items
+
+
+def new_item():
+    """Return an empty ITEM: record."""
+    return Item()
+
+
+def set_item_field(item, key, value):
+    """Apply one parsed `key: value` field to an ITEM: record."""
+    if key == 'tags':
+        # Parse [tag1, tag2] format
+        item.tags = parse_tags(value)
+    elif key == 'significance':
+        item.significance = significance(value)
+    elif key in ('source', 'date'):
+        setattr(item, key, sys.intern(value))
+    else:
+        setattr(item, key, value)
+
+
+def item_from_model(fields):
+    """Build an Item from its JSON model dict, interning as the parser does."""
+    item = Item(title=fields.get('title', ''), summary=fields.get('summary', ''), url=fields.get('url', ''))
+    item.tags = parse_tags(', '.join(fields.get('tags', ())))
+    item.significance = significance(fields.get('significance', ''))
+    item.source = sys.intern(fields.get('source', ''))
+    item.date = sys.intern(fields.get('date', ''))
+    return item
+
+
 def parse_news_section(content):
     """Parse news section with subsections and items."""
     subsections = []
     current_subsection = None
     current_item = None
 
-    for line in content.split('\n'):
-        line = line.rstrip()
-
-        if line.startswith('##SUBSECTION:'):
+    for tok in _tokens(content):
+        kind = tok.kind
+        if kind == SUBSECTION:
             if current_subsection and current_item:
-                current_subsection['items'].append(current_item)
-            if current_subsection:
-                subsections.append(current_subsection)
-            current_subsection = {
-                'name': line.replace('##SUBSECTION:', '').strip(),
-                'items': []
-            }
+                current_subsection.items.append(current_item)
+            current_subsection = Subsection(sys.intern(tok.value))
+            subsections.append(current_subsection)
             current_item = None
 
-        elif line.strip() == 'ITEM:':
+        elif kind == ITEM:
             if current_item and current_subsection:
-                current_subsection['items'].append(current_item)
-            current_item = {'tags': [], 'significance': '', 'title': '', 'source': '', 'date': '', 'summary': '', 'url': ''}
-
-        elif current_item is not None:
-            if line.startswith('tags:'):
-                tags_str = line.replace('tags:', '').strip()
-                # Parse [tag1, tag2] format
-                tags_str = tags_str.strip('[]')
-                if tags_str:
-                    current_item['tags'] = [t.strip() for t in tags_str.split(',') if t.strip()]
-            elif line.startswith('significance:'):
-                current_item['significance'] = line.replace('significance:', '').strip().lower()
-            elif line.startswith('title:'):
-                current_item['title'] = line.replace('title:', '').strip()
-            elif line.startswith('source:'):
-                current_item['source'] = line.replace('source:', '').strip()
-            elif line.startswith('date:'):
-                current_item['date'] = line.replace('date:', '').strip()
-            elif line.startswith('summary:'):
-                current_item['summary'] = line.replace('summary:', '').strip()
-            elif line.startswith('url:'):
-                current_item['url'] = line.replace('url:', '').strip()
-
-    # Don't forget the last item and subsection
+                current_subsection.items.append(current_item)
+            current_item = new_item()
+
+        elif kind == FIELD and current_item is not None:
+            set_item_field(current_item, tok.key, tok.value)
+
+    # Don't forget the last item
     if current_item and current_subsection:
-        current_subsection['items'].append(current_item)
-    if current_subsection:
-        subsections.append(current_subsection)
+        current_subsection.items.append(current_item)
 
     return subsections
 
@@ -137,34 +779,12 @@ def parse_items(content):
     items = []
     current_item = None
 
-    for line in content.split('\n'):
-        line = line.rstrip()
-
-        if line.strip() == 'ITEM:':
-            if current_item:
-                items.append(current_item)
-            current_item = {'tags': [], 'significance': '', 'title': '', 'source': '', 'date': '', 'summary': '', 'url': ''}
-
-        elif current_item is not None:
-            if line.startswith('tags:'):
-                tags_str = line.replace('tags:', '').strip().strip('[]')
-                if tags_str:
-                    current_item['tags'] = [t.strip() for t in tags_str.split(',') if t.strip()]
-            elif line.startswith('significance:'):
-                current_item['significance'] = line.replace('significance:', '').strip().lower()
-            elif line.startswith('title:'):
-                current_item['title'] = line.replace('title:', '').strip()
-            elif line.startswith('source:'):
-                current_item['source'] = line.replace('source:', '').strip()
-            elif line.startswith('date:'):
-                current_item['date'] = line.replace('date:', '').strip()
-            elif line.startswith('summary:'):
-                current_item['summary'] = line.replace('summary:', '').strip()
-            elif line.startswith('url:'):
-                current_item['url'] = line.replace('url:', '').strip()
-
-    if current_item:
-        items.append(current_item)
+    for tok in _tokens(content):
+        if tok.kind == ITEM:
+            current_item = new_item()
+            items.append(current_item)
+        elif tok.kind == FIELD and current_item is not None:
+            set_item_field(current_item, tok.key, tok.value)
 
     return items
 
@@ -172,11 +792,9 @@ def parse_items(content):
 def parse_calendar(content):
     """Parse markdown table into list of dicts."""
     rows = []
-    lines = [l.strip() for l in content.strip().split('\n') if l.strip()]
-
-    for line in lines:
-        if line.startswith('|') and '---' not in line:
-            cells = [c.strip() for c in line.split('|')[1:-1]]
+    for tok in _tokens(content):
+        if tok.kind == ROW:
+            cells = tok.value
             if len(cells) >= 3 and cells[0].lower() != 'date':
                 rows.append({
                     'date': cells[0],
@@ -188,12 +806,7 @@ def parse_calendar(content):
 
 def parse_key_questions(content):
     """Parse bullet list of questions."""
-    questions = []
-    for line in content.strip().split('\n'):
-        line = line.strip()
-        if line.startswith('- '):
-            questions.append(line[2:].strip())
-    return questions
+    return [tok.value.strip() for tok in _tokens(content) if tok.kind == BULLET]
 
 
 def parse_grantees(content):
@@ -202,56 +815,386 @@ def parse_grantees(content):
     no_pubs = []
     current_org = None
 
-    for line in content.split('\n'):
-        line = line.rstrip()
-
-        if line.startswith('ORG:'):
-            if current_org:
-                orgs.append(current_org)
-            current_org = {'name': line.replace('ORG:', '').strip(), 'title': '', 'date': '', 'summary': '', 'url': ''}
+    for tok in _tokens(content):
+        kind = tok.kind
+        if kind == ORG:
+            current_org = Org(sys.intern(tok.value))
+            orgs.append(current_org)
 
-        elif line.startswith('NO_PUBLICATIONS:'):
-            no_pubs_str = line.replace('NO_PUBLICATIONS:', '').strip()
-            no_pubs = [o.strip() for o in no_pubs_str.split(',') if o.strip()]
+        elif kind == NO_PUBS:
+            no_pubs = [o.strip() for o in tok.value.split(',') if o.strip()]
 
-        elif current_org is not None:
-            if line.startswith('title:'):
-                current_org['title'] = line.replace('title:', '').strip()
-            elif line.startswith('date:'):
-                current_org['date'] = line.replace('date:', '').strip()
-            elif line.startswith('summary:'):
-                current_org['summary'] = line.replace('summary:', '').strip()
-            elif line.startswith('url:'):
-                current_org['url'] = line.replace('url:', '').strip()
-
-    if current_org:
-        orgs.append(current_org)
+        elif kind == FIELD and current_org is not None and tok.key in current_org:
+            setattr(current_org, tok.key, sys.intern(tok.value) if tok.key == 'date' else tok.value)
 
     return orgs, no_pubs
 
 
 def parse_limitations(content):
     """Parse bullet list of limitations."""
-    items = []
-    for line in content.strip().split('\n'):
-        line = line.strip()
-        if line.startswith('- '):
-            items.append(line[2:].strip())
-    return items
+    return [tok.value.strip() for tok in _tokens(content) if tok.kind == BULLET]
+
+
+SECTION_PARSERS = {
+    'TOP_DEVELOPMENTS': parse_top_developments,
+    'NEWS': parse_news_section,
+    'PUBLICATIONS': parse_items,
+    'CONGRESSIONAL': parse_items,
+    'BUSINESS': parse_items,
+    'CHINA': parse_items,
+    'MACRO_TRENDS': parse_text,
+    'CALENDAR': parse_calendar,
+    'KEY_QUESTIONS': parse_key_questions,
+    'GRANTEES': parse_grantees,
+    'LIMITATIONS': parse_limitations,
+}
+
+
+# =============================================================================
+# PARSED MODEL
+# =============================================================================
+# The parsed sections can be saved as JSON (--emit-model) and rendered from
+# directly (--model), skipping the text parser entirely; the research step may
+# also write this format itself. Schema, version 1:
+#
+#   {"format": "energy-digest-model", "version": 1, "sections": {
+#     "TOP_DEVELOPMENTS": [{"title", "summary"}, ...],
+#     "NEWS":             [{"name", "items": [item, ...]}, ...],
+#     "PUBLICATIONS" | "CONGRESSIONAL" | "BUSINESS" | "CHINA": [item, ...],
+#     "MACRO_TRENDS":     "free text",
+#     "CALENDAR":         [{"date", "event", "significance"}, ...],
+#     "KEY_QUESTIONS":    ["question", ...],
+#     "GRANTEES":         {"orgs": [{"name", "title", "date", "summary", "url"}, ...],
+#                          "no_publications": ["org", ...]},
+#     "LIMITATIONS":      ["limitation", ...]}}
+#
+# where item = {"tags": [...], "significance": "high" | "medium" | "low" | "",
+# "title", "source", "date", "summary", "url"}. Sections may be omitted, and
+# any other section name holds free text. Values are plain text (unescaped).
+#
+# emit_model writes each section on its own line, so ModelSections can index a
+# large model by line and decode one section at a time. Any other valid JSON
+# layout is accepted too, at the cost of decoding it up front.
+MODEL_FORMAT = 'energy-digest-model'
+MODEL_VERSION = 1
+_MODEL_HEADER = '{"format": "%s", "version": %d, "sections": {' % (MODEL_FORMAT, MODEL_VERSION)
+
+
+def model_section(name, value):
+    """Convert a parsed section to its JSON model form."""
+    if name == 'GRANTEES':
+        orgs, no_pubs = value
+        return {'orgs': _plain(orgs), 'no_publications': no_pubs}
+    return _plain(value)
+
+
+def section_from_model(name, value):
+    """Convert a JSON model section back to the parsed form the renderers take."""
+    if name == 'GRANTEES':
+        orgs = [Org(**{k: v for k, v in org.items() if k in Org.__slots__})
+                for org in value.get('orgs', [])]
+        return orgs, value.get('no_publications', [])
+    if name == 'NEWS':
+        return [Subsection(sub.get('name', ''), [item_from_model(item) for item in sub.get('items', [])])
+                for sub in value]
+    if name in ITEM_SECTIONS:
+        return [item_from_model(item) for item in value]
+    return value
+
+
+def emit_model(sections, path):
+    """Write parsed `sections` to `path` as a model, one section per line."""
+    with atomic_write(path) as f:
+        f.write(_MODEL_HEADER)
+        for i, name in enumerate(sections):
+            value = model_section(name, sections[name])
+            f.write(',\n' if i else '\n')
+            f.write(f'{json.dumps(name)}: {json.dumps(value, ensure_ascii=False)}')
+        f.write('\n}}\n')
+
+
+def check_model(header):
+    """Raise ValueError unless `header` names a model version we can render."""
+    if header.get('format') != MODEL_FORMAT:
+        raise ValueError(f"not a digest model (format {header.get('format')!r})")
+    if header.get('version') != MODEL_VERSION:
+        raise ValueError(f"unsupported model version {header.get('version')!r} "
+                         f"(this build_digest.py reads version {MODEL_VERSION})")
+
+
+class ModelSections(Mapping):
+    """Sections of a JSON model, each decoded on first access.
+
+    The model counterpart of RawSections: section bodies are kept as JSON text
+    and body_hash lets the render cache reuse unchanged sections.
+    """
+
+    def __init__(self, source):
+        text = source if isinstance(source, str) else source.read()
+        self.raw = {}
+        self._parsed = {}
+        self._hashes = {}
+
+        lines = text.rstrip('\n').split('\n')
+        if lines[0] == _MODEL_HEADER and lines[-1] == '}}':
+            decoder = json.JSONDecoder()
+            try:
+                for line in lines[1:-1]:
+                    name, end = decoder.raw_decode(line)
+                    if line[end:end + 2] != ': ':
+                        raise ValueError(line[:40])
+                    self.raw[name] = line[end + 2:].removesuffix(',')
+                return
+            except ValueError:
+                self.raw.clear()  # hand-edited; fall back to a full decode
+
+        data = json.loads(text)
+        check_model(data)
+        for name, value in data.get('sections', {}).items():
+            self.raw[name] = json.dumps(value, ensure_ascii=False)
+
+    def __getitem__(self, name):
+        if name not in self._parsed:
+            with stage(f'load {name}', 'parse'):
+                self._parsed[name] = section_from_model(name, json.loads(self.raw[name]))
+        return self._parsed[name]
+
+    def __contains__(self, name):
+        return name in self.raw
+
+    def __iter__(self):
+        return iter(self.raw)
+
+    def __len__(self):
+        return len(self.raw)
+
+    def body_hash(self, name):
+        """Return a hex digest of a section's JSON text ('' if absent)."""
+        if name not in self._hashes:
+            body = 'model:' + self.raw.get(name, '')
+            self._hashes[name] = hashlib.sha256(body.encode()).hexdigest()
+        return self._hashes[name]
 
 
 # =============================================================================
 # HTML GENERATORS
 # =============================================================================
+# All markup comes from the template fragments in digests/html-fragments.html
+# (cut from the designer's mock, digests/html-design-template.html):
+# named fragments containing {{slot}} placeholders. The template is split
+# once per process into literal chunks and slot names. Each fragment becomes a
+# function rendering a single join of its chunks and the slot values passed as
+# keywords, inserted verbatim, e.g. templates().grantee_card(name=...).
+#
+# Escaping happens before rendering, not in it: iter_digest renders from an
+# EscapedSections view, which HTML-escapes each parsed section once. Renderers
+# therefore take model values pre-escaped, and escape only what they produce
+# themselves (section titles, the date, tag names).
+TEMPLATE_PATH = Path(__file__).parent / 'digests' / 'html-fragments.html'
+
+_FRAGMENT_RE = re.compile(r'<!-- fragment: (\w+) -->(.*?)<!-- /fragment -->', re.S)
+_SLOT_RE = re.compile(r'\{\{(\w+)\}\}')
+
+
+def compile_template(source):
+    """Split template source into {fragment: [literal, slot, literal, ...]}."""
+    return {m.group(1): _SLOT_RE.split(m.group(2)) for m in _FRAGMENT_RE.finditer(source)}
+
+
+def fragment_function(name, parts):
+    """Build the function rendering one compiled fragment from keyword slot values."""
+    head, pairs = parts[0], tuple(zip(parts[1::2], parts[2::2]))
+
+    def render(**values):
+        out = [head]
+        for slot, chunk in pairs:
+            out.append(values[slot])
+            out.append(chunk)
+        return ''.join(out)
+
+    render.__name__ = render.__qualname__ = name
+    return render
+
+
+@lru_cache(maxsize=None)
+def templates(path=TEMPLATE_PATH):
+    """Return the compiled template fragments (loaded once per process)."""
+    compiled = compile_template(Path(path).read_text())
+    missing = TEMPLATE_FRAGMENTS - compiled.keys()
+    if missing:
+        raise ValueError(f"{path}: missing template fragments: {', '.join(sorted(missing))}")
+    return SimpleNamespace(**{name: fragment_function(name, parts) for name, parts in compiled.items()})
+
+TEMPLATE_FRAGMENTS = {
+    'document_head', 'top_developments_open', 'top_development', 'top_developments_close', 'section_comment',
+    'section_header', 'subsection_header', 'tag', 'tag_row', 'news_item', 'omitted_note',
+    'section_divider', 'macro_trends', 'macro_paragraph', 'calendar_open', 'calendar_row',
+    'calendar_close', 'key_questions_open', 'key_question', 'key_questions_close',
+    'grantee_card', 'no_publications', 'limitations_open', 'limitation', 'limitations_close',
+    'document_footer',
+}
+
+
+# Fragments that repeat across a digest (tag rows, section and subsection
+# headers, the document head) are memoized by their arguments in bounded LRUs.
+# They depend on nothing else but the brand palette, so refresh() drops them
+# all whenever COLORS or TAG_COLORS change; every render entry point
+# (iter_digest, plan_budget) calls it first. Constant fragments such as the
+# divider and footer are plain string constants.
+FRAGMENT_CACHE_SIZE = 1024
+
+
+class FragmentCache:
+    """Per-kind LRU memoization of rendered HTML fragments."""
+
+    def __init__(self, maxsize=FRAGMENT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.caches = {}     # kind -> OrderedDict(args -> html)
+        self.palette = None
+
+    def memoize(self, kind):
+        """Decorator memoizing a fragment renderer by its (hashable) positional args."""
+        cache = self.caches[kind] = OrderedDict()
+
+        def decorate(render):
+            @wraps(render)
+            def memoized(*args):
+                html = cache.get(args)
+                hit = html is not None
+                if hit:
+                    cache.move_to_end(args)
+                else:
+                    html = cache[args] = render(*args)
+                    if len(cache) > self.maxsize:
+                        cache.popitem(last=False)
+                if _profiler is not None:
+                    _profiler.count(f"{kind} fragment {'hits' if hit else 'misses'}")
+                return html
+            return memoized
+        return decorate
+
+    def refresh(self):
+        """Drop every memoized fragment if the brand palette changed since the last call."""
+        palette = (tuple(COLORS.items()), tuple(TAG_COLORS.items()))
+        if palette != self.palette:
+            for cache in self.caches.values():
+                cache.clear()
+            self.palette = palette
+
+
+fragments = FragmentCache()
+
+
 def html_escape(text):
-    """Basic HTML escaping."""
+    """Escape text for HTML content or a quoted attribute value (& < > " ').
+
+    Text with nothing to escape (most of it) is returned as is after a fast
+    scan. Otherwise CPython's C-level str.replace passes beat a single-pass
+    str.translate or re.sub with multi-character replacements several times
+    over (see benchmarks/escape.py).
+    """
     if not text:
         return ''
-    return (text
-            .replace('&', '&amp;')
-            .replace('<', '&lt;')
-            .replace('>', '&gt;')
-            .replace('"', '&quot;'))
+    if _profiler is not None:
+        _profiler.count('escaped chars', len(text))
+    if '&' in text or '<' in text or '>' in text or '"' in text or "'" in text:
+        return (text
+                .replace('&', '&amp;')
+                .replace('<', '&lt;')
+                .replace('>', '&gt;')
+                .replace('"', '&quot;')
+                .replace("'", '&#39;'))
+    return text
+
+
+class LazyMap(Sequence):
+    """A read-only sequence of func(item) for `items`, computed on access.
+
+    Lets escaped item sections be rendered one item at a time (e.g. straight
+    from ItemSpans) without holding an escaped copy of the whole section.
+    """
+
+    def __init__(self, func, items):
+        self.func = func
+        self.items = items
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.func(item) for item in self.items[i]]
+        return self.func(self.items[i])
+
+    def __iter__(self):
+        return map(self.func, self.items)
+
+
+class EscapedSections(Mapping):
+    """A view of parsed sections with every model text field HTML-escaped.
+
+    Each section is escaped once, on first access. Short values that repeat
+    across a digest (sources, dates, subsection and org names) go through a
+    per-build cache. Tags stay raw: their colors are looked up by name, and
+    tag rows are escaped (and memoized) by render_tag_row.
+    """
+
+    def __init__(self, sections):
+        self.sections = sections
+        self.omitted = getattr(sections, 'omitted', {})   # budget notes, see omitted()
+        self._escaped = {}
+        self._cache = {}
+
+    def cached(self, text):
+        """html_escape() through the per-build cache."""
+        html = self._cache.get(text)
+        hit = html is not None
+        if not hit:
+            html = self._cache[text] = html_escape(text)
+        if _profiler is not None:
+            _profiler.count(f"escape cache {'hits' if hit else 'misses'}")
+        return html
+
+    def item(self, item):
+        return Item(item['tags'], item['significance'], html_escape(item['title']),
+                    self.cached(item['source']), self.cached(item['date']),
+                    html_escape(item['summary']), html_escape(item['url']))
+
+    def escape(self, name, value):
+        """Return parsed section `name` with its text fields escaped."""
+        esc, cached = html_escape, self.cached
+        if name == 'NEWS':
+            return [Subsection(cached(sub['name']), LazyMap(self.item, sub['items'])) for sub in value]
+        if name in ITEM_SECTIONS:
+            return LazyMap(self.item, value)
+        if name == 'TOP_DEVELOPMENTS':
+            return [{'title': esc(dev['title']), 'summary': esc(dev['summary'])} for dev in value]
+        if name == 'CALENDAR':
+            return [{'date': cached(row.get('date', '')), 'event': esc(row.get('event', '')),
+                     'significance': cached(row.get('significance', ''))} for row in value]
+        if name == 'GRANTEES':
+            orgs, no_pubs = value
+            return ([Org(cached(org['name']), esc(org['title']), cached(org['date']),
+                         esc(org['summary']), esc(org['url'])) for org in orgs],
+                    [cached(name) for name in no_pubs])
+        if isinstance(value, list):
+            return [esc(text) for text in value]    # KEY_QUESTIONS, LIMITATIONS
+        return esc(value)                           # MACRO_TRENDS and free text
+
+    def __getitem__(self, name):
+        if name not in self._escaped:
+            with stage(f'escape {name}', 'render'):
+                self._escaped[name] = self.escape(name, self.sections[name])
+        return self._escaped[name]
+
+    def __contains__(self, name):
+        return name in self.sections
+
+    def __iter__(self):
+        return iter(self.sections)
+
+    def __len__(self):
+        return len(self.sections)
 
 
 def render_tags(tags):
@@ -260,431 +1203,2879 @@ def render_tags(tags):
         return ''
 
     # Limit to 2 most relevant tags to avoid clutter
-    display_tags = tags[:2]
+    return render_tag_row(tuple(tags[:2]))
 
-    tag_html = []
-    for tag in display_tags:
-        color = TAG_COLORS.get(tag, COLORS['teal'])
-        tag_html.append(
-            f'<span style="display: inline-block; background: {color}; color: #ffffff; '
-            f'font-size: 10px; padding: 2px 8px; border-radius: 3px; margin-right: 4px; '
-            f'font-weight: 600;">{html_escape(tag)}</span>'
-        )
 
-    return f'<p style="margin: 0 0 8px 0;">{"".join(tag_html)}</p>'
+@fragments.memoize('tags')
+def render_tag_row(display_tags):
+    """Render the tag row for a tuple of displayed tags."""
+    tag = templates().tag
+    return templates().tag_row(tags=''.join(tag(color=TAG_COLORS.get(t, COLORS['teal']), tag=html_escape(t))
+                                            for t in display_tags))
 
 
 def render_news_item(item):
     """Render a single news item card."""
-    tags_html = render_tags(item.get('tags', []))
-
-    return f'''
-          <tr>
-            <td style="padding: 0 28px 14px 28px;">
-              <table role="presentation" width="100%" cellpadding="0" cellspacing="0" style="background: #faf8f5; border-radius: 8px; border-left: 3px solid #e76f51;">
-                <tr>
-                  <td style="padding: 14px 16px;">{tags_html}<p style="font-size: 14px; font-weight: 600; color: #1a1a2e; margin: 0 0 4px 0;">{html_escape(item.get('title', ''))}</p>
-                    <p style="font-family: 'Courier New', monospace; font-size: 11px; color: #8a8a9a; margin: 0 0 8px 0;"><span style="color: #2a9d8f; font-weight: 500;">{html_escape(item.get('source', ''))}</span> · {html_escape(item.get('date', ''))}</p>
-                    <p style="font-size: 13px; line-height: 1.6; color: #4a4a5a; margin: 0;">{html_escape(item.get('summary', ''))}</p>
-                    <p style="margin: 10px 0 0 0;"><a href="{html_escape(item.get('url', '#'))}" style="color: #2a9d8f; text-decoration: none; font-size: 12px; font-weight: 500;">Source →</a></p>
-                  </td>
-                </tr>
-              </table>
-            </td>
-          </tr>'''
+    tags = item.get('tags', [])
+    return templates().news_item(
+        tags=render_tags(tags), title=item.get('title', ''),
+        source=item.get('source', ''), date=item.get('date', ''),
+        summary=item.get('summary', ''), url=item.get('url', '#'))
 
 
+@fragments.memoize('subsection header')
 def render_subsection_header(name):
     """Render a gold-underlined subsection header with breathing room."""
-    return f'''
-          <tr>
-            <td style="padding: 16px 28px 12px 28px;">
-              <p style="margin: 0; font-size: 13px; font-weight: 600; color: #1a1a2e; text-transform: uppercase; letter-spacing: 0.5px; padding-bottom: 6px; border-bottom: 2px solid #e9c46a; display: inline-block;">{html_escape(name)}</p>
-            </td>
-          </tr>'''
+    return templates().subsection_header(name=name)
 
 
+@fragments.memoize('section header')
 def render_section_header(title):
     """Render a coral-highlighted section header."""
-    return f'''
-          <tr>
-            <td style="padding: 20px 28px 16px 28px;">
-              <h2 style="margin: 0; font-size: 16px; font-weight: 700; color: #1a1a2e;">
-                <span style="background: linear-gradient(180deg, transparent 55%, rgba(231, 111, 81, 0.3) 55%); padding: 0 4px;">{html_escape(title)}</span>
-              </h2>
-            </td>
-          </tr>'''
+    return templates().section_header(title=html_escape(title))
 
 
 def render_section_divider():
     """Render dashed divider between sections."""
-    return '''
-          <tr>
-            <td style="padding: 8px 28px 20px 28px;">
-              <table role="presentation" width="100%" cellpadding="0" cellspacing="0">
-                <tr><td style="border-bottom: 1px dashed #d4d2cd;"></td></tr>
-              </table>
-            </td>
-          </tr>'''
+    return templates().section_divider()
+
+
+def iter_calendar_table(rows):
+    """Yield the What to Watch table in chunks, one per row."""
+    t = templates()
+    yield t.calendar_open()
+    for row in rows:
+        yield t.calendar_row(date=row.get('date', ''), event=row.get('event', ''),
+                             significance=row.get('significance', ''))
+    yield t.calendar_close()
 
 
 def render_calendar_table(rows):
     """Render the What to Watch table."""
-    rows_html = ''
-    for row in rows:
-        rows_html += f'''
-                <tr>
-                  <td style="padding: 10px 12px; border-bottom: 1px solid #e8e6e1; color: #4a4a5a; vertical-align: top;">{html_escape(row.get('date', ''))}</td>
-                  <td style="padding: 10px 12px; border-bottom: 1px solid #e8e6e1; color: #4a4a5a; vertical-align: top;">{html_escape(row.get('event', ''))}</td>
-                  <td style="padding: 10px 12px; border-bottom: 1px solid #e8e6e1; color: #4a4a5a; vertical-align: top;">{html_escape(row.get('significance', ''))}</td>
-                </tr>'''
-
-    return f'''
-          <tr>
-            <td style="padding: 0 28px 16px 28px;">
-              <table style="width: 100%; border-collapse: collapse; font-size: 12px;">
-                <tr>
-                  <th style="background-color: #1a1a2e; color: #ffffff; padding: 10px 12px; text-align: left; font-weight: 600; font-size: 11px; text-transform: uppercase;">Date</th>
-                  <th style="background-color: #1a1a2e; color: #ffffff; padding: 10px 12px; text-align: left; font-weight: 600; font-size: 11px; text-transform: uppercase;">Event</th>
-                  <th style="background-color: #1a1a2e; color: #ffffff; padding: 10px 12px; text-align: left; font-weight: 600; font-size: 11px; text-transform: uppercase;">Significance</th>
-                </tr>
-                {rows_html}
-              </table>
-            </td>
-          </tr>'''
+    return ''.join(iter_calendar_table(rows))
+
+
+def iter_key_questions(questions):
+    """Yield the Key Questions box in chunks, one per question."""
+    t = templates()
+    yield t.key_questions_open()
+    for q in questions:
+        yield t.key_question(question=q)
+    yield t.key_questions_close()
 
 
 def render_key_questions(questions):
     """Render the Key Questions box."""
-    questions_html = ''
-    for q in questions:
-        questions_html += f'''
-                      <tr>
-                        <td valign="top" style="padding-right: 8px; color: #e9c46a; font-weight: 700; font-size: 13px;">?</td>
-                        <td style="color: #4a4a5a; font-size: 13px; line-height: 1.5; padding-bottom: 6px;">{html_escape(q)}</td>
-                      </tr>'''
-
-    return f'''
-          <tr>
-            <td style="padding: 0 28px 20px 28px;">
-              <table role="presentation" width="100%" cellpadding="0" cellspacing="0" style="background: #faf8f5; border-radius: 8px; border-left: 3px solid #e9c46a;">
-                <tr>
-                  <td style="padding: 14px 16px;">
-                    <p style="font-family: 'Courier New', monospace; font-size: 11px; font-weight: 700; text-transform: uppercase; letter-spacing: 0.08em; color: #e9c46a; margin: 0 0 10px 0;">Key Questions</p>
-                    <table role="presentation" cellpadding="0" cellspacing="0">
-                      {questions_html}
-                    </table>
-                  </td>
-                </tr>
-              </table>
-            </td>
-          </tr>'''
+    return ''.join(iter_key_questions(questions))
 
 
 def render_macro_trends(content):
-    """Render macro trends box."""
-    # Convert **bold** to <strong>
+    """Render macro trends box from escaped text."""
+    # Convert **bold** to <strong> (markup added after escaping, so content can't inject any)
     content = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', content)
 
     # Split into paragraphs
     paragraphs = [p.strip() for p in content.split('\n\n') if p.strip()]
 
-    paras_html = ''
-    for i, p in enumerate(paragraphs):
-        margin = '0' if i == len(paragraphs) - 1 else '0 0 12px 0'
-        paras_html += f'<p style="font-size: 13px; line-height: 1.6; color: #4a4a5a; margin: {margin};">{p}</p>'
-
-    return f'''
-          <tr>
-            <td style="padding: 0 28px 20px 28px;">
-              <table role="presentation" width="100%" cellpadding="0" cellspacing="0" style="background: #ffffff; border-radius: 8px; border: 1px solid #e8e6e1; border-left: 4px solid #2a9d8f;">
-                <tr>
-                  <td style="padding: 16px 20px;">
-                    {paras_html}
-                  </td>
-                </tr>
-              </table>
-            </td>
-          </tr>'''
+    last = len(paragraphs) - 1
+    paragraph = templates().macro_paragraph
+    paras_html = ''.join(paragraph(margin='0' if i == last else '0 0 12px 0', text=p)
+                         for i, p in enumerate(paragraphs))
+
+    return templates().macro_trends(paragraphs=paras_html)
 
 
 def render_grantee_card(org):
     """Render a single grantee organization card."""
-    return f'''
-          <tr>
-            <td style="padding: 0 28px 10px 28px;">
-              <table role="presentation" width="100%" cellpadding="0" cellspacing="0" style="background: #ffffff; border: 1px solid #e8e6e1; border-radius: 8px;">
-                <tr>
-                  <td style="padding: 14px 16px;">
-                    <p style="font-size: 14px; font-weight: 600; color: #2a9d8f; margin: 0 0 6px 0;">{html_escape(org.get('name', ''))}</p>
-                    <p style="font-size: 13px; line-height: 1.55; color: #4a4a5a; margin: 0;"><strong>"{html_escape(org.get('title', ''))}"</strong> ({html_escape(org.get('date', ''))}) — {html_escape(org.get('summary', ''))}</p>
-                    <p style="margin: 10px 0 0 0;"><a href="{html_escape(org.get('url', '#'))}" style="color: #2a9d8f; text-decoration: none; font-size: 12px; font-weight: 500;">Source →</a></p>
-                  </td>
-                </tr>
-              </table>
-            </td>
-          </tr>'''
+    return templates().grantee_card(
+        name=org.get('name', ''), title=org.get('title', ''), date=org.get('date', ''),
+        summary=org.get('summary', ''), url=org.get('url', '#'))
 
 
 def render_no_publications(orgs):
     """Render the list of orgs with no publications."""
     if not orgs:
         return ''
-    return f'''
-          <tr>
-            <td style="padding: 0 28px 20px 28px;">
-              <p style="font-size: 12px; font-style: italic; color: #8a8a9a; margin: 8px 0 0 0;">No recent energy/permitting publications identified: {html_escape(', '.join(orgs))}</p>
-            </td>
-          </tr>'''
+    return templates().no_publications(orgs=', '.join(orgs))
+
+
+def iter_limitations(items):
+    """Yield the limitations box in chunks, one per item."""
+    t = templates()
+    yield t.limitations_open()
+    last = len(items) - 1
+    for i, item in enumerate(items):
+        yield t.limitation(margin='0' if i == last else '0 0 4px 0', text=item)
+    yield t.limitations_close()
+
+
+def render_omitted_note(count):
+    """Render the note for items left out to meet the size budget."""
+    return templates().omitted_note(count=str(count), noun='item' if count == 1 else 'items')
 
 
 def render_limitations(items):
     """Render limitations box."""
-    items_html = ''
-    for i, item in enumerate(items):
-        margin = '0' if i == len(items) - 1 else '0 0 4px 0'
-        items_html += f'<li style="margin: {margin};">{html_escape(item)}</li>'
-
-    return f'''
-          <tr>
-            <td style="padding: 0 28px 20px 28px;">
-              <table role="presentation" width="100%" cellpadding="0" cellspacing="0" style="background: #f5f5f5; border-radius: 8px;">
-                <tr>
-                  <td style="padding: 14px 16px;">
-                    <p style="font-size: 12px; font-weight: 600; color: #4a4a5a; margin: 0 0 8px 0;">Research Limitations</p>
-                    <ul style="margin: 0; padding: 0 0 0 18px; font-size: 12px; color: #8a8a9a; line-height: 1.5;">
-                      {items_html}
-                    </ul>
-                  </td>
-                </tr>
-              </table>
-            </td>
-          </tr>'''
+    return ''.join(iter_limitations(items))
 
 
 # =============================================================================
 # MAIN HTML TEMPLATE
 # =============================================================================
-def build_html(sections, date_str=None):
-    """Build the complete HTML document from parsed sections."""
+# The document is produced as a stream of chunks by iter_digest(), so it can be
+# written out section by section (render_digest) without ever holding the whole
+# document in memory. build_html() joins the same chunks into one string.
+def iter_items(items, omitted=0):
+    """Yield a card for each item, then a note for any omitted by the size budget.
+
+    Items already rendered to their card (by CardSections) pass through as is.
+    """
+    for item in items:
+        yield item if isinstance(item, str) else render_news_item(item)
+    if omitted:
+        yield render_omitted_note(omitted)
+
+
+def iter_news(subsections, omitted=0):
+    """Yield each news subsection header followed by its item cards."""
+    for subsection in subsections:
+        yield render_subsection_header(subsection['name'])
+        yield from iter_items(subsection['items'])
+    if omitted:
+        yield render_omitted_note(omitted)
+
+
+def omitted(sections, name):
+    """Return how many items of a section the size budget left out (see plan_budget)."""
+    return getattr(sections, 'omitted', {}).get(name, 0)
+
+
+def iter_grantees(grantees, no_pubs):
+    """Yield grantee cards followed by the no-publications note."""
+    for org in grantees:
+        yield render_grantee_card(org)
+    yield render_no_publications(no_pubs)
+
+
+def iter_section(comment, title, *bodies, divider=True):
+    """Yield a headed section: comment, header, each body's chunks, divider."""
+    yield templates().section_comment(comment=comment)
+    yield render_section_header(title)
+    for body in bodies:
+        yield '\n          '
+        yield from body
+    if divider:
+        yield '\n          '
+        yield render_section_divider()
+
+
+def iter_top_developments(devs):
+    """Yield the top developments box with its bullets."""
+    t = templates()
+    yield t.top_developments_open()
+    for dev in devs:
+        yield t.top_development(title=dev['title'], summary=dev['summary'])
+    yield t.top_developments_close()
+
+
+def shown(sections, name):
+    """Return whether a section is shown (an edition may leave some out, see EditionSections)."""
+    shows = getattr(sections, 'shows', None)
+    return shows is None or shows(name)
+
+
+def iter_what_to_watch(sections):
+    """Yield the What to Watch section: the calendar table, then the key questions."""
+    bodies = []
+    if shown(sections, 'CALENDAR'):
+        bodies.append(iter_calendar_table(section(sections, 'CALENDAR')))
+    if shown(sections, 'KEY_QUESTIONS'):
+        bodies.append(iter_key_questions(section(sections, 'KEY_QUESTIONS')))
+    return iter_section('What to Watch', 'What to Watch This Week', *bodies)
+
+
+# Body blocks of the document in order: (sections rendered, renderer). Each
+# block depends only on its own sections, so it can be cached independently.
+DIGEST_BLOCKS = (
+    (('TOP_DEVELOPMENTS',), lambda s: iter_top_developments(section(s, 'TOP_DEVELOPMENTS'))),
+    (('NEWS',), lambda s: iter_section('News & Statements', 'News & Statements',
+                                       iter_news(section(s, 'NEWS'), omitted(s, 'NEWS')))),
+    (('PUBLICATIONS',), lambda s: iter_section('Publications', 'Publications',
+                                               iter_items(section(s, 'PUBLICATIONS'), omitted(s, 'PUBLICATIONS')))),
+    (('CONGRESSIONAL',), lambda s: iter_section('Congressional & Executive Activity',
+                                                'Congressional & Executive Activity',
+                                                iter_items(section(s, 'CONGRESSIONAL'), omitted(s, 'CONGRESSIONAL')))),
+    (('BUSINESS',), lambda s: iter_section('Business Activity', 'Business Activity',
+                                           iter_items(section(s, 'BUSINESS'), omitted(s, 'BUSINESS')))),
+    (('CHINA',), lambda s: iter_section('China', 'China',
+                                        iter_items(section(s, 'CHINA'), omitted(s, 'CHINA')))),
+    (('MACRO_TRENDS',), lambda s: iter_section('Macro Trends', 'Macro Trends',
+                                               (render_macro_trends(section(s, 'MACRO_TRENDS')),))),
+    (('CALENDAR', 'KEY_QUESTIONS'), iter_what_to_watch),
+    (('GRANTEES',), lambda s: iter_section('Grantee Activities', 'Grantee Activities',
+                                           iter_grantees(*section(s, 'GRANTEES')))),
+    (('LIMITATIONS',), lambda s: iter_section('Limitations', 'Limitations & Gaps',
+                                              iter_limitations(section(s, 'LIMITATIONS')),
+                                              divider=False)),
+)
+
+
+def render_block(names, render, sections):
+    """Render one DIGEST_BLOCKS entry to a string, as a profiling stage."""
+    with stage(f'render {"+".join(names)}', 'render'):
+        return ''.join(render(sections))
+
+
+@fragments.memoize('document head')
+def render_document_head(date_str):
+    """Render the document from <!DOCTYPE> through the masthead."""
+    return templates().document_head(date=html_escape(date_str))
+
+
+def iter_digest(sections, date_str=None, cache=None):
+    """Yield the complete HTML document from parsed sections, chunk by chunk.
+
+    With a RenderCache and RawSections input, blocks whose section bodies are
+    unchanged since a previous build are spliced in from the cache without
+    being parsed or rendered. Sections that are already escaped (an edition,
+    see EditionSections) are used as they are, and may leave blocks out.
+    """
+    body_hash = getattr(sections, 'body_hash', None)
+    shows = getattr(sections, 'shows', None)
+    if not getattr(sections, 'escaped', False):
+        sections = EscapedSections(sections)
+    fragments.refresh()
 
     if not date_str:
         date_str = datetime.now().strftime('%b %d, %Y')
 
-    # Parse all sections
-    top_devs = parse_top_developments(sections.get('TOP_DEVELOPMENTS', ''))
-    news_subsections = parse_news_section(sections.get('NEWS', ''))
-    publications = parse_items(sections.get('PUBLICATIONS', ''))
-    congressional = parse_items(sections.get('CONGRESSIONAL', ''))
-    business = parse_items(sections.get('BUSINESS', ''))
-    china = parse_items(sections.get('CHINA', ''))
-    macro_trends = sections.get('MACRO_TRENDS', '')
-    calendar = parse_calendar(sections.get('CALENDAR', ''))
-    key_questions = parse_key_questions(sections.get('KEY_QUESTIONS', ''))
-    grantees, no_pubs = parse_grantees(sections.get('GRANTEES', ''))
-    limitations = parse_limitations(sections.get('LIMITATIONS', ''))
-
-    # Build top developments HTML
-    top_devs_html = ''
-    for dev in top_devs:
-        top_devs_html += f'<li style="margin-bottom: 8px;"><strong>{html_escape(dev["title"])}</strong> — {html_escape(dev["summary"])}</li>'
-
-    # Build news section HTML
-    news_html = ''
-    for subsection in news_subsections:
-        news_html += render_subsection_header(subsection['name'])
-        for item in subsection['items']:
-            news_html += render_news_item(item)
-
-    # Build publications HTML
-    pubs_html = ''
-    for item in publications:
-        pubs_html += render_news_item(item)
-
-    # Build congressional HTML
-    cong_html = ''
-    for item in congressional:
-        cong_html += render_news_item(item)
-
-    # Build business HTML
-    biz_html = ''
-    for item in business:
-        biz_html += render_news_item(item)
-
-    # Build china HTML
-    china_html = ''
-    for item in china:
-        china_html += render_news_item(item)
-
-    # Build grantees HTML
-    grantees_html = ''
-    for org in grantees:
-        grantees_html += render_grantee_card(org)
-    grantees_html += render_no_publications(no_pubs)
-
-    # Assemble full HTML
-    html = f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-  <meta charset="UTF-8">
-  <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  <title>Energy & Permitting Daily Digest - {html_escape(date_str)}</title>
-</head>
-<body style="margin: 0; padding: 0; background-color: #faf8f5; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;">
-  <table role="presentation" width="100%" cellpadding="0" cellspacing="0" style="background-color: #faf8f5;">
-    <tr>
-      <td align="center" style="padding: 24px 16px;">
-        <table role="presentation" width="100%" cellpadding="0" cellspacing="0" style="max-width: 640px; background-color: #ffffff; border: 2px solid #1a1a2e; border-radius: 12px; box-shadow: 4px 4px 0 #1a1a2e;">
-
-          <!-- Beta Banner -->
-          <tr>
-            <td style="background-color: #e9c46a; padding: 10px 28px; border-radius: 10px 10px 0 0;">
-              <p style="margin: 0; font-family: 'Courier New', monospace; font-size: 13px; font-weight: 700; color: #1a1a2e; text-align: center;">BETA — This digest is auto-generated and may contain errors</p>
-            </td>
-          </tr>
-
-          <!-- Header -->
-          <tr>
-            <td style="padding: 20px 28px; border-bottom: 2px solid #1a1a2e;">
-              <table role="presentation" width="100%" cellpadding="0" cellspacing="0">
-                <tr>
-                  <td valign="middle" width="52">
-                    <table role="presentation" cellpadding="0" cellspacing="0" border="0" style="width: 44px; height: 44px; background-color: #1a1a2e;">
-                      <tr>
-                        <td align="center" valign="middle" style="font-size: 22px;">⚡</td>
-                      </tr>
-                    </table>
-                  </td>
-                  <td valign="middle" style="padding-left: 12px;">
-                    <p style="margin: 0; font-size: 16px; font-weight: 700; color: #1a1a2e;">Energy & Permitting Daily Digest</p>
-                    <p style="margin: 2px 0 0 0; font-family: 'Courier New', monospace; font-size: 11px; color: #8a8a9a; letter-spacing: 0.05em;">BOTTLENECKS LABS</p>
-                  </td>
-                  <td align="right" valign="middle">
-                    <p style="margin: 0; font-family: 'Courier New', monospace; font-size: 12px; color: #2a9d8f; font-weight: 700;">{html_escape(date_str)}</p>
-                  </td>
-                </tr>
-              </table>
-            </td>
-          </tr>
-
-          <!-- Gradient Bar -->
-          <tr>
-            <td style="height: 4px; background: linear-gradient(90deg, #2a9d8f, #e9c46a);"></td>
-          </tr>
-
-          <!-- Top Developments -->
-          <tr>
-            <td style="padding: 24px 28px;">
-              <table role="presentation" width="100%" cellpadding="0" cellspacing="0" style="background-color: #faf8f5; border-left: 3px solid #2a9d8f; border-radius: 4px;">
-                <tr>
-                  <td style="padding: 16px 20px;">
-                    <p style="margin: 0; font-family: 'Courier New', monospace; font-size: 11px; font-weight: 700; text-transform: uppercase; letter-spacing: 0.1em; color: #2a9d8f;">Top Developments</p>
-                    <ul style="margin: 12px 0 0 0; padding: 0 0 0 18px; color: #4a4a5a; font-size: 13px; line-height: 1.6;">
-                      {top_devs_html}
-                    </ul>
-                  </td>
-                </tr>
-              </table>
-            </td>
-          </tr>
-
-          <!-- News & Statements -->
-          {render_section_header('News & Statements')}
-          {news_html}
-          {render_section_divider()}
-
-          <!-- Publications -->
-          {render_section_header('Publications')}
-          {pubs_html}
-          {render_section_divider()}
-
-          <!-- Congressional & Executive Activity -->
-          {render_section_header('Congressional & Executive Activity')}
-          {cong_html}
-          {render_section_divider()}
-
-          <!-- Business Activity -->
-          {render_section_header('Business Activity')}
-          {biz_html}
-          {render_section_divider()}
-
-          <!-- China -->
-          {render_section_header('China')}
-          {china_html}
-          {render_section_divider()}
-
-          <!-- Macro Trends -->
-          {render_section_header('Macro Trends')}
-          {render_macro_trends(macro_trends)}
-          {render_section_divider()}
-
-          <!-- What to Watch -->
-          {render_section_header('What to Watch This Week')}
-          {render_calendar_table(calendar)}
-          {render_key_questions(key_questions)}
-          {render_section_divider()}
-
-          <!-- Grantee Activities -->
-          {render_section_header('Grantee Activities')}
-          {grantees_html}
-          {render_section_divider()}
-
-          <!-- Limitations -->
-          {render_section_header('Limitations & Gaps')}
-          {render_limitations(limitations)}
-
-          <!-- Footer -->
-          <tr>
-            <td style="background-color: #1a1a2e; padding: 20px 28px; border-top: 3px solid #e9c46a; border-radius: 0 0 10px 10px;">
-              <p style="margin: 0; font-size: 13px; color: #faf8f5; text-align: center; font-weight: 500;">Compiled by Bottlenecks Labs</p>
-              <p style="margin: 6px 0 0 0; font-size: 11px; color: #8a8a9a; text-align: center;">News: 72 hrs · Publications & Grantees: 7 days · Strict cutoffs</p>
-            </td>
-          </tr>
-
-        </table>
-      </td>
-    </tr>
-  </table>
-</body>
-</html>'''
-
-    return html
+    yield render_document_head(date_str)
+
+    for names, render in DIGEST_BLOCKS:
+        if shows is not None and not any(shows(name) for name in names):
+            continue
+        hashes = [body_hash(name) for name in names] if cache is not None and body_hash else None
+        if hashes and None not in hashes:   # None: a section that is never cached
+            key = cache.key(names, hashes)
+            chunks = cache.read(key)
+            if _profiler is not None:
+                _profiler.count('render cache hits' if chunks is not None else 'render cache misses')
+            if chunks is None:
+                # Written to the cache entry as it streams out
+                rendered = render(sections) if _profiler is None else (render_block(names, render, sections),)
+                chunks = cache.tee(key, rendered)
+            yield from chunks
+        elif _profiler is None:
+            yield from render(sections)
+        else:
+            yield render_block(names, render, sections)
+
+    yield templates().document_footer()
+
+
+def render_digest(sections, out, date_str=None, cache=None, compactor=None):
+    """Write the HTML document to a file-like object as it is rendered.
+
+    If a Compactor is given, the stream is compacted on the way out.
+    Returns the number of characters written.
+    """
+    chunks = iter_digest(sections, date_str, cache)
+    if compactor is not None:
+        chunks = compactor(chunks)
+    written = 0
+    for chunk in chunks:
+        if _profiler is None:
+            out.write(chunk)
+        else:
+            with _profiler.stage('write', 'write'):
+                out.write(chunk)
+            _profiler.count('output bytes', len(chunk.encode()))
+        written += len(chunk)
+    return written
+
+
+def build_html(sections, date_str=None):
+    """Build the complete HTML document from parsed sections (see parse_content)."""
+    return ''.join(iter_digest(sections, date_str))
 
 
 # =============================================================================
-# MAIN
+# COMPACT OUTPUT
 # =============================================================================
-def main():
-    parser = argparse.ArgumentParser(description='Build Energy Digest HTML from structured content')
-    parser.add_argument('input', nargs='?', help='Input file (or stdin if not provided)')
-    parser.add_argument('-o', '--output', help='Output HTML file')
-    parser.add_argument('-d', '--date', help='Date string (default: today)')
-    args = parser.parse_args()
+# Email clients (Gmail especially) clip messages over ~102 KB. The Compactor
+# rewrites the rendered stream into an equivalent, smaller document: comments
+# and indentation are dropped, inline styles use the shortest equivalent
+# declarations and colours, and attributes that restate defaults are removed.
+# Table attributes email clients rely on (cellpadding, cellspacing, role,
+# width) are kept. The markup contains no <pre>, <textarea> or <script>, so
+# whitespace in text can always be collapsed.
+_TAG_RE = re.compile(r'<[^>]*>')
+_TAG_PARTS_RE = re.compile(r'<(/?)([a-zA-Z][\w-]*)(.*?)(/?)>$', re.S)
+_ATTR_RE = re.compile(r'([^\s=/>]+)(?:\s*=\s*("[^"]*"|\'[^\']*\'|[^\s>]+))?')
+_HEX_RE = re.compile(r'#([0-9a-f])\1([0-9a-f])\2([0-9a-f])\3(?![0-9a-f])', re.I)
+_ZERO_UNIT_RE = re.compile(r'(?<![\w.])0(?:px|em|rem|pt)(?![\w%])')
+_LEADING_ZERO_RE = re.compile(r'(?<![\w.])0\.(\d)')
+
+INLINE_TAGS = {'a', 'b', 'em', 'i', 'img', 'span', 'strong', 'u'}
+BOX_PROPERTIES = {'margin', 'padding'}
+REDUNDANT_ATTRS = {('table', 'border', '0')}
+
+
+def compact_style(style):
+    """Return the shortest equivalent form of an inline style declaration list."""
+    decls = []
+    for decl in style.split(';'):
+        prop, sep, value = decl.partition(':')
+        prop = prop.strip().lower()
+        if not sep or not prop:
+            continue
+        value = ' '.join(value.split()).replace(', ', ',')
+        value = _HEX_RE.sub(r'#\1\2\3', value)
+        value = _ZERO_UNIT_RE.sub('0', value)
+        value = _LEADING_ZERO_RE.sub(r'.\1', value)
+        if prop in BOX_PROPERTIES and '(' not in value and '!' not in value:
+            parts = value.split(' ')
+            # top right bottom left -> drop values implied by the shorthand
+            if len(parts) == 4 and parts[3] == parts[1]:
+                parts.pop()
+            if len(parts) == 3 and parts[2] == parts[0]:
+                parts.pop()
+            if len(parts) == 2 and parts[1] == parts[0]:
+                parts.pop()
+            value = ' '.join(parts)
+        # Repeated properties are kept: email CSS relies on them as fallbacks
+        decls.append(f'{prop}:{value}')
+    return ';'.join(decls)
+
+
+def compact_tag(tag):
+    """Return a compacted tag, or '' for a droppable comment."""
+    if tag.startswith('<!--'):
+        return tag if tag.startswith('<!--[if') else ''
+    m = _TAG_PARTS_RE.match(tag)
+    if not m:
+        return ' '.join(tag.split())
+    close, name, attrs, self_close = m.groups()
+    name = name.lower()
+    if close:
+        return f'</{name}>'
+
+    out = [name]
+    seen = set()
+    for am in _ATTR_RE.finditer(attrs):
+        attr, value = am.group(1).lower(), am.group(2)
+        if attr in seen:
+            continue  # browsers keep the first of duplicated attributes
+        seen.add(attr)
+        if value is None:
+            out.append(attr)
+            continue
+        if value[0] in '"\'':
+            value = value[1:-1]
+        if (name, attr, value) in REDUNDANT_ATTRS:
+            continue
+        if attr == 'style':
+            value = compact_style(value)
+            if not value:
+                continue
+        quote = "'" if '"' in value else '"'
+        out.append(f'{attr}={quote}{value}{quote}')
+    return f'<{" ".join(out)}{self_close}>'
+
+
+def _tag_name(tag):
+    m = _TAG_PARTS_RE.match(tag)
+    return m.group(2).lower() if m else ''
+
+
+class Compactor:
+    """Streaming HTML compactor; call it on a chunk iterator to compact it.
+
+    Counts encoded bytes before (bytes_in) and after (bytes_out) compaction.
+    """
+
+    def __init__(self):
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._prev_tag = ''
+
+    def __call__(self, chunks):
+        pending = ''
+        for chunk in chunks:
+            self.bytes_in += len(chunk.encode())
+            pending += chunk
+            # Only complete tags are compacted; the tail waits for more input
+            end = pending.rfind('>') + 1
+            if end:
+                out = self._compact(pending[:end])
+                pending = pending[end:]
+                if out:
+                    self.bytes_out += len(out.encode())
+                    yield out
+        if pending:
+            out = ' '.join(pending.split())
+            self.bytes_out += len(out.encode())
+            yield out
+
+    def _compact(self, html):
+        parts = []
+        pos = 0
+        for m in _TAG_RE.finditer(html):
+            text = html[pos:m.start()]
+            if text:
+                if not text.isspace():
+                    parts.append(re.sub(r'\s+', ' ', text))
+                elif self._prev_tag in INLINE_TAGS or _tag_name(m.group()) in INLINE_TAGS:
+                    parts.append(' ')  # whitespace between inline elements renders
+            tag = compact_tag(m.group())
+            if tag:
+                parts.append(tag)
+                self._prev_tag = _tag_name(tag)
+            pos = m.end()
+        return ''.join(parts)
+
+    def report(self):
+        """Return a one-line before/after size summary."""
+        saved = self.bytes_in - self.bytes_out
+        pct = 100 * saved / self.bytes_in if self.bytes_in else 0
+        return f"Compact: {self.bytes_in:,} -> {self.bytes_out:,} bytes (-{pct:.1f}%)"
 
-    # Read input
-    if args.input:
-        with open(args.input, 'r') as f:
-            content = f.read()
+
+# =============================================================================
+# SIZE BUDGET
+# =============================================================================
+# plan_budget() fits a digest under a byte budget before it is rendered, so
+# the document is still produced in a single pass. Sizes come from the parsed
+# model: the chrome is measured once with every item card removed, and each
+# card is sized as a blank card plus its escaped fields, which is exact because
+# the card template is a plain concatenation. For compacted output every piece
+# is measured compacted instead: each card is rendered and run through its own
+# Compactor, which adds up because cards start and end on block-level tags.
+# Degradation is deterministic,
+# each step running over items in reverse document order until the digest
+# fits: shorten low summaries, then drop low items, then medium items.
+# TOP_DEVELOPMENTS and high items are always kept.
+ITEM_SECTIONS = ('NEWS', 'PUBLICATIONS', 'CONGRESSIONAL', 'BUSINESS', 'CHINA')
+SHORT_SUMMARY_CHARS = 160
+
+
+def _utf8_len(text):
+    return len(text.encode())
+
+
+def shorten_summary(summary, limit=SHORT_SUMMARY_CHARS):
+    """Cut a summary at a word boundary to about `limit` characters."""
+    if len(summary) <= limit:
+        return summary
+    return summary[:limit].rsplit(' ', 1)[0].rstrip(',;:') + '…'
+
+
+class BudgetedSections(Mapping):
+    """A view of parsed sections with some items shortened or left out."""
+
+    def __init__(self, sections, shorten, drop):
+        self.sections = sections
+        self.shorten = shorten    # {(section, index)} of items to shorten
+        self.drop = drop          # {(section, index)} of items to leave out
+        self.omitted = Counter(name for name, _ in drop)
+
+    def _filter(self, name, items, start=0):
+        kept = []
+        for i, item in enumerate(items, start):
+            if (name, i) in self.drop:
+                continue
+            if (name, i) in self.shorten:
+                item = item.replace(summary=shorten_summary(item['summary']))
+            kept.append(item)
+        return kept
+
+    def __getitem__(self, name):
+        value = self.sections[name]
+        if name == 'NEWS':
+            subsections, start = [], 0
+            for sub in value:
+                items = self._filter(name, sub['items'], start)
+                start += len(sub['items'])
+                if items:
+                    subsections.append(Subsection(sub['name'], items))
+            return subsections
+        if name in ITEM_SECTIONS:
+            return self._filter(name, value)
+        return value
+
+    def __contains__(self, name):
+        return name in self.sections
+
+    def __iter__(self):
+        return iter(self.sections)
+
+    def __len__(self):
+        return len(self.sections)
+
+
+def plan_budget(sections, max_bytes, date_str=None, compact=False):
+    """Choose items to shorten or drop so the digest fits in `max_bytes`
+    (of compacted output, if `compact`).
+
+    Returns (BudgetedSections, estimated size in bytes).
+    """
+    fragments.refresh()
+    if compact:
+        escaped = EscapedSections({})
+
+        def measure(html):
+            return sum(_utf8_len(chunk) for chunk in Compactor()((html,)))
+
+        def card_size(item, summary=None):
+            if summary is not None:
+                item = item.replace(summary=summary)
+            return measure(render_news_item(escaped.item(item)))
     else:
-        content = sys.stdin.read()
+        measure = _utf8_len
+        blank = _utf8_len(render_news_item(new_item()))
+
+        def card_size(item, summary=None):
+            return (blank + _utf8_len(render_tags(item['tags']))
+                    + sum(_utf8_len(html_escape(item[f])) for f in ('title', 'source', 'date', 'url'))
+                    + _utf8_len(html_escape(item['summary'] if summary is None else summary)))
+
+    # Every droppable card as (key, significance, size, shortened size, subsection)
+    cards = []
+    news_headers = {}
+    for name in ITEM_SECTIONS:
+        value = section(sections, name)
+        if name == 'NEWS':
+            news_headers = {j: measure(render_subsection_header(html_escape(sub['name'])))
+                            for j, sub in enumerate(value)}
+            groups = list(enumerate(sub['items'] for sub in value))
+        else:
+            groups = [(None, value)]
+        i = 0
+        for j, items in groups:
+            for item in items:
+                sig = item['significance'] if item['significance'] in ('high', 'low') else 'medium'
+                short = card_size(item, shorten_summary(item['summary'])) if sig == 'low' else None
+                cards.append(((name, i), sig, card_size(item), short, j))
+                i += 1
+
+    # Chrome: everything except the cards and the (empty-dropping) NEWS headers
+    chrome = {name: section(sections, name) for name in sections}
+    chrome.update({name: [] for name in ITEM_SECTIONS})
+    chunks = iter_digest(chrome, date_str)
+    total = sum(_utf8_len(chunk) for chunk in (Compactor()(chunks) if compact else chunks))
+    total += sum(size for _, _, size, _, _ in cards)
+    live = Counter(j for key, _, _, _, j in cards if key[0] == 'NEWS')
+    total += sum(size for j, size in news_headers.items() if live[j])
+
+    shorten, drop = set(), set()
+    sizes = {key: size for key, _, size, _, _ in cards}
+    omitted = Counter()
+
+    def note(count):
+        return measure(render_omitted_note(count)) if count else 0
+
+    for step in ('shorten low', 'drop low', 'drop medium'):
+        action, sig = step.split()
+        for key, card_sig, _, short, j in reversed(cards):
+            if total <= max_bytes:
+                break
+            if card_sig != sig or key in drop:
+                continue
+            if action == 'shorten':
+                total -= sizes[key] - short
+                sizes[key] = short
+                shorten.add(key)
+                continue
+            name = key[0]
+            drop.add(key)
+            total -= sizes[key]
+            total += note(omitted[name] + 1) - note(omitted[name])
+            omitted[name] += 1
+            if name == 'NEWS':
+                live[j] -= 1
+                if not live[j]:
+                    total -= news_headers[j]
+
+    return BudgetedSections(sections, shorten, drop), total
+
+
+def budget_report(view, estimate, max_bytes):
+    """Return a one-line summary of what plan_budget did."""
+    line = (f"Budget: {estimate:,} / {max_bytes:,} bytes, {len(view.shorten)} summaries shortened, "
+            f"{len(view.drop)} items omitted")
+    if estimate > max_bytes:
+        line += ' (over budget: only top developments and high items remain)'
+    return line
 
-    # Parse and build
-    sections = parse_content(content)
-    html = build_html(sections, args.date)
 
-    # Output
-    if args.output:
-        with open(args.output, 'w') as f:
+# =============================================================================
+# RENDER CACHE
+# =============================================================================
+CACHE_DIR = Path(__file__).parent / '.digest-cache'
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_READ_CHARS = 64 * 1024    # blocks are streamed in and out in chunks, never joined
+
+
+def renderer_hash():
+    """Hash this module's source, template fragments and brand constants (part of every cache key)."""
+    h = hashlib.sha256(Path(__file__).read_bytes())
+    h.update(TEMPLATE_PATH.read_bytes())
+    h.update(repr((COLORS, TAG_COLORS)).encode())
+    return h.hexdigest()
+
+
+class RenderCache:
+    """On-disk LRU cache of rendered document blocks (see DIGEST_BLOCKS).
+
+    Keys combine the hashes of a block's section bodies with a hash of this
+    module's source and the brand constants, so changing the renderer or
+    COLORS/TAG_COLORS invalidates every entry. Recency is tracked by file
+    mtime, bumped on each hit; least recently used entries are evicted once
+    the cache exceeds max_bytes.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+        self.renderer_hash = renderer_hash()
+
+    def key(self, names, hashes):
+        """Return the cache key for a block rendered from the given sections."""
+        h = hashlib.sha256(self.renderer_hash.encode())
+        for name, digest in zip(names, hashes):
+            h.update(f'\0{name}\0{digest}'.encode())
+        return h.hexdigest()
+
+    def get(self, key):
+        """Return the cached HTML for `key`, or None on a miss."""
+        path = self.dir / f'{key}.html'
+        try:
+            html = path.read_text()
+            os.utime(path)  # mark as recently used
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return html
+
+    def put(self, key, html):
+        """Store rendered HTML under `key`, evicting old entries if over the cap."""
+        with atomic_write(self.dir / f'{key}.html') as f:
             f.write(html)
-        print(f"Wrote: {args.output}")
+        self._stored(len(html.encode()))
+
+    def read(self, key):
+        """Return an iterator over the cached HTML for `key` in chunks, or None on a miss."""
+        path = self.dir / f'{key}.html'
+        try:
+            f = open(path, 'r')
+            os.utime(path)  # mark as recently used
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._chunks(f)
+
+    @staticmethod
+    def _chunks(f):
+        with f:
+            while chunk := f.read(CACHE_READ_CHARS):
+                yield chunk
+
+    def tee(self, key, chunks):
+        """Yield `chunks` while storing them under `key`; nothing is stored
+        unless they are all consumed."""
+        path = self.dir / f'{key}.html'
+        with atomic_write(path) as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+        self._stored(path.stat().st_size)
+
+    def _stored(self, size):
+        if self._size is None:
+            self.evict()
+        else:
+            self._size += size
+            if self._size > self.max_bytes:
+                self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for path in self.dir.glob('*.html'):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self._size = total
+
+
+class MemoryRenderCache(RenderCache):
+    """In-process LRU variant of RenderCache for long-lived processes (--watch)."""
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.renderer_hash = renderer_hash()
+        self._entries = OrderedDict()
+        self._size = 0
+
+    def get(self, key):
+        html = self._entries.get(key)
+        if html is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return html
+
+    def put(self, key, html):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._entries[key] = html
+        self._size += len(html)
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def read(self, key):
+        html = self.get(key)
+        return None if html is None else iter((html,))
+
+    def tee(self, key, chunks):
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        self.put(key, ''.join(parts))
+
+    def evict(self):
+        pass  # put() keeps the cache within max_bytes
+
+
+# =============================================================================
+# OUTPUT
+# =============================================================================
+DIGESTS_DIR = Path(__file__).parent / 'digests'
+
+_DATE_RE = re.compile(r'(\d{4}-\d{2}-\d{2})')
+
+
+@contextmanager
+def atomic_write(path, mode='w'):
+    """Open a temp file next to `path` for writing; rename it into place on success."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp, 0o666 & ~umask)  # mkstemp creates files 0600
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def write_digest(sections, output_path, date_str=None, cache=None, compactor=None, stories=True,
+                 signatures=None):
+    """Render to `output_path` atomically and record it in that directory's manifest
+    (and its items in the story index, if `stories`, reusing any StorySignatures
+    already computed for this build).
+
+    Returns the number of characters written.
+    """
+    with stage('output'), atomic_write(output_path) as f:
+        written = render_digest(sections, f, date_str, cache, compactor)
+    with stage('archive'):
+        entry = archive_entry(output_path, sections)
+        Archive(Path(output_path).parent).record([entry])
+        if entry and stories:
+            StoryIndex(Path(output_path).parent).record(entry['date'], story_fingerprints(sections, signatures))
+    return written
+
+
+def digest_path(date, out_dir=DIGESTS_DIR):
+    """Return the output path for a digest dated `date` (a datetime)."""
+    return Path(out_dir) / f'energy-digest-{date.strftime("%Y-%m-%d")}.html'
+
+
+def build_file(input_path, output_path, date_str=None, compact=False, max_bytes=None):
+    """Parse and render one content file to `output_path` atomically.
+
+    Returns (output_path, characters written, seconds taken, archive entry,
+    story fingerprints).
+    """
+    start = time.perf_counter()
+    with open(input_path, 'r') as f:
+        sections = parse_content(f)
+    if max_bytes:
+        sections, _ = plan_budget(sections, max_bytes, date_str, compact)
+    with atomic_write(output_path) as out:
+        written = render_digest(sections, out, date_str, compactor=Compactor() if compact else None)
+    entry = archive_entry(output_path, sections)
+    return str(output_path), written, time.perf_counter() - start, entry, story_fingerprints(sections)
+
+
+# =============================================================================
+# EDITIONS
+# =============================================================================
+# An editions file names per-audience variants of the digest, each a set of
+# filters over the same content (JSON; omitted filters match everything):
+#
+#   {"full": {},
+#    "nuclear": {"tags": ["Nuclear"]},
+#    "grid": {"tags": ["Grid", "Storage"], "significance": ["high", "medium"]},
+#    "brief": {"sections": ["TOP_DEVELOPMENTS", "NEWS", "CALENDAR", "KEY_QUESTIONS"]}}
+#
+# An item is kept if it has any of the edition's tags (TAG_COLORS names) and
+# one of its significances (unset counts as medium, as in the size budget).
+# "sections" lists the sections shown; an item section the filters leave
+# empty is not shown either. The content is parsed and escaped once, and every
+# item card rendered once, by CardSections. Each edition is then a filtered
+# view of those cards (EditionSections); blocks without items are rendered
+# for the first edition that shows them and spliced into the rest, so another
+# edition costs its filtering and the final join.
+EDITIONS_DIR = DIGESTS_DIR / 'editions'
+_EDITION_NAME_RE = re.compile(r'[\w-]+$')    # also its output directory
+
+Edition = namedtuple('Edition', 'name tags significance sections')
+
+
+def edition_vocabularies():
+    """Return {filter: allowed values} for editions files."""
+    return {'tags': tuple(TAG_COLORS),
+            'significance': tuple(s.value for s in Significance if s.value),
+            'sections': tuple(SECTION_PARSERS)}
+
+
+def load_editions(path):
+    """Read an editions file into a list of Edition; raises ValueError if malformed."""
+    with open(path, 'r') as f:
+        try:
+            config = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"not valid JSON ({e})") from None
+    if not isinstance(config, dict) or not config:
+        raise ValueError('expected an object mapping edition names to their filters')
+    vocabularies = edition_vocabularies()
+    editions = []
+    for name, filters in config.items():
+        if not _EDITION_NAME_RE.match(name):
+            raise ValueError(f"edition {name!r}: names may only use letters, digits, _ and -")
+        if not isinstance(filters, dict):
+            raise ValueError(f"edition {name!r}: expected an object of filters")
+        unknown = set(filters) - set(vocabularies)
+        if unknown:
+            raise ValueError(f"edition {name!r}: unknown filter {', '.join(sorted(unknown))} "
+                             f"(filters: {', '.join(vocabularies)})")
+        values = {}
+        for key, allowed in vocabularies.items():
+            value = filters.get(key)
+            if value is None:
+                values[key] = None
+                continue
+            if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+                raise ValueError(f"edition {name!r}: {key} must be a list of strings")
+            bad = [v for v in value if v not in allowed]
+            if bad:
+                raise ValueError(f"edition {name!r}: unknown {key} {', '.join(map(repr, bad))} "
+                                 f"(one of {', '.join(allowed)})")
+            values[key] = frozenset(value)
+        editions.append(Edition(name, **values))
+    return editions
+
+
+def edition_keeps(edition, item):
+    """Return whether an item passes an edition's tag and significance filters."""
+    if edition.tags is not None and edition.tags.isdisjoint(item['tags']):
+        return False
+    sig = item['significance'] if item['significance'] in ('high', 'low') else 'medium'
+    return edition.significance is None or str(sig) in edition.significance
+
+
+class CardSections(EscapedSections):
+    """EscapedSections with every item rendered to its card, once, for all editions."""
+
+    escaped = True
+
+    def escape(self, name, value):
+        value = super().escape(name, value)
+        if name == 'NEWS':
+            return [Subsection(sub['name'], [render_news_item(item) for item in sub['items']])
+                    for sub in value]
+        if name in ITEM_SECTIONS:
+            return [render_news_item(item) for item in value]
+        return value
+
+
+class EditionSections(BudgetedSections):
+    """One edition's view of CardSections: the sections it shows, with its items' cards.
+
+    `items` are the content's ((section, index), item) pairs (iter_keyed_items),
+    shared by every edition.
+    """
+
+    escaped = True
+
+    def __init__(self, cards, edition, items):
+        drop = set()
+        self.kept = Counter()
+        for key, item in items:
+            if edition_keeps(edition, item):
+                self.kept[key[0]] += 1
+            else:
+                drop.add(key)
+        super().__init__(cards, set(), drop)
+        self.emptied = {name for name in self.omitted if not self.kept[name]}
+        self.omitted = Counter()    # filtered out, not cut for size: no note
+        self.edition = edition
+
+    def shows(self, name):
+        """Return whether the edition shows section `name`."""
+        if self.edition.sections is not None and name not in self.edition.sections:
+            return False
+        return name not in self.emptied
+
+    def body_hash(self, name):
+        """Sections other than items render the same in every edition of one content
+        that shows them, so within write_editions' cache they are keyed by whether
+        they are shown; item sections are never cached."""
+        if name in ITEM_SECTIONS:
+            return None
+        return 'shown' if self.shows(name) else 'hidden'
+
+    def __contains__(self, name):
+        return name in self.sections and self.shows(name)
+
+    def __iter__(self):
+        return (name for name in self.sections if self.shows(name))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+def write_editions(sections, editions, out_dir=EDITIONS_DIR, date_str=None, compact=False):
+    """Render every edition of parsed sections to <out_dir>/<edition>/, each
+    recorded in that directory's manifest.
+
+    Editions record no stories: every item in them is also in the full digest.
+    Returns [(edition, output path, characters written, items kept, Compactor or None)].
+    """
+    # Parsed once for the filters and cards alike: large inputs are mapped,
+    # with items parsed each time they are read
+    sections = {name: [Subsection(sub['name'], list(sub['items'])) for sub in value] if name == 'NEWS'
+                else list(value) if name in ITEM_SECTIONS else value
+                for name, value in sections.items()}
+    items = list(iter_keyed_items(sections))
+    cards = CardSections(sections)
+    shared = MemoryRenderCache()
+    results = []
+    for edition in editions:
+        with stage(f'edition {edition.name}'):
+            view = EditionSections(cards, edition, items)
+            output_path = digest_path(datetime.now(), Path(out_dir) / edition.name)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            compactor = Compactor() if compact else None
+            written = write_digest(view, output_path, date_str, shared, compactor, stories=False)
+        results.append((edition, output_path, written, sum(view.kept.values()), compactor))
+    return results
+
+
+# =============================================================================
+# ARCHIVE
+# =============================================================================
+# Each digests directory keeps a manifest.json indexing its digests by date
+# (path, HTML content hash, sizes, item counts). It is rewritten atomically on
+# every build, so "latest" and date lookups read only the manifest instead of
+# listing files (whose mtimes are meaningless after a fresh checkout). Older
+# digests can be stored gzip- or xz-compressed; lookups transparently follow.
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+COMPRESSORS = {'gz': gzip.open, 'xz': lzma.open}
+
+_DIGEST_NAME_RE = re.compile(r'energy-digest-(\d{4}-\d{2}-\d{2})\.html(?:\.(gz|xz))?$')
+
+
+def file_sha256(path, opener=open):
+    """Return (hex sha256, byte size) of a file's (decompressed) contents."""
+    h = hashlib.sha256()
+    size = 0
+    with opener(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            h.update(block)
+            size += len(block)
+    return h.hexdigest(), size
+
+
+def archive_entry(path, sections=None):
+    """Describe a freshly written digest for the manifest (None if not an archive name)."""
+    path = Path(path)
+    m = _DIGEST_NAME_RE.match(path.name)
+    if not m or m.group(2):
+        return None
+    digest, size = file_sha256(path)
+    return {
+        'date': m.group(1),
+        'path': path.name,
+        'sha256': digest,
+        'bytes': size,
+        'stored_bytes': size,
+        'compression': None,
+        'items': count_items(sections) if sections is not None else None,
+        'built': datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+class Archive:
+    """A digests directory and its manifest."""
+
+    def __init__(self, directory=DIGESTS_DIR):
+        self.dir = Path(directory)
+        self.manifest_path = self.dir / MANIFEST_NAME
+
+    def load(self):
+        """Return {date: entry} from the manifest ({} if there is none)."""
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)['digests']
+        except FileNotFoundError:
+            return {}
+
+    def save(self, entries):
+        """Atomically replace the manifest with `entries`."""
+        manifest = {'version': MANIFEST_VERSION,
+                    'digests': dict(sorted(entries.items()))}
+        with atomic_write(self.manifest_path) as f:
+            json.dump(manifest, f, indent=1)
+            f.write('\n')
+
+    def record(self, new_entries):
+        """Add or replace entries (as built by archive_entry) in the manifest."""
+        new_entries = [e for e in new_entries if e]
+        if not new_entries:
+            return
+        entries = self.load()
+        for entry in new_entries:
+            entries[entry['date']] = {k: v for k, v in entry.items() if k != 'date'}
+        self.save(entries)
+
+    def latest(self):
+        """Return (date, entry) of the most recent digest, or None."""
+        entries = self.load()
+        if not entries:
+            return None
+        date = max(entries)
+        return date, entries[date]
+
+    def get(self, date):
+        """Return the entry for a YYYY-MM-DD date, or None."""
+        return self.load().get(date)
+
+    def since(self, date=None):
+        """Return [(date, entry)] on or after `date`, oldest first."""
+        return [(d, e) for d, e in sorted(self.load().items()) if date is None or d >= date]
+
+    def path(self, entry):
+        """Return the stored file path for an entry."""
+        return self.dir / entry['path']
+
+    def read(self, entry):
+        """Return the HTML of an entry, decompressing if needed."""
+        opener = COMPRESSORS.get(entry.get('compression'), open)
+        with opener(self.path(entry), 'rt') as f:
+            return f.read()
+
+    def compress(self, older_than=7, fmt='gz'):
+        """Compress digests more than `older_than` days older than the latest.
+
+        The latest digest is never compressed. Returns the dates compressed.
+        """
+        entries = self.load()
+        if not entries:
+            return []
+        latest = max(entries)
+        cutoff = datetime.strptime(latest, '%Y-%m-%d').toordinal() - older_than
+        done, originals = [], []
+        for date, entry in entries.items():
+            if date == latest or entry.get('compression'):
+                continue
+            if datetime.strptime(date, '%Y-%m-%d').toordinal() > cutoff:
+                continue
+            src = self.path(entry)
+            dest = src.with_name(src.name + '.' + fmt)
+            with open(src, 'rb') as f, atomic_write(dest, 'wb') as raw:
+                with COMPRESSORS[fmt](raw, 'wb') as out:
+                    for block in iter(lambda: f.read(1 << 16), b''):
+                        out.write(block)
+            entry.update(path=dest.name, compression=fmt, stored_bytes=dest.stat().st_size)
+            originals.append(src)
+            done.append(date)
+        if done:
+            self.save(entries)  # manifest first, so it never points at a missing file
+            for src in originals:
+                src.unlink()
+        return done
+
+    def index(self):
+        """Rebuild the manifest from the files on disk, keeping known item counts."""
+        known = self.load()
+        entries = {}
+        for path in sorted(self.dir.iterdir()):
+            m = _DIGEST_NAME_RE.match(path.name)
+            if not m:
+                continue
+            date, fmt = m.groups()
+            if date in entries and not fmt:
+                continue  # prefer the uncompressed copy if both exist
+            digest, size = file_sha256(path, COMPRESSORS.get(fmt, open))
+            old = known.get(date, {})
+            entries[date] = {
+                'path': path.name,
+                'sha256': digest,
+                'bytes': size,
+                'stored_bytes': path.stat().st_size,
+                'compression': fmt,
+                'items': old.get('items') if old.get('sha256') == digest else None,
+                'built': old.get('built'),
+            }
+        self.save(entries)
+        return entries
+
+
+def archive_main(argv):
+    """`build_digest.py archive ...`: query and maintain the manifest."""
+    parser = argparse.ArgumentParser(prog='build_digest.py archive',
+                                     description='Query and maintain the digest archive manifest')
+    parser.add_argument('--dir', default=str(DIGESTS_DIR), help='Archive directory (default: digests/)')
+    sub = parser.add_subparsers(dest='action', required=True)
+    for name, help_text in (('latest', 'Print the path of the most recent digest'),
+                            ('get', 'Print the path of the digest for a date')):
+        p = sub.add_parser(name, help=help_text)
+        if name == 'get':
+            p.add_argument('date', help='YYYY-MM-DD')
+        p.add_argument('--content', action='store_true', help='Print the (decompressed) HTML instead')
+    p = sub.add_parser('list', help='List archived digests')
+    p.add_argument('--since', metavar='YYYY-MM-DD', help='Only digests on or after this date')
+    p = sub.add_parser('compress', help='Compress older digests in place')
+    p.add_argument('--older-than', type=int, default=7, metavar='DAYS',
+                   help='Compress digests this many days older than the latest (default: 7)')
+    p.add_argument('--format', choices=sorted(COMPRESSORS), default='gz')
+    sub.add_parser('index', help='Rebuild the manifest from the files on disk')
+    p = sub.add_parser('backfill', help='Parse archived HTML back into the story index and item counts')
+    p.add_argument('-j', '--jobs', type=int, help='Worker processes (default: CPU count)')
+    p.add_argument('--models', metavar='DIR', help="Also write each digest's JSON model to DIR")
+    p.add_argument('--force', action='store_true', help='Re-parse digests already in the story index')
+    args = parser.parse_args(argv)
+
+    archive = Archive(args.dir)
+    if args.action in ('latest', 'get'):
+        if args.action == 'latest':
+            found = archive.latest()
+            entry = found[1] if found else None
+        else:
+            entry = archive.get(args.date)
+        if entry is None:
+            print('No matching digest in the archive manifest', file=sys.stderr)
+            return 1
+        if args.content:
+            sys.stdout.write(archive.read(entry))
+        else:
+            print(archive.path(entry))
+    elif args.action == 'list':
+        for date, entry in archive.since(args.since):
+            counts = entry.get('items')
+            items = '?' if counts is None else sum(counts.values())   # `archive backfill` fills it in
+            print(f"{date}  {entry['bytes']:>9,} B  {entry['stored_bytes']:>9,} stored  "
+                  f"{items:>4} items  {entry['path']}")
+    elif args.action == 'compress':
+        dates = archive.compress(args.older_than, args.format)
+        print(f"Compressed {len(dates)} digest(s)" + (f": {', '.join(dates)}" if dates else ''))
+    elif args.action == 'index':
+        print(f"Indexed {len(archive.index())} digest(s) in {archive.manifest_path}")
+    elif args.action == 'backfill':
+        start = time.perf_counter()
+        dates = backfill(archive, args.jobs, args.models, args.force)
+        print(f"Back-parsed {len(dates)} digest(s) in {time.perf_counter() - start:.2f}s"
+              + (f": {dates[0]} .. {dates[-1]}" if dates else ''))
+    return 0
+
+
+# =============================================================================
+# MERGE
+# =============================================================================
+# `merge` combines partial content files (research jobs that each wrote only
+# some sections or ##SUBSECTION: blocks) into one canonical content document.
+# Sections come out in SECTION_PARSERS order (unknown ones after, by name);
+# entries are concatenated in input order. An entry whose normalised URL or
+# title was already seen in that section is dropped, and reported as a
+# conflict if any of its fields differ from the one kept. Merging reads and
+# writes only the given files, so it can be run against local fixtures.
+_WORD_RE = re.compile(r'\w+')
+
+
+def title_key(text):
+    """Normalise a title for duplicate detection: casefolded words only."""
+    return ' '.join(_WORD_RE.findall(text.casefold()))
+
+
+def url_key(url):
+    """Normalise a URL for duplicate detection ('' if there is none)."""
+    url = url.strip()
+    if not url or url == '#':
+        return ''
+    parts = urlsplit(url if '//' in url else '//' + url)
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    return host + parts.path.rstrip('/') + ('?' + parts.query if parts.query else '')
+
+
+def entry_keys(name, entry):
+    """Return the duplicate-detection keys of one entry of section `name`."""
+    if isinstance(entry, str):
+        return (title_key(entry),)
+    if name == 'CALENDAR':
+        return (title_key(entry['date'] + ' ' + entry['event']),)
+    return (url_key(entry.get('url', '')), title_key(entry.get('title', '')))
+
+
+def entry_label(entry):
+    if isinstance(entry, str):
+        return entry
+    return entry.get('title') or entry.get('event') or entry.get('name', '')
+
+
+class ContentMerge:
+    """Accumulates parsed partial content files into one set of sections."""
+
+    def __init__(self):
+        self.sections = {}
+        self.seen = {}        # (section, key) -> (source, entry)
+        self.no_pubs = {}     # casefolded org name -> name, for GRANTEES
+        self.conflicts = []
+
+    def add(self, sections, source):
+        """Merge every section of one parsed partial file."""
+        for name in sections:
+            value = sections[name]
+            parse = SECTION_PARSERS.get(name, parse_text)
+            if name == 'NEWS':
+                merged = self.sections.setdefault(name, {})
+                for sub in value:
+                    key = title_key(sub.name)
+                    if key not in merged:
+                        merged[key] = Subsection(sub.name)
+                    for item in sub.items:
+                        self.add_entry(name, merged[key].items, item, source)
+            elif name == 'GRANTEES':
+                orgs, no_pubs = value
+                merged = self.sections.setdefault(name, [])
+                for org in orgs:
+                    self.add_entry(name, merged, org, source)
+                for org in no_pubs:
+                    self.no_pubs.setdefault(org.casefold(), org)
+            elif parse is parse_text:
+                merged = self.sections.setdefault(name, [])
+                for paragraph in re.split(r'\n\s*\n', value):
+                    if paragraph.strip():
+                        self.add_entry(name, merged, paragraph.strip(), source)
+            else:
+                merged = self.sections.setdefault(name, [])
+                for entry in value:
+                    self.add_entry(name, merged, entry, source)
+
+    def add_entry(self, name, merged, entry, source):
+        """Append `entry` unless it duplicates one already kept in `name`."""
+        keys = [(name, key) for key in entry_keys(name, entry) if key]
+        for key in keys:
+            if key in self.seen:
+                kept_source, kept = self.seen[key]
+                if not isinstance(entry, str):
+                    diffs = [f'{field} {kept[field]!s:.40} vs {entry[field]!s:.40}'
+                             for field in kept.keys() if kept[field] != entry[field]]
+                    if diffs:
+                        self.conflicts.append(
+                            f"{name}: {entry_label(entry)!r} in {source} duplicates {kept_source}; "
+                            f"kept the first ({'; '.join(diffs)})")
+                return False
+        merged.append(entry)
+        for key in keys:
+            self.seen[key] = (source, entry)
+        return True
+
+    def result(self):
+        """Return the merged sections, in canonical order, as the parsers would."""
+        order = list(SECTION_PARSERS) + sorted(set(self.sections) - set(SECTION_PARSERS))
+        result = {}
+        for name in order:
+            if name not in self.sections:
+                continue
+            value = self.sections[name]
+            if name == 'NEWS':
+                value = list(value.values())
+            elif name == 'GRANTEES':
+                # An org with a publication in any partial file is not a no-publication org
+                published = {org.name.casefold() for org in value}
+                value = (value, [org for key, org in self.no_pubs.items() if key not in published])
+            elif SECTION_PARSERS.get(name, parse_text) is parse_text:
+                value = '\n\n'.join(value)
+            result[name] = value
+        if 'GRANTEES' not in result and self.no_pubs:
+            result['GRANTEES'] = ([], list(self.no_pubs.values()))
+        return result
+
+
+def format_item(item, head='ITEM:'):
+    """Format an ITEM:/ORG: record as content lines."""
+    lines = [head]
+    for field in item.keys():
+        value = item[field]
+        if field == 'name' or not value:
+            continue
+        if field == 'tags':
+            value = '[' + ', '.join(value) + ']'
+        lines.append(f'{field}: {value}')
+    return '\n'.join(lines)
+
+
+def format_section(name, value):
+    """Format one parsed section back into content text (the parsers' inverse)."""
+    if name == 'TOP_DEVELOPMENTS':
+        return '\n'.join(f"- {d['title']} — {d['summary']}" if d['summary'] else f"- {d['title']}"
+                         for d in value)
+    if name == 'NEWS':
+        return '\n\n'.join(f'##SUBSECTION: {sub.name}' + ''.join('\n\n' + format_item(item)
+                                                                 for item in sub.items)
+                           for sub in value)
+    if name == 'CALENDAR':
+        return '\n'.join(['| Date | Event | Significance |', '|------|-------|--------------|'] +
+                         [f"| {r['date']} | {r['event']} | {r['significance']} |" for r in value])
+    if name == 'GRANTEES':
+        orgs, no_pubs = value
+        blocks = [format_item(org, f'ORG: {org.name}') for org in orgs]
+        if no_pubs:
+            blocks.append('NO_PUBLICATIONS: ' + ', '.join(no_pubs))
+        return '\n\n'.join(blocks)
+    parse = SECTION_PARSERS.get(name, parse_text)
+    if parse is parse_text:
+        return value
+    if parse is parse_items:
+        return '\n\n'.join(format_item(item) for item in value)
+    return '\n'.join(f'- {line}' for line in value)
+
+
+def format_content(sections):
+    """Return a parsed content mapping as canonical content text."""
+    return ''.join(f'==={name}===\n{format_section(name, sections[name])}\n\n'
+                   for name in sections).rstrip('\n') + '\n'
+
+
+def merge_files(paths):
+    """Merge partial content files; return (merged sections, conflict messages)."""
+    merge = ContentMerge()
+    for path in paths:
+        with open(path, 'r') as f:
+            merge.add(parse_content(f.read()), path)
+    return merge.result(), merge.conflicts
+
+
+def merge_main(argv):
+    """`build_digest.py merge`: combine partial content files into one document."""
+    parser = argparse.ArgumentParser(prog='build_digest.py merge',
+                                     description='Merge partial content files into one content document')
+    parser.add_argument('inputs', nargs='+', help='Partial content files, in priority order')
+    parser.add_argument('-o', '--output', default='-', help="Output content file (default: '-' for stdout)")
+    parser.add_argument('--strict', action='store_true', help='Exit with status 2 if any duplicates conflict')
+    args = parser.parse_args(argv)
+
+    try:
+        sections, conflicts = merge_files(args.inputs)
+    except OSError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    text = format_content(sections)
+    if args.output == '-':
+        sys.stdout.write(text)
+    else:
+        with atomic_write(args.output) as f:
+            f.write(text)
+    for conflict in conflicts:
+        print(f"conflict: {conflict}", file=sys.stderr)
+    counts = count_items(sections)
+    print(f"Merged {len(args.inputs)} file(s): {len(sections)} sections, "
+          f"{sum(counts.values())} items, {len(conflicts)} conflict(s)", file=sys.stderr)
+    return 2 if conflicts and args.strict else 0
+
+
+# =============================================================================
+# STORY INDEX
+# =============================================================================
+# Each digests directory keeps stories.jsonl, a fingerprint of every item it
+# has published: normalised URL and a MinHash signature of the title and
+# summary's word pairs. Builds append one line per digest date (a rebuild's
+# line supersedes the earlier one, and superseded lines are compacted away),
+# so the index grows without rescanning old HTML. Lookups are indexed by URL
+# and by LSH band (STORY_BANDS slices of the signature), so checking an item
+# against tens of thousands of earlier stories only compares it with the
+# few that share a band. The same stories also feed an FTS5 full-text index
+# of titles, summaries, sources and tags for `build_digest.py search`.
+# stories.jsonl is derived data and is not committed: digests missing from it
+# (all of them, in a fresh checkout) are back-parsed into it before use.
+STORIES_NAME = 'stories.jsonl'
+STORY_DB_VERSION = 2         # bump when STORY_SCHEMA changes
+STORY_PERMUTATIONS = 32
+STORY_BANDS = 16             # of 2 rows: ~99% recall at 0.5 similarity
+STORY_SIMILARITY = 0.5       # estimated Jaccard of word pairs to count as a repeat
+STORY_SYNC_CHECK = 64 * 1024  # bytes before the synced offset checked for edits
+_STORY_PRIME = (1 << 61) - 1
+_STORY_HASHES = [(random.Random(i).randrange(1, _STORY_PRIME), random.Random(-i).randrange(_STORY_PRIME))
+                 for i in range(1, STORY_PERMUTATIONS + 1)]
+_BAND_CHARS = 8 * STORY_PERMUTATIONS // STORY_BANDS
+
+
+def story_signature(title, summary):
+    """Return the MinHash signature of a story as hex (8 digits per permutation)."""
+    words = _WORD_RE.findall(f'{title} {summary}'.casefold())
+    shingles = {zlib.crc32(' '.join(words[i:i + 2]).encode()) for i in range(max(len(words) - 1, 1))}
+    return ''.join(f'{min((a * x + b) % _STORY_PRIME for x in shingles) & 0xffffffff:08x}'
+                   for a, b in _STORY_HASHES)
+
+
+class StorySignatures(dict):
+    """Per-build memo of story_signature() by (title, summary), shared by the
+    repeat check and the story index so each item is hashed once."""
+
+    def __missing__(self, key):
+        sig = self[key] = story_signature(*key)
+        return sig
+
+    def of(self, item):
+        return self[item['title'], item['summary']]
+
+
+def band_keys(sig):
+    """Return the LSH band keys of a signature: each band's slots, truncated to
+    56 bits, tagged with the band number."""
+    return [int(sig[i:i + _BAND_CHARS][:14], 16) * STORY_BANDS + n
+            for n, i in enumerate(range(0, len(sig), _BAND_CHARS))]
+
+
+def signature_similarity(a, b):
+    """Estimate the Jaccard similarity of two signatures (share of equal slots)."""
+    return sum(a[i:i + 8] == b[i:i + 8] for i in range(0, len(a), 8)) / STORY_PERMUTATIONS
+
+
+def iter_keyed_items(sections):
+    """Yield ((section, index), item) for every item, indexed as BudgetedSections keys them."""
+    for name in ITEM_SECTIONS:
+        if name not in sections:
+            continue
+        value = sections[name]
+        items = (item for sub in value for item in sub['items']) if name == 'NEWS' else value
+        for i, item in enumerate(items):
+            yield (name, i), item
+
+
+def story_fingerprints(sections, signatures=None):
+    """Return every item as stored in the index:
+    [url, signature, title, section, source, tags, summary]."""
+    signatures = StorySignatures() if signatures is None else signatures
+    return [[item['url'], signatures.of(item), item['title'], name,
+             item['source'], ', '.join(item['tags']), item['summary']]
+            for (name, _), item in iter_keyed_items(sections)]
+
+
+class StoryIndex:
+    """The stories.jsonl fingerprint index of a digests directory.
+
+    stories.jsonl is the durable record (plain JSON lines, rebuilt from the
+    archive by restore_story_index when missing); lookups go through a SQLite
+    copy in .digest-cache/ that is brought up to date by reading only the
+    lines appended since it last synced. The copy records the file's size,
+    mtime and a checksum of its last synced bytes, and is rebuilt when the
+    file was changed other than by appending (an edit, a revert, a checkout).
+    """
+
+    def __init__(self, directory=DIGESTS_DIR):
+        self.path = Path(directory) / STORIES_NAME
+        self.key = hashlib.sha1(str(self.path.resolve()).encode()).hexdigest()[:12]
+        self.db_path = CACHE_DIR / f'stories-v{STORY_DB_VERSION}-{self.key}.sqlite'
+        self.db = None
+
+    def connect(self):
+        """Open the lookup database and sync it with stories.jsonl."""
+        if self.db is None:
+            CACHE_DIR.mkdir(exist_ok=True)
+            for old in CACHE_DIR.glob(f'stories-*{self.key}.sqlite'):
+                if old != self.db_path:
+                    old.unlink()
+            self.db = sqlite3.connect(self.db_path)
+            self.db.executescript(STORY_SCHEMA)
+        self.sync()
+        return self.db
+
+    def sync(self):
+        """Ingest lines appended to stories.jsonl since the last sync."""
+        db = self.db
+        meta = dict(db.execute('SELECT key, value FROM meta'))
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            st = None
+        if st is not None and (meta.get('inode'), meta.get('size'), meta.get('mtime')) == \
+                (st.st_ino, st.st_size, st.st_mtime_ns):
+            return  # untouched since the last sync
+        offset, lines = meta.get('offset', 0), meta.get('lines', 0)
+        if st is None or meta.get('inode') != st.st_ino or st.st_size < offset \
+                or meta.get('tail') != self._tail(offset):
+            # New, replaced (compacted), truncated or edited: start over
+            db.execute('DELETE FROM stories')
+            db.execute('DELETE FROM bands')
+            offset = lines = 0
+        if st is not None and st.st_size > offset:
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # a line still being appended
+                    offset += len(line)
+                    try:
+                        day = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by an interrupted build
+                    self._insert(day['date'], day['stories'])
+                    lines += 1
+        self._synced(st, offset, lines)
+        days = db.execute('SELECT COUNT(DISTINCT date) FROM stories').fetchone()[0]
+        if lines > 2 * days + 16:
+            self.compact()
+
+    def _insert(self, date, stories):
+        db = self.db
+        low, high = db.execute('SELECT MIN(id), MAX(id) FROM stories WHERE date = ?', (date,)).fetchone()
+        if low is not None:  # superseded by a rebuild
+            db.execute('DELETE FROM bands WHERE story BETWEEN ? AND ?', (low, high))
+            db.execute('DELETE FROM stories WHERE date = ?', (date,))
+        first = db.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM stories').fetchone()[0]
+        rows = []
+        for n, (url, sig, title, *rest) in enumerate(stories):
+            section, source, tags, summary = rest + [''] * (4 - len(rest))  # lines from before search
+            rows.append((first + n, date, url_key(url), title, sig, section, source, tags, summary, url))
+        db.executemany('INSERT INTO stories VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        db.executemany('INSERT OR IGNORE INTO bands VALUES (?, ?)',
+                       [(band, row[0]) for row in rows for band in band_keys(row[4])])
+
+    def compact(self):
+        """Rewrite stories.jsonl with one line per date, dropping superseded lines."""
+        days = {}
+        for date, *story in self.db.execute('SELECT date, link, sig, title, section, source, tags, summary '
+                                             'FROM stories ORDER BY id'):
+            days.setdefault(date, []).append(story)
+        with atomic_write(self.path) as f:
+            for date, stories in sorted(days.items()):
+                f.write(json.dumps({'date': date, 'stories': stories}) + '\n')
+        st = os.stat(self.path)
+        self._synced(st, st.st_size, len(days))
+
+    def _tail(self, offset):
+        """Checksum of the STORY_SYNC_CHECK bytes of stories.jsonl before `offset`."""
+        start = max(offset - STORY_SYNC_CHECK, 0)
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(start)
+                return zlib.crc32(f.read(offset - start))
+        except FileNotFoundError:
+            return None
+
+    def _synced(self, st, offset, lines):
+        """Record how far stories.jsonl (as stat()ed in `st`) has been ingested."""
+        self.db.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)', [
+            ('inode', st.st_ino if st else None), ('size', st.st_size if st else None),
+            ('mtime', st.st_mtime_ns if st else None), ('offset', offset), ('lines', lines),
+            ('tail', self._tail(offset))])
+        self.db.commit()
+
+    def record(self, date, stories):
+        """Append the stories published on `date` (superseding any earlier line for it)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps({'date': date, 'stories': stories}) + '\n')
+
+    def find(self, url, sig, before):
+        """Return (date, title, how) of the earliest story published before `before`
+        with the same URL or a similar signature, or None."""
+        db = self.db or self.connect()
+        if url:
+            row = db.execute('SELECT date, title FROM stories WHERE url = ? AND date < ? '
+                             'ORDER BY date LIMIT 1', (url, before)).fetchone()
+            if row:
+                return row[0], row[1], 'same URL'
+        keys = band_keys(sig)
+        best = None
+        for date, title, other in db.execute(
+                'SELECT DISTINCT s.date, s.title, s.sig FROM bands b JOIN stories s ON s.id = b.story '
+                f"WHERE b.band IN ({', '.join('?' * len(keys))}) AND s.date < ?", (*keys, before)):
+            if best is None or date < best[0]:
+                similarity = signature_similarity(sig, other)
+                if similarity >= STORY_SIMILARITY:
+                    best = (date, title, f'{similarity:.0%} similar')
+        return best
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+
+STORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+CREATE TABLE IF NOT EXISTS stories (id INTEGER PRIMARY KEY, date TEXT, url TEXT, title TEXT, sig TEXT,
+                                    section TEXT, source TEXT, tags TEXT, summary TEXT, link TEXT);
+CREATE INDEX IF NOT EXISTS stories_url ON stories (url, date);
+CREATE INDEX IF NOT EXISTS stories_date ON stories (date);
+CREATE VIRTUAL TABLE IF NOT EXISTS story_text USING fts5(
+    title, summary, source, tags, content='stories', content_rowid='id', tokenize='porter unicode61');
+CREATE TRIGGER IF NOT EXISTS stories_ai AFTER INSERT ON stories BEGIN
+    INSERT INTO story_text (rowid, title, summary, source, tags)
+    VALUES (new.id, new.title, new.summary, new.source, new.tags);
+END;
+CREATE TRIGGER IF NOT EXISTS stories_ad AFTER DELETE ON stories BEGIN
+    INSERT INTO story_text (story_text, rowid, title, summary, source, tags)
+    VALUES ('delete', old.id, old.title, old.summary, old.source, old.tags);
+END;
+CREATE TABLE IF NOT EXISTS bands (band INTEGER, story INTEGER, PRIMARY KEY (band, story)) WITHOUT ROWID;
+PRAGMA synchronous = OFF;
+"""
+
+
+def restore_story_index(directory):
+    """Back-parse archived digests in `directory` that stories.jsonl lacks."""
+    archive = Archive(directory)
+    if not archive.manifest_path.exists():
+        return
+    dates = backfill(archive)
+    if dates:
+        print(f"Story index: back-parsed {len(dates)} archived digest(s) into "
+              f"{archive.dir / STORIES_NAME}", file=sys.stderr)
+
+
+def find_repeats(sections, index, date, signatures=None):
+    """Return [((section, index), item, (date, title, how))] for items already
+    published in a digest dated before `date` (YYYY-MM-DD)."""
+    if not index.path.exists():
+        return []
+    signatures = StorySignatures() if signatures is None else signatures
+    repeats = []
+    for key, item in iter_keyed_items(sections):
+        match = index.find(url_key(item['url']), signatures.of(item), date)
+        if match is not None:
+            repeats.append((key, item, match))
+    return repeats
+
+
+class RepeatFilteredSections(BudgetedSections):
+    """A view of parsed sections with repeated stories left out (and no omitted note)."""
+
+    def __init__(self, sections, repeats):
+        super().__init__(sections, set(), {key for key, _, _ in repeats})
+        self.omitted = Counter()
+
+
+def repeats_report(repeats, dropped):
+    lines = [f"{len(repeats)} repeated stor{'y' if len(repeats) == 1 else 'ies'} "
+             f"{'dropped' if dropped else 'flagged'}:"]
+    for (name, _), item, (date, title, how) in repeats:
+        lines.append(f"  {name}: {item['title'][:60]!r} — {how} as {date}: {title[:50]!r}")
+    return '\n'.join(lines)
+
+
+# Search ranks by BM25 with these column weights: title, summary, source, tags
+SEARCH_WEIGHTS = (4.0, 1.0, 0.5, 2.0)
+
+
+def search_query(terms, tags=()):
+    """Build an FTS5 query: every term (or quoted phrase) and tag must match.
+
+    A term ending in * matches as a prefix.
+    """
+    def phrase(text):
+        prefix = text.endswith('*')
+        text = ' '.join(_WORD_RE.findall(text))
+        return f'"{text}"' + ('*' if prefix else '') if text else None
+
+    parts = [phrase(t) for t in terms] + [f'tags : {phrase(t)}' for t in tags if phrase(t)]
+    return ' AND '.join(p for p in parts if p)
+
+
+def search_stories(index, terms=(), tags=(), sections=(), since=None, until=None, limit=20):
+    """Return matching stories, best first, as (date, section, title, source, link, snippet)."""
+    db = index.connect()
+    where, params = [], []
+    query = search_query(terms, tags)
+    if query:
+        where.append('story_text MATCH ?')
+        params.append(query)
+    if sections:
+        where.append(f"s.section IN ({', '.join('?' * len(sections))})")
+        params.extend(sections)
+    if since:
+        where.append('s.date >= ?')
+        params.append(since)
+    if until:
+        where.append('s.date <= ?')
+        params.append(until)
+    if query:
+        sql = (f"SELECT s.date, s.section, s.title, s.source, s.link, "
+               f"snippet(story_text, 1, '[', ']', '…', 16) FROM story_text JOIN stories s ON s.id = story_text.rowid "
+               f"WHERE {' AND '.join(where)} "
+               f"ORDER BY bm25(story_text, {', '.join(map(str, SEARCH_WEIGHTS))}), s.date DESC LIMIT ?")
+    else:
+        sql = (f"SELECT s.date, s.section, s.title, s.source, s.link, substr(s.summary, 1, 120) "
+               f"FROM stories s {'WHERE ' + ' AND '.join(where) if where else ''} "
+               f"ORDER BY s.date DESC, s.id LIMIT ?")
+    return db.execute(sql, (*params, limit)).fetchall()
+
+
+def search_main(argv):
+    """`build_digest.py search`: ranked full-text search over archived items."""
+    parser = argparse.ArgumentParser(prog='build_digest.py search',
+                                     description='Search the items of archived digests (no HTML is read)')
+    parser.add_argument('terms', nargs='*', help='Words or quoted phrases that must all match; word* for a prefix')
+    parser.add_argument('--tag', action='append', default=[], help='Only items with this tag (repeatable)')
+    parser.add_argument('--section', action='append', default=[], type=str.upper, choices=ITEM_SECTIONS,
+                        help='Only items in this section (repeatable)')
+    parser.add_argument('--since', metavar='YYYY-MM-DD', help='Only digests on or after this date')
+    parser.add_argument('--until', metavar='YYYY-MM-DD', help='Only digests on or before this date')
+    parser.add_argument('-n', '--limit', type=int, default=20, help='Maximum results (default: 20)')
+    parser.add_argument('--dir', default=str(DIGESTS_DIR), help='Archive directory (default: digests/)')
+    args = parser.parse_args(argv)
+    if not (args.terms or args.tag or args.section or args.since or args.until):
+        parser.error('give search terms or at least one filter')
+
+    restore_story_index(args.dir)
+    index = StoryIndex(args.dir)
+    if not index.path.exists():
+        print(f"No digests to search in {args.dir}", file=sys.stderr)
+        return 1
+    start = time.perf_counter()
+    try:
+        results = search_stories(index, args.terms, args.tag, args.section, args.since, args.until,
+                                 args.limit)
+    except sqlite3.OperationalError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        index.close()
+    for date, name, title, source, link, snippet in results:
+        print(f"{date}  {name:<13} {title}" + (f" ({source})" if source else ''))
+        if snippet:
+            print(f"{'':<12}{snippet}")
+        if link:
+            print(f"{'':<12}{link}")
+    print(f"{len(results)} result(s) in {(time.perf_counter() - start) * 1000:.1f} ms", file=sys.stderr)
+    return 0 if results else 1
+
+
+# =============================================================================
+# HTML BACK-PARSER
+# =============================================================================
+# Digests built before content files or models were kept can be parsed back
+# into the same sections parse_content() returns. DigestParser is an
+# html.parser fed the file in BACKPARSE_CHUNK pieces: it keeps only the
+# block element being read and the item card it belongs to, so memory is
+# bounded by the model, not the HTML. Sections are found by their <h2>
+# titles (the compactor drops the section comments). Cards map back field
+# by field from what the reader sees: an item gets the (at most two) tags
+# displayed on its card and no significance, which the design doesn't show.
+BACKPARSE_CHUNK = 64 * 1024
+
+SECTION_TITLES = {
+    'News & Statements': 'NEWS',
+    'Publications': 'PUBLICATIONS',
+    'Congressional & Executive Activity': 'CONGRESSIONAL',
+    'Business Activity': 'BUSINESS',
+    'China': 'CHINA',
+    'Macro Trends': 'MACRO_TRENDS',
+    'What to Watch This Week': 'CALENDAR',   # and KEY_QUESTIONS
+    'Grantee Activities': 'GRANTEES',
+    'Limitations & Gaps': 'LIMITATIONS',
+}
+
+_BLOCK_TAGS = {'title', 'h2', 'p', 'li', 'td'}
+_OMITTED_RE = re.compile(r'\d+ more items? omitted')
+_GRANTEE_TAIL_RE = re.compile(r'\s*\((.*?)\) — (.*)', re.S)
+
+
+class Block:
+    """Text and inline parts of one block element (p, li, td, h2, title)."""
+
+    __slots__ = ('tag', 'style', 'card', 'text', 'marked', 'spans', 'strong', 'tail', 'href', 'inline')
+
+    def __init__(self, tag, style, card):
+        self.tag = tag
+        self.style = style
+        self.card = card        # the innermost <table>'s attributes
+        self.text = []
+        self.marked = []        # text with <strong> as **, for macro trends
+        self.spans = []
+        self.strong = None
+        self.tail = []          # text after the <strong>
+        self.href = None
+        self.inline = None      # the <span>/<strong> being read, as a list of text
+
+    def data(self, text):
+        self.text.append(text)
+        self.marked.append(text)
+        if self.inline is not None:
+            self.inline.append(text)
+        elif self.strong is not None:
+            self.tail.append(text)
+
+
+class DigestParser(HTMLParser):
+    """Incrementally parse a rendered digest back into its sections."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.date = None
+        self.section = 'TOP_DEVELOPMENTS'
+        self.sections = {}
+        self.tables = [{}]
+        self.blocks = []
+        self.cells = []         # td texts of each open <tr>
+        self.card = None        # (card attributes, its blocks)
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'table':
+            self.tables.append(attrs)
+        elif tag == 'tr':
+            self.cells.append([])
+        elif tag in _BLOCK_TAGS:
+            self.blocks.append(Block(tag, (attrs.get('style') or '').replace(' ', ''), self.tables[-1]))
+        elif self.blocks:
+            block = self.blocks[-1]
+            if tag == 'span':
+                block.inline = []
+            elif tag == 'strong':
+                block.inline = []
+                block.marked.append('**')
+            elif tag == 'a' and block.href is None:
+                block.href = attrs.get('href', '')
+
+    def handle_endtag(self, tag):
+        if tag == 'table':
+            if len(self.tables) > 1:
+                self.tables.pop()
+        elif tag == 'tr':
+            if self.cells:
+                self.row(self.cells.pop())
+        elif tag in _BLOCK_TAGS:
+            if self.blocks and self.blocks[-1].tag == tag:
+                self.block(self.blocks.pop())
+        elif self.blocks and self.blocks[-1].inline is not None:
+            block = self.blocks[-1]
+            text = ''.join(block.inline)
+            block.inline = None
+            if tag == 'span':
+                block.spans.append(text)
+            elif tag == 'strong':
+                block.strong = text
+                block.marked.append('**')
+
+    def handle_data(self, data):
+        if self.blocks:
+            self.blocks[-1].data(data)
+
+    def block(self, block):
+        """Handle one finished block element in the current section."""
+        text = ''.join(block.text)
+        name = self.section
+        if block.tag == 'title':
+            self.date = text.rpartition(' - ')[2]
+        elif block.tag == 'h2':
+            self.end_card()
+            self.section = SECTION_TITLES.get(text.strip(), text.strip())
+        elif block.tag == 'td':
+            if self.cells:
+                self.cells[-1].append(text)
+        elif block.tag == 'li':
+            if name == 'TOP_DEVELOPMENTS':
+                title = block.strong if block.strong is not None else text
+                summary = ''.join(block.tail)
+                self.add(name, {'title': title.strip().strip('*'), 'summary': summary.partition('—')[2].strip()})
+            elif name == 'LIMITATIONS':
+                self.add(name, text.strip())
+        elif name in ITEM_SECTIONS or name == 'GRANTEES':
+            if 'font-style:italic' in block.style:
+                self.end_card()
+                if name == 'GRANTEES' and not _OMITTED_RE.match(text):
+                    self.no_publications = [o.strip() for o in text.partition(':')[2].split(',') if o.strip()]
+            elif 'display:inline-block' in block.style:
+                self.end_card()
+                self.sections.setdefault('NEWS', []).append(Subsection(sys.intern(text)))
+            else:
+                if self.card is None or self.card[0] is not block.card:
+                    self.end_card()
+                    self.card = (block.card, [])
+                self.card[1].append(block)
+        elif name == 'MACRO_TRENDS':
+            self.add(name, ''.join(block.marked).strip())
+
+    def row(self, cells):
+        if self.section != 'CALENDAR':
+            return
+        if len(cells) == 3:
+            self.add('CALENDAR', {'date': cells[0], 'event': cells[1], 'significance': cells[2]})
+        elif len(cells) == 2 and cells[0] == '?':
+            self.add('KEY_QUESTIONS', cells[1].strip())
+
+    def add(self, name, value):
+        self.sections.setdefault(name, []).append(value)
+
+    def end_card(self):
+        """Turn the blocks of the card just read into an Item or Org."""
+        if self.card is None:
+            return
+        attrs, blocks = self.card
+        self.card = None
+        name = self.section
+        if name == 'GRANTEES':
+            if len(blocks) < 2:
+                return
+            m = _GRANTEE_TAIL_RE.match(''.join(blocks[1].tail))
+            date, summary = m.groups() if m else ('', ''.join(blocks[1].tail))
+            title = blocks[1].strong or ''
+            if len(title) >= 2 and title[0] == title[-1] == '"':
+                title = title[1:-1]  # the quotes the card adds
+            org = Org(sys.intern(''.join(blocks[0].text)), title, sys.intern(date), summary,
+                      blocks[2].href if len(blocks) > 2 else '')
+            org.url = '' if org.url == '#' else org.url
+            self.add('GRANTEES', org)
+            return
+
+        item = new_item()
+        if blocks and blocks[0].spans and ''.join(blocks[0].text) == ''.join(blocks[0].spans):
+            item.tags = parse_tags(', '.join(blocks.pop(0).spans))
+        fields = [''.join(b.text) for b in blocks[:3]] + [''] * (3 - len(blocks[:3]))
+        item.title, meta, item.summary = fields
+        if len(blocks) > 1 and blocks[1].spans:
+            item.source = sys.intern(blocks[1].spans[0])
+            item.date = sys.intern(meta[len(blocks[1].spans[0]):].partition('·')[2].strip())
+        href = blocks[3].href if len(blocks) > 3 else None
+        item.url = '' if href in (None, '#') else href
+        if name == 'NEWS':
+            subsections = self.sections.setdefault('NEWS', [])
+            if not subsections:
+                subsections.append(Subsection(''))
+            subsections[-1].items.append(item)
+        else:
+            self.add(name, item)
+
+    def close(self):
+        super().close()
+        self.end_card()
+
+    def result(self):
+        """Return the sections read, in document order, as parse_content would."""
+        sections = {}
+        for name in SECTION_PARSERS:
+            value = self.sections.get(name)
+            if name == 'GRANTEES':
+                no_pubs = getattr(self, 'no_publications', [])
+                if value or no_pubs:
+                    sections[name] = (value or [], no_pubs)
+            elif name == 'MACRO_TRENDS':
+                if value:
+                    sections[name] = '\n\n'.join(value)
+            elif value:
+                sections[name] = value
+        return sections
+
+
+def parse_digest_html(source):
+    """Back-parse a digest from a path (plain, .gz or .xz) or text file.
+
+    Returns (sections, the date string shown in the digest).
+    """
+    parser = DigestParser()
+    if isinstance(source, (str, Path)):
+        m = _DIGEST_NAME_RE.match(Path(source).name)
+        opener = COMPRESSORS.get(m.group(2) if m else None, open)
+        with opener(source, 'rt') as f:
+            return parse_digest_html(f)
+    while True:
+        chunk = source.read(BACKPARSE_CHUNK)
+        if not chunk:
+            break
+        parser.feed(chunk)
+    parser.close()
+    return parser.result(), parser.date
+
+
+def backfill_file(path):
+    """Back-parse one archived digest (in a worker): (path, item counts, story fingerprints)."""
+    sections, _ = parse_digest_html(path)
+    return str(path), count_items(sections), story_fingerprints(sections)
+
+
+def backfill(archive, jobs=None, models=None, force=False):
+    """Back-parse archived digests across a process pool into the story index
+    and the manifest's item counts; with `models`, also write each date's JSON
+    model there. Digests already in the story index are skipped unless `force`.
+
+    Returns the dates back-parsed.
+    """
+    entries = archive.load()
+    index = StoryIndex(archive.dir)
+    done = set()
+    if not force and index.path.exists():
+        done = {row[0] for row in index.connect().execute('SELECT DISTINCT date FROM stories')}
+        index.close()
+    todo = {date: entry for date, entry in entries.items() if date not in done or models}
+    if not todo:
+        return []
+    if models:
+        Path(models).mkdir(parents=True, exist_ok=True)
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=min(jobs or os.cpu_count() or 1, len(todo))) as pool:
+        futures = {pool.submit(backfill_file, archive.path(entry)): date for date, entry in todo.items()}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    for date in sorted(results):
+        path, counts, stories = results[date]
+        if date not in done:
+            index.record(date, stories)
+        if entries[date].get('items') is None:
+            entries[date]['items'] = counts
+        if models:
+            emit_model(parse_digest_html(path)[0], Path(models) / f'energy-digest-{date}.json')
+    archive.save(entries)
+    return sorted(results)
+
+
+def backparse_main(argv):
+    """`build_digest.py backparse`: recover the content model from a digest's HTML."""
+    parser = argparse.ArgumentParser(prog='build_digest.py backparse',
+                                     description='Parse a rendered digest (.html, .gz or .xz) back into its model')
+    parser.add_argument('input', help='Digest HTML file')
+    parser.add_argument('-o', '--output', help='Write the recovered model (JSON) or content to this file')
+    parser.add_argument('--content', action='store_true',
+                        help='Write a content file (the build input format) instead of a JSON model')
+    args = parser.parse_args(argv)
+
+    try:
+        sections, date = parse_digest_html(args.input)
+    except OSError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    if args.output and args.content:
+        with atomic_write(args.output) as f:
+            f.write(format_content(sections))
+    elif args.output:
+        emit_model(sections, args.output)
+    counts = ', '.join(f'{n} {name}' for name, n in count_items(sections).items())
+    print(f"{args.input}: {date or 'no date'}: {counts or 'no items'}"
+          + (f" -> {args.output}" if args.output else ''))
+    return 0
+
+
+# =============================================================================
+# LINK CHECK
+# =============================================================================
+# `check-links` (or --check-links before a build) fetches every item and
+# grantee URL concurrently on one asyncio loop: a small HTTP/1.1 client over
+# asyncio streams, with at most LINK_HOST_CONNECTIONS keep-alive connections
+# per host, so a run takes about as long as its slowest host. HEAD is tried
+# first, then GET for servers that reject or mishandle HEAD. Results are kept
+# in .digest-cache/links.json: working links are not refetched for
+# LINK_TTL, broken ones only for LINK_FAILURE_TTL in case they were transient.
+# Statuses that bot protection and paywalls answer to automated clients
+# (LINK_INCONCLUSIVE) say nothing about the link, so they are reported as
+# unverified instead of broken and never stop a --check-links build.
+LINK_CACHE_PATH = CACHE_DIR / 'links.json'
+LINK_CACHE_VERSION = 2
+LINK_INCONCLUSIVE = frozenset({401, 403, 429, 999})
+LINK_TTL = 7 * 24 * 3600
+LINK_FAILURE_TTL = 3600
+LINK_TIMEOUT = 10.0
+LINK_HOST_CONNECTIONS = 4
+LINK_MAX_REDIRECTS = 5
+LINK_DRAIN_BYTES = 64 * 1024   # larger GET bodies close the connection instead
+LINK_USER_AGENT = 'Mozilla/5.0 (compatible; energy-digest-link-check)'
+
+
+def iter_links(sections):
+    """Yield (url, section, title) for every item and grantee URL."""
+    for name in ITEM_SECTIONS + ('GRANTEES',):
+        if name not in sections:
+            continue
+        value = sections[name]
+        if name == 'NEWS':
+            entries = (item for sub in value for item in sub['items'])
+        elif name == 'GRANTEES':
+            entries = value[0]
+        else:
+            entries = value
+        for entry in entries:
+            url = entry.get('url', '').strip()
+            if url and url != '#':
+                yield url, name, entry.get('title') or entry.get('name', '')
+
+
+class HostPool:
+    """Keep-alive connections to one scheme://host:port, at most `limit` at once."""
+
+    def __init__(self, scheme, host, port, limit, timeout):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.slots = asyncio.Semaphore(limit)
+        self.idle = []
+        # Host header: the port is left out only when it is the scheme's default
+        name = f'[{host}]' if ':' in host else host
+        self.host_header = name if port == (443 if scheme == 'https' else 80) else f'{name}:{port}'
+
+    async def request(self, method, target):
+        """Send one request; return (status, headers)."""
+        async with self.slots:
+            if self.idle:
+                try:
+                    return await asyncio.wait_for(self._exchange(self.idle.pop(), method, target),
+                                                  self.timeout)
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    pass  # the server dropped the idle connection; retry on a fresh one
+            return await asyncio.wait_for(self._exchange(None, method, target), self.timeout)
+
+    async def _exchange(self, conn, method, target):
+        if conn is None:
+            conn = await asyncio.open_connection(
+                self.host, self.port, ssl=_ssl_context() if self.scheme == 'https' else None)
+        reader, writer = conn
+        reusable = False
+        try:
+            writer.write(f'{method} {target} HTTP/1.1\r\nHost: {self.host_header}\r\n'
+                         f'User-Agent: {LINK_USER_AGENT}\r\nAccept: */*\r\n\r\n'.encode('latin-1'))
+            await writer.drain()
+            # The reason phrase is optional ("HTTP/1.1 200")
+            version, status = (await reader.readuntil(b'\r\n')).decode('latin-1').split(None, 2)[:2]
+            status = int(status)
+            headers = {}
+            while True:
+                line = await reader.readuntil(b'\r\n')
+                if line == b'\r\n':
+                    break
+                key, _, value = line.decode('latin-1').partition(':')
+                headers[key.strip().lower()] = value.strip()
+
+            keep = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+            if method != 'HEAD' and status not in (204, 304):
+                length = headers.get('content-length')
+                if length is not None and 'chunked' not in headers.get('transfer-encoding', '') \
+                        and int(length) <= LINK_DRAIN_BYTES:
+                    await reader.readexactly(int(length))
+                else:
+                    keep = False
+            reusable = keep
+            return status, headers
+        finally:
+            if reusable:
+                self.idle.append(conn)
+            else:
+                writer.close()
+
+    def close(self):
+        for _, writer in self.idle:
+            writer.close()
+        self.idle.clear()
+
+
+@lru_cache(maxsize=None)
+def _ssl_context():
+    return ssl.create_default_context()
+
+
+class LinkChecker:
+    """Checks URLs concurrently, backed by an on-disk result cache."""
+
+    def __init__(self, cache_path=LINK_CACHE_PATH, ttl=LINK_TTL, timeout=LINK_TIMEOUT,
+                 per_host=LINK_HOST_CONNECTIONS):
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.ttl = ttl
+        self.timeout = timeout
+        self.per_host = per_host
+
+    def load(self):
+        """Return the cached {url: result}, or {} if missing or unreadable."""
+        try:
+            with open(self.cache_path, 'r') as f:
+                data = json.load(f)
+        except (TypeError, OSError, ValueError):
+            return {}
+        if data.get('version') != LINK_CACHE_VERSION:
+            return {}
+        return data.get('links', {})
+
+    def fresh(self, result, now):
+        ttl = self.ttl if result['ok'] else min(self.ttl, LINK_FAILURE_TTL)
+        return now - result['checked'] < ttl
+
+    def check(self, urls):
+        """Return {url: result} for `urls`, fetching only those not fresh in the cache.
+
+        A result is a dict: ok, inconclusive (blocked, see LINK_INCONCLUSIVE),
+        status (None if no response), error, checked (epoch).
+        """
+        now = time.time()
+        cached = self.load() if self.cache_path else {}
+        urls = list(dict.fromkeys(urls))
+        results = {url: cached[url] for url in urls if url in cached and self.fresh(cached[url], now)}
+        todo = [url for url in urls if url not in results]
+        if _profiler is not None:
+            _profiler.count('link cache hits', len(results))
+            _profiler.count('link cache misses', len(todo))
+        if todo:
+            results.update(asyncio.run(self.fetch_all(todo)))
+        if self.cache_path and todo:
+            links = {url: r for url, r in cached.items() if self.fresh(r, now)}
+            links.update(results)
+            self.cache_path.parent.mkdir(exist_ok=True)
+            with atomic_write(self.cache_path) as f:
+                json.dump({'version': LINK_CACHE_VERSION, 'links': links}, f)
+        return results
+
+    async def fetch_all(self, urls):
+        """Check `urls` concurrently on the running loop; return {url: result}."""
+        pools = {}
+        try:
+            found = await asyncio.gather(*(self.fetch(url, pools) for url in urls))
+        finally:
+            for pool in pools.values():
+                pool.close()
+        return dict(zip(urls, found))
+
+    async def fetch(self, url, pools):
+        """Check one URL, following redirects; return its result dict."""
+        status, error = None, ''
+        target_url = url
+        try:
+            for _ in range(LINK_MAX_REDIRECTS + 1):
+                parts = urlsplit(target_url)
+                if parts.scheme not in ('http', 'https') or not parts.hostname:
+                    raise ValueError(f'unsupported URL: {target_url}')
+                key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+                if key not in pools:
+                    pools[key] = HostPool(*key, self.per_host, self.timeout)
+                path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+                try:
+                    status, headers = await pools[key].request('HEAD', path)
+                except (OSError, ValueError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+                    status = None   # some servers drop or stall HEAD requests
+                if status is None or status >= 400:
+                    status, headers = await pools[key].request('GET', path)
+                if 300 <= status < 400 and 'location' in headers:
+                    target_url = urljoin(target_url, headers['location'])
+                    continue
+                break
+            else:
+                error = 'too many redirects'
+        except asyncio.TimeoutError:
+            error = 'timed out'
+        except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+            error = str(e) or type(e).__name__
+        ok = not error and status is not None and status < 400
+        inconclusive = not error and status in LINK_INCONCLUSIVE
+        return {'ok': ok, 'inconclusive': inconclusive, 'status': status, 'error': error,
+                'checked': time.time()}
+
+
+def check_links(sections, checker=None):
+    """Check every URL in `sections`.
+
+    Returns (broken, unverified), each [(url, section, title, result)];
+    unverified links are those a site refused to answer (LINK_INCONCLUSIVE).
+    """
+    links = list(iter_links(sections))
+    with stage('links'):
+        results = (checker or LinkChecker()).check(url for url, _, _ in links)
+    failed = [(url, name, title, results[url]) for url, name, title in links if not results[url]['ok']]
+    return ([link for link in failed if not link[3]['inconclusive']],
+            [link for link in failed if link[3]['inconclusive']])
+
+
+def format_broken_link(url, name, title, result):
+    problem = str(result['status']) if result['status'] else result['error']
+    return f"  {problem:<12} {name}: {title[:60]!r}\n  {'':<12} {url}"
+
+
+def check_links_main(argv):
+    """`build_digest.py check-links`: verify every item and grantee URL resolves."""
+    parser = argparse.ArgumentParser(prog='build_digest.py check-links',
+                                     description='Check item and grantee URLs concurrently')
+    parser.add_argument('input', nargs='?', help='Content file (or stdin if not provided)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Refetch every URL instead of trusting recent results in .digest-cache/')
+    parser.add_argument('--ttl', type=float, default=LINK_TTL / 86400, metavar='DAYS',
+                        help='Trust cached working links this many days (default: %(default)g)')
+    parser.add_argument('--timeout', type=float, default=LINK_TIMEOUT, metavar='SECONDS',
+                        help='Per-request timeout (default: %(default)g)')
+    parser.add_argument('--per-host', type=int, default=LINK_HOST_CONNECTIONS, metavar='N',
+                        help='Connections per host (default: %(default)d)')
+    args = parser.parse_args(argv)
+
+    sections = map_content(args.input or sys.stdin)
+    checker = LinkChecker(None if args.no_cache else LINK_CACHE_PATH, args.ttl * 86400,
+                          args.timeout, args.per_host)
+    start = time.perf_counter()
+    total = len({url for url, _, _ in iter_links(sections)})
+    broken, unverified = check_links(sections, checker)
+    for link in broken:
+        print(format_broken_link(*link))
+    if unverified:
+        print(f"{len(unverified)} link(s) refused an automated check (not counted as broken):",
+              file=sys.stderr)
+        for link in unverified:
+            print(format_broken_link(*link), file=sys.stderr)
+    print(f"Checked {total} link(s) in {time.perf_counter() - start:.2f}s: {len(broken)} broken, "
+          f"{len(unverified)} unverified", file=sys.stderr)
+    return 1 if broken else 0
+
+
+# =============================================================================
+# BATCH MODE
+# =============================================================================
+def find_inputs(source):
+    """Expand a directory (its *.txt files) or a glob pattern into input paths."""
+    if os.path.isdir(source):
+        return sorted(str(p) for p in Path(source).glob('*.txt'))
+    return sorted(glob.glob(source))
+
+
+def date_from_filename(path):
+    """Return the YYYY-MM-DD date embedded in a file name, or None."""
+    m = _DATE_RE.search(Path(path).name)
+    if not m:
+        return None
+    try:
+        return datetime.strptime(m.group(1), '%Y-%m-%d')
+    except ValueError:
+        return None
+
+
+def run_batch(source, out_dir=DIGESTS_DIR, jobs=None, compact=False, max_bytes=None):
+    """Build every content file matched by `source` across a process pool.
+
+    Each input must carry its date in its file name (e.g. content-2026-01-20.txt);
+    it is written to energy-digest-<date>.html in `out_dir`. Prints a summary with
+    per-file timings and returns the number of failures.
+    """
+    inputs = find_inputs(source)
+    if not inputs:
+        print(f"No content files match: {source}", file=sys.stderr)
+        return 1
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    jobs = jobs or os.cpu_count() or 1
+
+    results = {}
+    entries = {}
+    stories = {}
+    failures = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=min(jobs, len(inputs))) as pool:
+        futures = {}
+        for path in inputs:
+            date = date_from_filename(path)
+            if date is None:
+                results[path] = 'error: no YYYY-MM-DD date in file name'
+                failures += 1
+                continue
+            futures[pool.submit(build_file, path, digest_path(date, out_dir),
+                                date.strftime('%b %d, %Y'), compact, max_bytes)] = path
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                output_path, written, seconds, entry, fingerprints = future.result()
+                entries[Path(output_path).name] = entry
+                if entry:
+                    stories[entry['date']] = fingerprints
+                results[path] = f'{seconds * 1000:8.1f} ms  {written:>9,} chars  -> {output_path}'
+            except Exception as e:
+                results[path] = f'error: {e}'
+                failures += 1
+    # Workers only build; the manifest and story index are updated here, so they never race
+    Archive(out_dir).record(entries.values())
+    index = StoryIndex(out_dir)
+    for date, fingerprints in sorted(stories.items()):
+        index.record(date, fingerprints)
+    elapsed = time.perf_counter() - start
+
+    width = max(len(p) for p in inputs)
+    for path in inputs:
+        print(f"{path:<{width}}  {results[path]}")
+    print(f"\nBuilt {len(inputs) - failures}/{len(inputs)} digests in {elapsed:.2f}s "
+          f"with {jobs} job(s)")
+    return failures
+
+
+# =============================================================================
+# WATCH MODE
+# =============================================================================
+# --watch keeps one process alive and rebuilds in-process whenever the content
+# file changes, so previews skip interpreter startup and imports. Changes are
+# detected by polling os.stat (portable, and cheap at this interval), rapid
+# saves are debounced, and rendered blocks of unchanged sections are reused
+# from an in-memory cache, so an edit only re-parses and re-renders its own
+# section.
+WATCH_INTERVAL = 0.02   # seconds between stat checks
+WATCH_DEBOUNCE = 0.05   # the file must be unchanged this long before a rebuild
+
+
+def file_signature(path):
+    """Return a value that changes whenever the file is modified or replaced."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def watch(input_path, output_path, date_str=None, compact=False, max_bytes=None,
+          interval=WATCH_INTERVAL, debounce=WATCH_DEBOUNCE):
+    """Rebuild `output_path` from `input_path` on every change until interrupted."""
+    cache = MemoryRenderCache()
+    built = pending = None
+    pending_since = 0.0
+
+    def rebuild():
+        start = time.perf_counter()
+        hits, misses = cache.hits, cache.misses
+        with open(input_path, 'r') as f:
+            sections = parse_content(f)
+        if max_bytes:
+            sections, _ = plan_budget(sections, max_bytes, date_str, compact)
+        # A draft preview: not recorded in the manifest or the story index
+        with atomic_write(output_path) as f:
+            render_digest(sections, f, date_str, cache, Compactor() if compact else None)
+        print(f"[{datetime.now():%H:%M:%S}] Rebuilt {output_path} in "
+              f"{(time.perf_counter() - start) * 1000:.0f} ms "
+              f"({cache.hits - hits} sections reused, {cache.misses - misses} rendered)", flush=True)
+
+    print(f"Watching {input_path} -> {output_path} (Ctrl-C to stop)", flush=True)
+    try:
+        while True:
+            sig = file_signature(input_path)
+            now = time.monotonic()
+            if sig != pending:
+                pending, pending_since = sig, now  # changed again: restart the debounce
+            elif sig is not None and sig != built and now - pending_since >= debounce:
+                built = sig
+                try:
+                    rebuild()
+                except Exception as e:
+                    print(f"Build failed: {e}", file=sys.stderr, flush=True)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print()
+
+
+# =============================================================================
+# PREVIEW SERVER
+# =============================================================================
+# `build_digest.py serve` is a small stdlib HTTP server for reviewing digests
+# from any machine (no macOS `open` needed):
+#   /                   index of archived digests and content files
+#   /latest, /<date>    archived digests, straight from the manifest (no parsing)
+#   /render/<file>      a content file under --root, rendered on request
+# Every response carries an ETag (of what the page shows) so repeat requests are
+# answered 304 Not Modified. Rendered pages are kept in an LRU cache keyed by
+# the input's content hash and the date the page shows (from the file name,
+# else today's), and renders are serialised so several reviewers
+# opening the same draft cost one render. Bodies are streamed in chunks.
+SERVE_CHUNK = 64 * 1024
+SERVE_CACHE_BYTES = 64 * 1024 * 1024
+
+_DATE_PATH_RE = re.compile(r'/(\d{4}-\d{2}-\d{2})')
+
+
+class DigestServer(ThreadingHTTPServer):
+    """HTTP server holding the archive, content root and render caches."""
+
+    daemon_threads = True
+
+    def __init__(self, address, archive, root, max_bytes=SERVE_CACHE_BYTES):
+        super().__init__(address, DigestRequestHandler)
+        self.archive = archive
+        self.root = Path(root).resolve()
+        self.max_bytes = max_bytes
+        self.blocks = MemoryRenderCache()
+        self.pages = OrderedDict()   # (content hash, date) -> (etag, encoded page)
+        self.page_bytes = 0
+        self.signatures = {}         # path -> (file_signature, content hash)
+        self.lock = threading.Lock()
+
+    def content_file(self, rel):
+        """Resolve a /render/ path to a file under root, or None."""
+        path = (self.root / rel).resolve()
+        if path != self.root and self.root not in path.parents:
+            return None
+        return path if path.is_file() else None
+
+    def render(self, path):
+        """Return (etag, page bytes) for a content file, rendering at most once per content and date.
+
+        The date shown is the one in the file name, or else today's, so pages
+        of undated files are re-rendered (with a new ETag) after midnight.
+        """
+        date = date_from_filename(path) or datetime.now()
+        date_str = date.strftime('%b %d, %Y')
+        with self.lock:
+            sig = file_signature(path)
+            known = self.signatures.get(path)
+            if known and known[0] == sig:
+                key = known[1]
+                data = None
+            else:
+                data = path.read_bytes()
+                key = hashlib.sha256(data).hexdigest()
+                self.signatures[path] = (sig, key)
+
+            key = (key, date_str)
+            page = self.pages.get(key)
+            if page is None:
+                if data is None:
+                    data = path.read_bytes()
+                html = ''.join(iter_digest(parse_content(data.decode()), date_str, cache=self.blocks))
+                etag = '"%s"' % hashlib.sha256(
+                    '\0'.join((*key, self.blocks.renderer_hash)).encode()).hexdigest()[:40]
+                page = (etag, html.encode())
+                self.pages[key] = page
+                self.page_bytes += len(page[1])
+                while self.page_bytes > self.max_bytes and len(self.pages) > 1:
+                    _, (_, old) = self.pages.popitem(last=False)
+                    self.page_bytes -= len(old)
+            self.pages.move_to_end(key)
+            return page
+
+
+class DigestRequestHandler(BaseHTTPRequestHandler):
+    """Routes for DigestServer (see the section comment above)."""
+
+    def do_GET(self):
+        path = unquote(urlsplit(self.path).path)
+        if path == '/':
+            self.send_body(self.index_page().encode(), etag=None)
+        elif path == '/latest':
+            found = self.server.archive.latest()
+            self.send_archived(found[1] if found else None)
+        elif _DATE_PATH_RE.fullmatch(path):
+            self.send_archived(self.server.archive.get(path[1:]))
+        elif path.startswith('/render/'):
+            file = self.server.content_file(path[len('/render/'):])
+            if file is None:
+                self.send_error(404, 'No such content file')
+                return
+            etag, body = self.server.render(file)
+            self.send_body(body, etag)
+        else:
+            self.send_error(404)
+
+    do_HEAD = do_GET
+
+    def not_modified(self, etag):
+        """Answer 304 if the client already has `etag`; return whether we did."""
+        tags = self.headers.get('If-None-Match', '')
+        if etag and (tags.strip() == '*' or etag in (t.strip() for t in tags.split(','))):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return True
+        return False
+
+    def start(self, length, etag):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(length))
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')  # always revalidate
+        self.end_headers()
+
+    def send_body(self, body, etag):
+        if self.not_modified(etag):
+            return
+        self.start(len(body), etag)
+        if self.command == 'GET':
+            view = memoryview(body)
+            for i in range(0, len(body), SERVE_CHUNK):
+                self.wfile.write(view[i:i + SERVE_CHUNK])
+
+    def send_archived(self, entry):
+        if entry is None:
+            self.send_error(404, 'No matching digest in the archive manifest')
+            return
+        etag = '"%s"' % entry['sha256'][:40]
+        if self.not_modified(etag):
+            return
+        self.start(entry['bytes'], etag)
+        if self.command == 'GET':
+            opener = COMPRESSORS.get(entry.get('compression'), open)
+            with opener(self.server.archive.path(entry), 'rb') as f:
+                for block in iter(lambda: f.read(SERVE_CHUNK), b''):
+                    self.wfile.write(block)
+
+    def index_page(self):
+        links = [f'<li><a href="/{date}">{date}</a></li>'
+                 for date, _ in reversed(self.server.archive.since())]
+        drafts = [f'<li><a href="/render/{quote(str(p.relative_to(self.server.root)))}">'
+                  f'{html_escape(str(p.relative_to(self.server.root)))}</a></li>'
+                  for p in sorted(self.server.root.glob('*.txt'))]
+        return ('<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8">'
+                '<title>Digest Preview</title></head>'
+                '<body style="font-family: -apple-system, BlinkMacSystemFont, \'Segoe UI\', Roboto, sans-serif; '
+                'color: #1a1a2e; background: #faf8f5; padding: 24px;">'
+                '<h2>Content files</h2><ul>' + ''.join(drafts) + '</ul>'
+                '<h2>Archive</h2><ul><li><a href="/latest">latest</a></li>' + ''.join(links) + '</ul>'
+                '</body></html>')
+
+
+def serve_main(argv):
+    """`build_digest.py serve`: preview content files and archived digests over HTTP."""
+    parser = argparse.ArgumentParser(prog='build_digest.py serve',
+                                     description='Serve rendered content files and archived digests')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='Port (default: 8000)')
+    parser.add_argument('--root', default='.', help='Directory of content files for /render/ (default: .)')
+    parser.add_argument('--dir', default=str(DIGESTS_DIR), help='Archive directory (default: digests/)')
+    args = parser.parse_args(argv)
+
+    server = DigestServer((args.host, args.port), Archive(args.dir), args.root)
+    print(f"Serving on http://{args.host}:{server.server_port}/ (Ctrl-C to stop)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print()
+    finally:
+        server.server_close()
+    return 0
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+def build(args):
+    """Build one digest from args.input (or stdin) to args.output."""
+    # Sections are located up front in the memory-mapped input but only parsed
+    # when rendered, so with the render cache, unchanged sections are never
+    # parsed at all.
+    cache = None if args.no_cache else RenderCache()
+    compactor = Compactor() if args.compact else None
+    editions = None
+    if args.editions:
+        try:
+            editions = load_editions(args.editions)
+        except ValueError as e:
+            sys.exit(f"error: {args.editions}: {e}")
+    with stage('input'):
+        if args.model:
+            with open(args.model, 'r') as f:
+                try:
+                    sections = ModelSections(f)
+                except ValueError as e:
+                    sys.exit(f"error: {args.model}: {e}")
+        else:
+            sections = map_content(args.input or sys.stdin)
+            if cache is not None and sections.size > CACHE_MAX_BYTES:
+                cache = None  # a block this size would evict the whole cache
+
+    if args.check_links:
+        broken, unverified = check_links(sections)
+        if unverified:
+            print(f"warning: {len(unverified)} link(s) refused an automated check; building anyway:",
+                  file=sys.stderr)
+            for link in unverified:
+                print(format_broken_link(*link), file=sys.stderr)
+        if broken:
+            print(f"{len(broken)} broken link(s); not building:", file=sys.stderr)
+            for link in broken:
+                print(format_broken_link(*link), file=sys.stderr)
+            sys.exit(1)
+
+    if args.emit_model:
+        with stage('model'):
+            emit_model(sections, args.emit_model)
+        print(f"Wrote model: {args.emit_model}", file=sys.stderr if args.output == '-' else sys.stdout)
+        if not args.output and not editions:
+            return  # model only
+
+    report = []
+    signatures = StorySignatures()   # shared by the repeat check and the story index
+    if args.repeats != 'off':
+        # Compare with earlier digests in the output's archive (digests/ unless
+        # the output is itself an archive file elsewhere)
+        m = _DIGEST_NAME_RE.match(Path(args.output).name) if args.output else None
+        index_dir, date = (Path(args.output).parent, m.group(1)) if m else (DIGESTS_DIR, None)
+        with stage('repeats'):
+            restore_story_index(index_dir)
+            index = StoryIndex(index_dir)
+            repeats = find_repeats(sections, index, date or f'{datetime.now():%Y-%m-%d}', signatures)
+            index.close()
+        if repeats:
+            report.append(repeats_report(repeats, args.repeats == 'drop'))
+            if args.repeats == 'drop':
+                sections = RepeatFilteredSections(sections, repeats)
+
+    if editions:
+        with stage('editions'):
+            results = write_editions(sections, editions, args.output or EDITIONS_DIR, args.date, args.compact)
+        for edition, output_path, _, kept, compactor in results:
+            print(f"Wrote: {output_path} ({kept} items)")
+            if compactor:
+                report.append(f"{edition.name}: {compactor.report()}")
+        for line in report:
+            print(line)
+        return
+
+    if args.max_bytes:
+        with stage('budget'):
+            view, estimate = plan_budget(sections, args.max_bytes, args.date, args.compact)
+        sections = view  # no body_hash, so budgeted builds bypass the render cache
+        report.append(budget_report(view, estimate, args.max_bytes))
+
+    # Render straight to the output as each section is produced
+    if args.output == '-':
+        with stage('output'):
+            render_digest(sections, sys.stdout, args.date, cache, compactor)
+        if compactor:
+            report.append(compactor.report())
+        for line in report:
+            print(line, file=sys.stderr)
+        return
+
+    if args.output:
+        output_path = args.output
     else:
         # Default output filename
-        date_str = datetime.now().strftime('%Y-%m-%d')
-        output_path = Path(__file__).parent / 'digests' / f'energy-digest-{date_str}.html'
+        output_path = digest_path(datetime.now())
         output_path.parent.mkdir(exist_ok=True)
-        with open(output_path, 'w') as f:
-            f.write(html)
-        print(f"Wrote: {output_path}")
+    write_digest(sections, output_path, args.date, cache, compactor, signatures=signatures)
+    print(f"Wrote: {output_path}")
+    if compactor:
+        report.append(compactor.report())
+    for line in report:
+        print(line)
+
+
+# Subcommands: `build_digest.py <command> ...`
+COMMANDS = {
+    'archive': archive_main,
+    'backparse': backparse_main,
+    'check-links': check_links_main,
+    'merge': merge_main,
+    'search': search_main,
+    'serve': serve_main,
+}
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        sys.exit(COMMANDS[sys.argv[1]](sys.argv[2:]))
+
+    parser = argparse.ArgumentParser(description='Build Energy Digest HTML from structured content',
+                                     epilog=f"commands: {', '.join(COMMANDS)} (see '<command> -h')")
+    parser.add_argument('input', nargs='?', help='Input file (or stdin if not provided)')
+    parser.add_argument('-o', '--output', help="Output HTML file ('-' for stdout)")
+    parser.add_argument('-d', '--date', help='Date string (default: today)')
+    parser.add_argument('--model', metavar='FILE',
+                        help='Render from a JSON model (see --emit-model) instead of a content file')
+    parser.add_argument('--emit-model', metavar='FILE',
+                        help='Write the parsed content as a JSON model to FILE '
+                             '(the HTML is built too only when -o is given)')
+    parser.add_argument('--batch', metavar='SOURCE',
+                        help='Build every content file in a directory or matching a glob; '
+                             '-o names the output directory (default: digests/)')
+    parser.add_argument('-j', '--jobs', type=int, help='Worker processes for --batch (default: CPU count)')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and rebuild whenever the input file changes')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Re-render every section instead of reusing unchanged ones from .digest-cache/')
+    parser.add_argument('--compact', action='store_true',
+                        help='Minify the HTML (same rendering) to stay under email size limits')
+    parser.add_argument('--max-bytes', type=int, metavar='N',
+                        help='Shorten/omit low then medium significance items to fit in N bytes')
+    parser.add_argument('--repeats', choices=('flag', 'drop', 'off'), default='flag',
+                        help='Report (flag) or leave out (drop) stories already published in an earlier '
+                             'digest, by URL or similar title and summary (default: flag)')
+    parser.add_argument('--editions', metavar='FILE',
+                        help='Build each edition defined in FILE (tag, significance and section filters) '
+                             'from one parse; -o names the output directory (default: digests/editions/)')
+    parser.add_argument('--check-links', action='store_true',
+                        help="Don't build if any item or grantee URL is broken (see 'check-links -h')")
+    parser.add_argument('--profile', action='store_true',
+                        help='Print per-stage timings and counters to stderr')
+    parser.add_argument('--trace-json', metavar='FILE',
+                        help='Write per-stage timings as Chrome trace-event JSON')
+    args = parser.parse_args()
+
+    if (args.model or args.emit_model) and (args.batch or args.watch):
+        parser.error('--model/--emit-model apply to single builds, not --batch or --watch')
+    if args.repeats == 'drop' and (args.batch or args.watch):
+        parser.error('--repeats drop applies to single builds, not --batch or --watch')
+    if args.check_links and (args.batch or args.watch):
+        parser.error('--check-links applies to single builds, not --batch or --watch')
+    if args.editions and (args.batch or args.watch or args.max_bytes or args.output == '-'):
+        parser.error('--editions writes one file per edition; it cannot be combined with '
+                     '--batch, --watch, --max-bytes or -o -')
+    if args.model and args.input:
+        parser.error('--model replaces the input file; give one or the other')
+
+    if args.batch:
+        if args.input:
+            parser.error('--batch cannot be combined with an input file')
+        if args.profile or args.trace_json:
+            parser.error('--profile/--trace-json apply to single builds, not --batch')
+        sys.exit(1 if run_batch(args.batch, args.output or DIGESTS_DIR, args.jobs,
+                                   args.compact, args.max_bytes) else 0)
+
+    if args.watch:
+        if not args.input or args.output == '-':
+            parser.error('--watch needs an input file and an output file')
+        output_path = args.output or digest_path(datetime.now())
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        watch(args.input, output_path, args.date, args.compact, args.max_bytes)
+        return
+
+    if not (args.profile or args.trace_json):
+        build(args)
+        return
+
+    with profile() as prof:
+        build(args)
+    if args.profile:
+        print(prof.report(), file=sys.stderr)
+    if args.trace_json:
+        with open(args.trace_json, 'w') as f:
+            json.dump(prof.trace(), f)
+        print(f"Wrote trace: {args.trace_json}", file=sys.stderr)
 
 
 if __name__ == '__main__':
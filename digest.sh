@@ -12,12 +12,187 @@
 #   copy   - Copy content prompt to clipboard, open Claude.ai
 #   build  - Convert content file to branded HTML
 #   view   - View latest digest in browser
+#   merge  - Merge partial content files into one content file
+#   serve  - Preview server for drafts and archived digests (any OS)
 #   send   - Build, commit, push (triggers email)
-#   auto   - Full automation: research, build, send (via Claude Code)
+#   auto   - Full automation: research, build, send (via Claude Code);
+#            resumes at the first incomplete stage, or --from <stage>
+#   status - Show stage checkpoints and timings of the last auto run
 #   help   - Show this help
 
 cd "$(dirname "$0")"
 
+# ============================================================================
+# AUTO PIPELINE CHECKPOINTS
+# ============================================================================
+# Each completed stage of `auto` writes .digest-cache/auto/<stage> as
+# key=value lines, so a rerun resumes at the first incomplete stage instead
+# of repeating the research. Builds and commits are checked against the
+# content hash and git history, not just the presence of a checkpoint.
+
+STATE_DIR=.digest-cache/auto
+STAGES="research build commit push"
+PARTS_DIR=$STATE_DIR/parts
+
+# Research fan-out: each word is one concurrent job's comma-separated sections
+RESEARCH_JOBS="NEWS PUBLICATIONS,CONGRESSIONAL BUSINESS,CHINA GRANTEES MACRO_TRENDS,CALENDAR"
+# Sections drawn from the whole day's research, written after the fan-out
+DERIVED_JOB="TOP_DEVELOPMENTS,KEY_QUESTIONS"
+DERIVED_DIR=$PARTS_DIR/derived
+
+checkpoint_get() {
+  sed -n "s/^$2=//p" "$STATE_DIR/$1" 2>/dev/null
+}
+
+stage_index() {
+  local s i=0
+  for s in $STAGES; do
+    [ "$s" = "$1" ] && { echo $i; return 0; }
+    i=$((i + 1))
+  done
+  return 1
+}
+
+clear_stages_from() {
+  local s n
+  n=$(stage_index "$1")
+  for s in $STAGES; do
+    [ "$(stage_index "$s")" -ge "$n" ] && rm -f "$STATE_DIR/$s"
+  done
+}
+
+stage_done() {
+  [ -f "$STATE_DIR/$1" ] || return 1
+  case "$1" in
+    research)
+      [ -f content.txt ]
+      ;;
+    build)
+      [ -f content.txt ] && [ -f "$(checkpoint_get build file)" ] \
+        && [ "$(checkpoint_get build hash)" = "$(git hash-object content.txt)" ]
+      ;;
+    commit)
+      git merge-base --is-ancestor "$(checkpoint_get commit commit)" HEAD 2>/dev/null
+      ;;
+    push)
+      git merge-base --is-ancestor "$(checkpoint_get push commit)" '@{u}' 2>/dev/null
+      ;;
+  esac
+}
+
+first_incomplete_stage() {
+  local s
+  for s in $STAGES; do
+    stage_done "$s" || { echo "$s"; return; }
+  done
+}
+
+research_job() {
+  # One research job: only the sections in $1 (comma-separated), to
+  # ${2:-$PARTS_DIR}/<job>.txt; $3 is extra instructions for the prompt
+  local part="${2:-$PARTS_DIR}/$(echo "$1" | tr ',' '-').txt" started
+  started=$(date +%s)
+  claude --dangerously-skip-permissions "Read prompts-and-instructions/content-prompt.md and execute it for ONLY these sections: $(echo "$1" | sed 's/,/, /g'). ${3:+$3 }Do all the web searches those sections require, and add a ===LIMITATIONS=== section for gaps in your own searches. When complete, save ONLY the structured output for those sections (each starting with its ===SECTION=== marker) to $part. Do not include any commentary or explanation in the file." \
+    >"$part.log" 2>&1
+  if [ ! -s "$part" ]; then
+    rm -f "$part"
+    echo "  ✗ $1 failed after $(( $(date +%s) - started ))s (see $part.log)"
+    return 1
+  fi
+  echo "  ✓ $1 ($(( $(date +%s) - started ))s)"
+}
+
+stage_research() {
+  # Section groups are researched concurrently and merged, so the fan-out
+  # takes about as long as its slowest group. The derived sections (top
+  # developments, key questions) are then written from the merged research
+  # in a second step. Finished parts are kept across a failed run, so a rerun
+  # only repeats the groups that failed, and the derived sections only if
+  # any group was redone.
+  echo "Step 1/4: Researching news via Claude Code in parallel (this takes a few minutes)..."
+  mkdir -p "$PARTS_DIR"
+  local job pids="" failed=0
+  local gathered="$STATE_DIR/gathered.txt"
+  local derived="$DERIVED_DIR/$(echo "$DERIVED_JOB" | tr ',' '-').txt"
+  for job in $RESEARCH_JOBS; do
+    if [ -s "$PARTS_DIR/$(echo "$job" | tr ',' '-').txt" ]; then
+      echo "  ✓ $job (kept from the last run)"
+    else
+      research_job "$job" &
+      pids="$pids $!"
+      rm -f "$derived"
+    fi
+  done
+  for job in $pids; do
+    wait "$job" || failed=1
+  done
+  [ "$failed" = 0 ] || return 1
+  python3 build_digest.py merge "$PARTS_DIR"/*.txt -o "$gathered" || return 1
+
+  mkdir -p "$DERIVED_DIR"
+  if [ -s "$derived" ]; then
+    echo "  ✓ $DERIVED_JOB (kept from the last run)"
+  else
+    research_job "$DERIVED_JOB" "$DERIVED_DIR" "Write them from the research already gathered in $gathered, covering the day's most significant items there; search the web only to fill gaps it leaves." || return 1
+  fi
+
+  rm -f content.txt
+  python3 build_digest.py merge "$gathered" "$derived" -o content.txt || return 1
+  if [ ! -f "content.txt" ]; then
+    echo "Error: content.txt was not created"
+    return 1
+  fi
+  CHECKPOINT="hash=$(git hash-object content.txt)"
+}
+
+stage_build() {
+  echo "Step 2/4: Checking links and building HTML digest..."
+  # Broken links stop the run here; fix content.txt and rerun to resume
+  python3 build_digest.py --check-links content.txt || return 1
+  # Per-audience variants (digests/editions/<edition>/), if any are configured
+  if [ -f editions.json ]; then
+    python3 build_digest.py content.txt --editions editions.json --repeats off || return 1
+  fi
+  FILE=$(python3 build_digest.py archive latest 2>/dev/null)
+  CHECKPOINT="hash=$(git hash-object content.txt)
+file=$FILE"
+}
+
+stage_commit() {
+  echo "Step 3/4: Committing digest..."
+  FILE=$(checkpoint_get build file)
+  git add "$FILE" digests/manifest.json || return 1
+  if [ -d digests/editions ]; then
+    git add digests/editions || return 1
+  fi
+  # Already committed by a run that died before its checkpoint was written
+  if ! git diff --cached --quiet; then
+    git commit -m "Add $(basename "$FILE" .html | sed 's/energy-digest-//') digest" || return 1
+  fi
+  CHECKPOINT="commit=$(git rev-parse HEAD)"
+}
+
+stage_push() {
+  echo "Step 4/4: Pushing to GitHub..."
+  git push || return 1
+  CHECKPOINT="commit=$(checkpoint_get commit commit)"
+}
+
+run_stage() {
+  STARTED=$(date +%s)
+  CHECKPOINT=""
+  if ! "stage_$1"; then
+    echo ""
+    echo "Stage '$1' failed after $(( $(date +%s) - STARTED ))s"
+    echo "Fix the problem and rerun './digest.sh auto' to resume from '$1'"
+    exit 1
+  fi
+  mkdir -p "$STATE_DIR"
+  printf '%s\nseconds=%s\nfinished=%s\n' "$CHECKPOINT" "$(( $(date +%s) - STARTED ))" \
+    "$(date '+%Y-%m-%d %H:%M:%S')" > "$STATE_DIR/$1"
+  echo ""
+}
+
 case "${1:-help}" in
   copy)
     cat prompts-and-instructions/content-prompt.md | pbcopy
@@ -55,9 +230,16 @@ case "${1:-help}" in
     ;;
 
   view)
-    FILE=$(ls -t digests/energy-digest-*.html 2>/dev/null | head -1)
+    FILE=$(python3 build_digest.py archive latest 2>/dev/null)
     if [ -n "$FILE" ]; then
-      open "$FILE"
+      if command -v open >/dev/null 2>&1; then
+        open "$FILE"
+      elif command -v xdg-open >/dev/null 2>&1; then
+        xdg-open "$FILE" >/dev/null 2>&1
+      else
+        echo "No browser opener found; run './digest.sh serve' and visit /latest"
+        exit 1
+      fi
       echo "Opened: $FILE"
     else
       echo "No HTML digest found in digests/"
@@ -65,6 +247,20 @@ case "${1:-help}" in
     fi
     ;;
 
+  merge)
+    shift
+    if [ $# -eq 0 ]; then
+      echo "Usage: ./digest.sh merge <part-file>... [-o content.txt]"
+      exit 1
+    fi
+    python3 build_digest.py merge "$@"
+    ;;
+
+  serve)
+    shift
+    python3 build_digest.py serve "$@"
+    ;;
+
   send)
     # Build if content file provided
     if [ -n "$2" ]; then
@@ -77,14 +273,14 @@ case "${1:-help}" in
     fi
 
     # Get latest digest
-    FILE=$(ls -t digests/energy-digest-*.html 2>/dev/null | head -1)
+    FILE=$(python3 build_digest.py archive latest 2>/dev/null)
     if [ -z "$FILE" ]; then
       echo "Error: No digest found. Run './digest.sh build <content-file>' first"
       exit 1
     fi
 
     echo "Sending: $FILE"
-    git add "$FILE"
+    git add "$FILE" digests/manifest.json
     git commit -m "Add $(basename "$FILE" .html | sed 's/energy-digest-//' ) digest"
     git push
 
@@ -94,37 +290,73 @@ case "${1:-help}" in
     ;;
 
   auto)
-    echo "🚀 Starting automated digest generation..."
-    echo ""
-
-    # Remove old content.txt if exists
-    rm -f content.txt
+    shift
+    FROM=""
+    while [ $# -gt 0 ]; do
+      case "$1" in
+        --from) FROM="$2"; shift 2 ;;
+        --from=*) FROM="${1#--from=}"; shift ;;
+        *) echo "Unknown option: $1"; echo "Usage: ./digest.sh auto [--from research|build|commit|push]"; exit 1 ;;
+      esac
+    done
 
-    # Run content prompt via Claude Code with full tool access
-    echo "Step 1/3: Researching news via Claude Code (this takes a few minutes)..."
-    claude --dangerously-skip-permissions "Read and execute prompts-and-instructions/content-prompt.md in full. Do all required web searches. When complete, save ONLY the structured output (starting with ===TOP_DEVELOPMENTS===) to content.txt. Do not include any commentary or explanation in the file."
-
-    if [ ! -f "content.txt" ]; then
-      echo "Error: content.txt was not created"
-      exit 1
+    if [ -n "$FROM" ]; then
+      stage_index "$FROM" >/dev/null || { echo "Unknown stage: $FROM (expected: $STAGES)"; exit 1; }
+      [ "$FROM" = research ] && rm -rf "$PARTS_DIR"
+    elif [ -f "$STATE_DIR/push" ]; then
+      # The last run went all the way through: this is a new digest
+      FROM=research
+      rm -rf "$PARTS_DIR"
+    else
+      FROM=$(first_incomplete_stage)
     fi
 
-    echo ""
-    echo "Step 2/3: Building HTML digest..."
-    python3 build_digest.py content.txt
+    if [ -z "$FROM" ]; then
+      echo "All stages complete. Use --from <stage> to redo one."
+      exit 0
+    fi
 
+    echo "🚀 Starting automated digest generation from stage '$FROM'..."
     echo ""
-    echo "Step 3/3: Pushing to GitHub..."
-    FILE=$(ls -t digests/energy-digest-*.html 2>/dev/null | head -1)
-    git add "$FILE"
-    git commit -m "Add $(basename "$FILE" .html | sed 's/energy-digest-//') digest"
-    git push
+    clear_stages_from "$FROM"
+    RUNNING=0
+    for STAGE in $STAGES; do
+      [ "$STAGE" = "$FROM" ] && RUNNING=1
+      [ "$RUNNING" = 1 ] && run_stage "$STAGE"
+    done
 
     echo ""
     echo "✅ Done! Email will arrive shortly."
     echo "Check: https://github.com/zpybt6jjnf-ship-it/daily-digest/actions"
     ;;
 
+  status)
+    if [ ! -d "$STATE_DIR" ]; then
+      echo "No automated run recorded yet"
+      exit 0
+    fi
+    printf '%-10s %-8s %9s  %-19s  %s\n' stage state seconds finished detail
+    for STAGE in $STAGES; do
+      if [ -f "$STATE_DIR/$STAGE" ]; then
+        if stage_done "$STAGE"; then STATE=done; else STATE=stale; fi
+        case "$STAGE" in
+          research) DETAIL="content $(checkpoint_get research hash | cut -c1-12)" ;;
+          build) DETAIL=$(checkpoint_get build file) ;;
+          *) DETAIL="commit $(checkpoint_get "$STAGE" commit | cut -c1-12)" ;;
+        esac
+        printf '%-10s %-8s %9s  %-19s  %s\n' "$STAGE" "$STATE" \
+          "$(checkpoint_get "$STAGE" seconds)" "$(checkpoint_get "$STAGE" finished)" "$DETAIL"
+      else
+        printf '%-10s %-8s %9s  %-19s  %s\n' "$STAGE" pending - - -
+      fi
+    done
+    if [ -f content.txt ] && [ -f "$STATE_DIR/research" ] \
+        && [ "$(git hash-object content.txt)" != "$(checkpoint_get research hash)" ]; then
+      echo ""
+      echo "content.txt has been edited since research; the next run rebuilds from it"
+    fi
+    ;;
+
   help|--help|-h|"")
     echo "Daily Digest Helper"
     echo ""
@@ -136,10 +368,14 @@ case "${1:-help}" in
     echo "  5. ./digest.sh view          Preview in browser"
     echo ""
     echo "COMMANDS:"
-    echo "  auto              Full automation (Claude Code → build → email)"
+    echo "  auto [--from S]   Full automation (Claude Code → build → email);"
+    echo "                    resumes after failures; S = research|build|commit|push"
+    echo "  status            Show auto stage checkpoints and timings"
     echo "  copy              Copy content prompt to clipboard"
     echo "  build <file>      Convert content file to branded HTML"
     echo "  view              Open latest digest in browser"
+    echo "  merge <files>     Merge partial content files (-o content.txt)"
+    echo "  serve [--port N]  Preview server (http://127.0.0.1:8000/)"
     echo "  send [file]       Build (optional), commit, push, email"
     echo "  help              Show this help"
     ;;
@@ -0,0 +1,13 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def content_path():
+    """The sample content file the design is developed against."""
+    return ROOT / 'test-content.txt'
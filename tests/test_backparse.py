@@ -0,0 +1,40 @@
+import io
+
+import pytest
+
+import build_digest
+
+DATE = 'Jan 21, 2026'
+
+
+def visible(sections):
+    """`sections` as far as a reader can see them: two tags per card, no significance."""
+    for name in build_digest.ITEM_SECTIONS:
+        items = sections.get(name, [])
+        if name == 'NEWS':
+            items = [item for sub in items for item in sub.items]
+        for item in items:
+            item.tags = item.tags[:2]
+            item.significance = build_digest.Significance.NONE
+    return sections
+
+
+def model(sections):
+    return {name: build_digest.model_section(name, sections[name]) for name in sections}
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_parse_of_render_is_identity(content_path, compact):
+    sections = visible(build_digest.parse_content(content_path.read_text()))
+    out = io.StringIO()
+    build_digest.render_digest(sections, out, DATE,
+                               compactor=build_digest.Compactor() if compact else None)
+    parsed, date = build_digest.parse_digest_html(io.StringIO(out.getvalue()))
+    assert date == DATE
+    assert model(parsed) == model(sections)
+
+
+def test_cards_carry_no_hidden_fields(content_path):
+    out = io.StringIO()
+    build_digest.render_digest(build_digest.parse_content(content_path.read_text()), out, DATE)
+    assert ' data-' not in out.getvalue()
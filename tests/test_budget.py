@@ -0,0 +1,63 @@
+import io
+
+import pytest
+
+import build_digest
+from benchmarks.generate import generate
+
+DATE = 'Jan 21, 2026'
+
+
+@pytest.fixture(params=['sample', 'generated'])
+def sections(request, content_path):
+    if request.param == 'sample':
+        return build_digest.parse_content(content_path.read_text())
+    return generated()
+
+
+def generated():
+    """Synthetic content with many items of each significance."""
+    out = io.StringIO()
+    generate(out, items=30, subsections=3, calendar=5, grantees=5)
+    return build_digest.parse_content(out.getvalue())
+
+
+def rendered_size(sections, compact):
+    out = io.StringIO()
+    build_digest.render_digest(sections, out, DATE, compactor=build_digest.Compactor() if compact else None)
+    return len(out.getvalue().encode())
+
+
+def cards(sections, significance):
+    """Keys of the items of one significance, in document order."""
+    return [key for key, item in build_digest.iter_keyed_items(sections)
+            if (item['significance'] if item['significance'] in ('high', 'low') else 'medium') == significance]
+
+
+@pytest.mark.parametrize('compact', [False, True])
+@pytest.mark.parametrize('max_bytes', [10 ** 6, 50000, 40000, 30000, 1000])
+def test_estimate_is_the_output_size(sections, compact, max_bytes):
+    view, estimate = build_digest.plan_budget(sections, max_bytes, DATE, compact)
+    assert estimate == rendered_size(view, compact)
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_trimming_follows_significance(compact):
+    sections = generated()
+    low, medium, high = (cards(sections, s) for s in ('low', 'medium', 'high'))
+    full = rendered_size(sections, compact)
+    steps = set()
+    for max_bytes in range(full, 0, -1500):
+        view, estimate = build_digest.plan_budget(sections, max_bytes, DATE, compact)
+        assert estimate <= max_bytes or not (set(low) | set(medium)) - view.drop
+        assert view.shorten <= set(low)
+        assert not view.drop & set(high)
+        if view.drop & set(low):
+            assert view.shorten == set(low)      # shortening came first
+        if view.drop & set(medium):
+            assert set(low) <= view.drop         # lows went before any medium
+        for group in (low, medium):              # last in the document go first
+            dropped = [key in view.drop for key in group]
+            assert dropped == sorted(dropped)
+        steps.add((bool(view.shorten), bool(view.drop & set(low)), bool(view.drop & set(medium))))
+    assert steps == {(False, False, False), (True, False, False), (True, True, False), (True, True, True)}
@@ -0,0 +1,88 @@
+import json
+from html.parser import HTMLParser
+
+import pytest
+
+import build_digest
+
+DATE = 'Jan 21, 2026'
+VOID_TAGS = {'meta', 'br', 'img', 'hr', 'link', 'input'}
+
+
+class TagBalance(HTMLParser):
+    """Records end tags that don't close the innermost open element."""
+
+    def __init__(self):
+        super().__init__()
+        self.open = []
+        self.mismatched = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in VOID_TAGS:
+            self.open.append(tag)
+
+    def handle_endtag(self, tag):
+        if self.open and self.open[-1] == tag:
+            self.open.pop()
+        else:
+            self.mismatched.append(tag)
+
+
+def assert_balanced(html):
+    parser = TagBalance()
+    parser.feed(html)
+    parser.close()
+    assert parser.open == [] and parser.mismatched == []
+
+
+def build_editions(tmp_path, content_path, config):
+    tmp_path.mkdir(exist_ok=True)
+    path = tmp_path / 'editions.json'
+    path.write_text(json.dumps(config))
+    with open(content_path) as f:
+        sections = build_digest.parse_content(f)
+    results = build_digest.write_editions(sections, build_digest.load_editions(path),
+                                          tmp_path / 'out', DATE)
+    return {edition.name: output_path.read_text() for edition, output_path, *_ in results}
+
+
+def test_full_edition_matches_normal_build(tmp_path, content_path):
+    html = build_editions(tmp_path, content_path, {'full': {}})['full']
+    with open(content_path) as f:
+        assert html == build_digest.build_html(build_digest.parse_content(f), DATE)
+
+
+@pytest.mark.parametrize('sections', [['CALENDAR'], ['NEWS', 'KEY_QUESTIONS'], ['LIMITATIONS']])
+def test_section_filtered_edition_is_balanced(tmp_path, content_path, sections):
+    html = build_editions(tmp_path, content_path, {'part': {'sections': sections}})['part']
+    assert_balanced(html)
+    assert ('Top Developments' in html) == ('TOP_DEVELOPMENTS' in sections)
+    assert ('Key Questions' in html) == ('KEY_QUESTIONS' in sections)
+
+
+def test_shared_blocks_do_not_depend_on_edition_order(tmp_path, content_path):
+    cal = {'sections': ['CALENDAR']}
+    first = build_editions(tmp_path / 'a', content_path, {'cal': cal, 'all': {}})
+    second = build_editions(tmp_path / 'b', content_path, {'all': {}, 'cal': cal})
+    assert first == second
+    assert 'Key Questions' in first['all'] and 'Key Questions' not in first['cal']
+
+
+def test_tag_edition_keeps_only_tagged_items(tmp_path, content_path):
+    html = build_editions(tmp_path, content_path, {'nuclear': {'tags': ['Nuclear']}})['nuclear']
+    assert_balanced(html)
+    path, = (tmp_path / 'out' / 'nuclear').glob('*.html')
+    sections, _ = build_digest.parse_digest_html(path)
+    items = [item for _, item in build_digest.iter_keyed_items(sections)]
+    assert items and all('Nuclear' in item['tags'] for item in items)
+
+
+@pytest.mark.parametrize('config', [
+    [], {'bad name': {}}, {'a': {'tag': ['Nuclear']}}, {'a': {'tags': ['nuclear']}},
+    {'a': {'significance': 'high'}}, {'a': {'sections': ['FOO']}},
+])
+def test_malformed_editions_are_rejected(tmp_path, config):
+    path = tmp_path / 'editions.json'
+    path.write_text(json.dumps(config))
+    with pytest.raises(ValueError):
+        build_digest.load_editions(path)
@@ -0,0 +1,70 @@
+import io
+from html.parser import HTMLParser
+
+import pytest
+
+import build_digest
+
+TITLE = 'AT&T\'s "Grid" <Plan> & O\'Brien'
+URL = 'https://example.com/a?b=1&c="x"&d=\'y\'&e=<z>'
+TAGS = ('R&D', '"Grid" <A>')
+SOURCE = 'Q&A <Live>'
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('plain text', 'plain text'),
+    ('', ''),
+    ('&', '&amp;'),
+    ('<', '&lt;'),
+    ('>', '&gt;'),
+    ('"', '&quot;'),
+    ("'", '&#39;'),
+    ('&amp;', '&amp;amp;'),   # already-escaped text is escaped again: the model is plain text
+    (TITLE, 'AT&amp;T&#39;s &quot;Grid&quot; &lt;Plan&gt; &amp; O&#39;Brien'),
+])
+def test_html_escape(text, expected):
+    assert build_digest.html_escape(text) == expected
+
+
+class Attributes(HTMLParser):
+    """Collects hrefs and the text of every element."""
+
+    def __init__(self):
+        super().__init__()
+        self.hrefs, self.text = [], []
+
+    def handle_starttag(self, tag, attrs):
+        self.hrefs += [value for name, value in attrs if name == 'href']
+
+    def handle_data(self, data):
+        self.text.append(data)
+
+
+@pytest.fixture
+def page():
+    text = (f'===PUBLICATIONS===\nITEM:\ntags: [{", ".join(TAGS)}]\nsignificance: high\n'
+            f'title: {TITLE}\nsource: {SOURCE}\ndate: Jan 20\nsummary: Costs < $5 & rising\nurl: {URL}\n')
+    out = io.StringIO()
+    build_digest.render_digest(build_digest.parse_content(text), out, 'Jan 21, 2026')
+    return out.getvalue()
+
+
+def test_special_characters_are_escaped_in_cards(page):
+    for raw in (TITLE, URL, SOURCE, *TAGS):
+        assert raw not in page
+        assert build_digest.html_escape(raw) in page
+
+
+def test_escaped_fields_read_back_as_written(page):
+    parser = Attributes()
+    parser.feed(page)
+    assert URL in parser.hrefs
+    text = ''.join(parser.text)
+    for raw in (TITLE, SOURCE, *TAGS):
+        assert raw in text
+
+
+def test_escaped_fields_survive_a_back_parse(page):
+    sections, _ = build_digest.parse_digest_html(io.StringIO(page))
+    item = sections['PUBLICATIONS'][0]
+    assert (item['title'], item['url'], item['source'], tuple(item['tags'])) == (TITLE, URL, SOURCE, TAGS)
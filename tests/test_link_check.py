@@ -0,0 +1,136 @@
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+import build_digest
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves the cases the link checker has to handle, by path."""
+
+    protocol_version = 'HTTP/1.1'
+    requests = []   # (method, path, Host header)
+
+    def reply(self, status, headers=(), body=b''):
+        self.send_response(status)
+        for key, value in headers:
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.requests.append((self.command, self.path, self.headers['Host']))
+        if self.path == '/ok':
+            self.reply(200)
+        elif self.path == '/moved':
+            self.reply(301, [('Location', '/ok')])
+        elif self.path == '/loop':
+            self.reply(302, [('Location', '/loop')])
+        elif self.path == '/no-head':
+            self.reply(405 if self.command == 'HEAD' else 200, body=b'page')
+        elif self.path in ('/drop-head', '/cut-head') and self.command == 'HEAD':
+            if self.path == '/cut-head':
+                self.wfile.write(b'HTTP/1.1 200')   # closed mid status line
+            self.close_connection = True
+        elif self.path in ('/drop-head', '/cut-head'):
+            self.reply(200, body=b'page')
+        elif self.path == '/bare':
+            self.wfile.write(b'HTTP/1.1 200\r\nContent-Length: 0\r\n\r\n')
+        elif self.path == '/blocked':
+            self.reply(403)
+        elif self.path == '/throttled':
+            self.reply(429)
+        else:
+            self.reply(404)
+
+    do_GET = do_HEAD
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def requests():
+    StandInHandler.requests.clear()
+    return StandInHandler.requests
+
+
+def check(server, path, cache_path=None):
+    url = server + path
+    return build_digest.LinkChecker(cache_path, timeout=5).check([url])[url]
+
+
+def test_working_link(server):
+    result = check(server, '/ok')
+    assert result['ok'] and result['status'] == 200 and not result['inconclusive']
+
+
+def test_redirect_is_followed(server, requests):
+    assert check(server, '/moved')['status'] == 200
+    assert [path for _, path, _ in requests] == ['/moved', '/ok']
+
+
+def test_redirect_loop_is_broken(server):
+    result = check(server, '/loop')
+    assert not result['ok'] and result['error'] == 'too many redirects'
+
+
+def test_head_rejected_falls_back_to_get(server, requests):
+    assert check(server, '/no-head')['ok']
+    assert [method for method, _, _ in requests] == ['HEAD', 'GET']
+
+
+@pytest.mark.parametrize('path', ['/drop-head', '/cut-head'])
+def test_head_dropped_falls_back_to_get(server, requests, path):
+    assert check(server, path)['ok']
+    assert [method for method, _, _ in requests] == ['HEAD', 'GET']
+
+
+def test_status_line_without_reason(server):
+    assert check(server, '/bare')['ok']
+
+
+def test_missing_page_is_broken(server):
+    result = check(server, '/gone')
+    assert not result['ok'] and result['status'] == 404 and not result['inconclusive']
+
+
+@pytest.mark.parametrize('path', ['/blocked', '/throttled'])
+def test_bot_blocks_are_inconclusive(server, path):
+    result = check(server, path)
+    assert not result['ok'] and result['inconclusive']
+
+
+def test_host_header_carries_non_default_port(server, requests):
+    check(server, '/ok')
+    assert requests[0][2] == server.split('//')[1]
+
+
+def test_cache_hit_skips_the_network(server, requests, tmp_path):
+    cache = tmp_path / 'links.json'
+    assert check(server, '/ok', cache)['ok']
+    assert len(requests) == 1
+    assert check(server, '/ok', cache)['ok']
+    assert len(requests) == 1
+
+
+def test_check_links_separates_broken_from_unverified(server):
+    text = '===PUBLICATIONS===\n' + ''.join(
+        f'ITEM:\ntitle: {path}\nurl: {server}{path}\n\n' for path in ('/ok', '/gone', '/blocked'))
+    broken, unverified = build_digest.check_links(build_digest.parse_content(text),
+                                                  build_digest.LinkChecker(None, timeout=5))
+    assert [title for _, _, title, _ in broken] == ['/gone']
+    assert [title for _, _, title, _ in unverified] == ['/blocked']
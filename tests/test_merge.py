@@ -0,0 +1,96 @@
+from pathlib import Path
+
+import pytest
+
+import build_digest
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 'merge'
+
+
+def merge_texts(*texts):
+    merge = build_digest.ContentMerge()
+    for i, text in enumerate(texts):
+        merge.add(build_digest.parse_content(text), f'part{i}')
+    return merge.result(), merge.conflicts
+
+
+def item(title, url, **fields):
+    lines = ['ITEM:', f'title: {title}', f'url: {url}'] + [f'{k}: {v}' for k, v in fields.items()]
+    return '\n'.join(lines) + '\n\n'
+
+
+def test_fixture_files_merge_to_expected():
+    sections, conflicts = build_digest.merge_files([FIXTURES / 'news.txt', FIXTURES / 'mixed.txt'])
+    assert build_digest.format_content(sections) == (FIXTURES / 'expected.txt').read_text()
+    assert len(conflicts) == 1 and 'kept the first' in conflicts[0]
+
+
+@pytest.mark.parametrize('first, second', [
+    ('https://www.example.com/story/', 'http://example.com/story'),
+    ('https://example.com/a?id=1', 'https://example.com/a?id=1'),
+])
+def test_duplicate_urls_are_dropped(first, second):
+    sections, conflicts = merge_texts('===PUBLICATIONS===\n' + item('One', first),
+                                      '===PUBLICATIONS===\n' + item('Another title', second))
+    assert [i['title'] for i in sections['PUBLICATIONS']] == ['One']
+    assert len(conflicts) == 1   # the titles differ
+
+
+def test_duplicate_titles_are_dropped_across_urls():
+    sections, conflicts = merge_texts('===CHINA===\n' + item('Grid Buildout: Phase 2', 'https://a.cn/1'),
+                                      '===CHINA===\n' + item('grid buildout — phase 2', 'https://b.cn/2'))
+    assert len(sections['CHINA']) == 1
+    assert 'url' in conflicts[0]
+
+
+def test_identical_duplicates_are_not_conflicts():
+    text = '===BUSINESS===\n' + item('Deal', 'https://x.com/deal', source='Reuters')
+    sections, conflicts = merge_texts(text, text)
+    assert len(sections['BUSINESS']) == 1 and conflicts == []
+
+
+def test_conflicts_name_each_differing_field():
+    _, conflicts = merge_texts('===BUSINESS===\n' + item('Deal', 'https://x.com/deal', source='Reuters',
+                                                         significance='high'),
+                               '===BUSINESS===\n' + item('Deal', 'https://x.com/deal', source='Bloomberg',
+                                                         significance='high'))
+    assert conflicts == ["BUSINESS: 'Deal' in part1 duplicates part0; kept the first "
+                         "(source Reuters vs Bloomberg)"]
+
+
+def test_same_url_in_different_sections_is_kept():
+    sections, conflicts = merge_texts('===NEWS===\n##SUBSECTION: A\n' + item('Deal', 'https://x.com/deal'),
+                                      '===BUSINESS===\n' + item('Deal', 'https://x.com/deal'))
+    assert len(sections['NEWS'][0]['items']) == 1 and len(sections['BUSINESS']) == 1
+    assert conflicts == []
+
+
+def test_sections_come_out_in_canonical_order():
+    sections, _ = merge_texts('===LIMITATIONS===\n- Gap\n\n===EXTRA===\nNotes',
+                              '===CALENDAR===\n| Date | Event | Significance |\n|---|---|---|\n'
+                              '| Jan 22 | Hearing | high |\n\n===TOP_DEVELOPMENTS===\n- Lead',
+                              '===NEWS===\n##SUBSECTION: A\n' + item('Deal', 'https://x.com/deal'))
+    assert list(sections) == ['TOP_DEVELOPMENTS', 'NEWS', 'CALENDAR', 'LIMITATIONS', 'EXTRA']
+
+
+def test_news_subsections_merge_by_name():
+    sections, _ = merge_texts('===NEWS===\n##SUBSECTION: Federal\n' + item('One', 'https://x.com/1'),
+                              '===NEWS===\n##SUBSECTION: States\n' + item('Two', 'https://x.com/2')
+                              + '##SUBSECTION: FEDERAL\n' + item('Three', 'https://x.com/3'))
+    assert [(sub['name'], [i['title'] for i in sub['items']]) for sub in sections['NEWS']] == [
+        ('Federal', ['One', 'Three']), ('States', ['Two'])]
+
+
+def test_grantees_with_publications_leave_no_publications_list():
+    sections, _ = merge_texts('===GRANTEES===\nNO_PUBLICATIONS: Acme Institute, Beta Lab',
+                              '===GRANTEES===\nORG: Acme Institute\ntitle: Report\nurl: https://acme.org/r')
+    orgs, no_pubs = sections['GRANTEES']
+    assert [org['name'] for org in orgs] == ['Acme Institute'] and no_pubs == ['Beta Lab']
+
+
+def test_strict_merge_exits_2_on_conflicts(tmp_path):
+    out = tmp_path / 'content.txt'
+    argv = [str(FIXTURES / 'news.txt'), str(FIXTURES / 'mixed.txt'), '-o', str(out)]
+    assert build_digest.merge_main(argv) == 0
+    assert build_digest.merge_main(argv + ['--strict']) == 2
+    assert out.read_text() == (FIXTURES / 'expected.txt').read_text()
@@ -0,0 +1,48 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+import build_digest
+from conftest import ROOT
+
+
+def build(*args):
+    return subprocess.run([sys.executable, str(ROOT / 'build_digest.py'), *args, '-d', 'Jan 21, 2026',
+                           '--repeats', 'off', '--no-cache'], capture_output=True, cwd=ROOT)
+
+
+@pytest.fixture
+def model_path(tmp_path, content_path):
+    path = tmp_path / 'model.json'
+    assert build(str(content_path), '--emit-model', str(path)).returncode == 0
+    return path
+
+
+@pytest.mark.parametrize('compact', [[], ['--compact']])
+def test_model_renders_like_its_content(content_path, model_path, compact):
+    from_text = build(str(content_path), '-o', '-', *compact)
+    from_model = build('--model', str(model_path), '-o', '-', *compact)
+    assert from_text.returncode == from_model.returncode == 0
+    assert from_model.stdout == from_text.stdout
+
+
+def test_reformatted_model_renders_the_same(content_path, model_path):
+    model_path.write_text(json.dumps(json.loads(model_path.read_text()), indent=2))
+    assert build('--model', str(model_path), '-o', '-').stdout == build(str(content_path), '-o', '-').stdout
+
+
+@pytest.mark.parametrize('header, message', [
+    ({'format': 'something-else', 'version': 1}, 'not a digest model'),
+    ({'version': 1}, 'not a digest model'),
+    ({'format': 'energy-digest-model', 'version': 2}, 'unsupported model version 2'),
+    ({'format': 'energy-digest-model'}, 'unsupported model version None'),
+])
+def test_bad_header_is_rejected(tmp_path, header, message):
+    with pytest.raises(ValueError, match=message):
+        build_digest.ModelSections(json.dumps({**header, 'sections': {}}))
+    path = tmp_path / 'bad.json'
+    path.write_text(json.dumps({**header, 'sections': {}}))
+    result = build('--model', str(path), '-o', '-')
+    assert result.returncode != 0 and message in result.stderr.decode() and not result.stdout
@@ -0,0 +1,89 @@
+import io
+
+import pytest
+
+import build_digest
+
+
+def model(sections):
+    return {name: build_digest.model_section(name, sections[name]) for name in sections}
+
+
+def eager(path):
+    """Parse a content file in one pass of tokenize() over its lines, as
+    parse_content did before sections were located and parsed lazily."""
+    events = {}
+    tokens = None
+    with open(path) as f:
+        for token in build_digest.tokenize(f):
+            if token.kind == build_digest.SECTION:
+                tokens = events[token.value] = []
+            elif tokens is not None:
+                tokens.append(token)
+    return {name: build_digest.model_section(name, build_digest.parse_section(name, tokens))
+            for name, tokens in events.items()}
+
+
+@pytest.fixture(params=['lf', 'crlf', 'empty', 'no sections', 'blank sections'])
+def content(request, content_path, tmp_path):
+    text = {
+        'lf': content_path.read_text(),
+        'crlf': content_path.read_text().replace('\n', '\r\n'),
+        'empty': '',
+        'no sections': 'Notes before any marker\n',
+        'blank sections': '===NEWS===\n\n===MACRO_TRENDS===\r\n \r\n===CALENDAR===',
+    }[request.param]
+    path = tmp_path / 'content.txt'
+    path.write_bytes(text.encode())
+    return path
+
+
+def test_lazy_matches_eager(content):
+    assert model(build_digest.parse_content(content.read_bytes().decode())) == eager(content)
+
+
+def test_lazy_from_file_matches_eager(content):
+    with open(content) as f:
+        assert model(build_digest.parse_content(f)) == eager(content)
+
+
+def test_crlf_parses_like_lf(content_path):
+    text = content_path.read_text()
+    assert model(build_digest.parse_content(text.replace('\n', '\r\n'))) == \
+        model(build_digest.parse_content(text))
+
+
+def test_item_count_matches_parsed(content_path):
+    sections = build_digest.parse_content(content_path.read_text())
+    counts = build_digest.count_items(sections)
+    assert counts == {name: build_digest.section_size(name, sections[name]) for name in counts}
+
+
+def test_mapped_matches_eager(content):
+    assert model(build_digest.map_content(content)) == eager(content)
+
+
+def test_mapped_stream_matches_eager(content):
+    with open(content, 'rb') as f:   # a regular file is mapped directly
+        assert model(build_digest.map_content(f)) == eager(content)
+
+
+def test_spooled_stream_matches_eager(content):
+    stream = io.BytesIO(content.read_bytes())   # no file descriptor: spooled to a temp file first
+    assert model(build_digest.map_content(stream)) == eager(content)
+
+
+def test_mapped_counts_and_spans(content_path):
+    sections = build_digest.map_content(content_path)
+    counts = build_digest.count_items(sections)   # before parsing: counted in the mapped bytes
+    assert counts == {name: build_digest.section_size(name, sections[name]) for name in counts}
+    items = sections['PUBLICATIONS']
+    assert isinstance(items, build_digest.ItemSpans)
+    assert [items[i] for i in range(len(items))] == list(items) == items[:]
+    assert items[-1:] == [items[len(items) - 1]]
+
+
+def test_mapped_hashes_match_lazy(content_path):
+    mapped = build_digest.map_content(content_path)
+    lazy = build_digest.parse_content(content_path.read_text())
+    assert {name: mapped.body_hash(name) for name in mapped} == {name: lazy.body_hash(name) for name in lazy}
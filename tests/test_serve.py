@@ -0,0 +1,44 @@
+from datetime import datetime
+
+import pytest
+
+import build_digest
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = build_digest.DigestServer(('127.0.0.1', 0), build_digest.Archive(tmp_path), tmp_path)
+    yield server
+    server.server_close()
+
+
+def on_day(monkeypatch, day):
+    class Today(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2026, 1, day, 9, 30)
+    monkeypatch.setattr(build_digest, 'datetime', Today)
+
+
+def test_undated_draft_is_rerendered_after_midnight(server, tmp_path, content_path, monkeypatch):
+    draft = tmp_path / 'content.txt'
+    draft.write_bytes(content_path.read_bytes())
+    on_day(monkeypatch, 20)
+    etag, body = server.render(draft)
+    assert server.render(draft) == (etag, body)
+    assert b'Jan 20, 2026' in body
+
+    on_day(monkeypatch, 21)
+    next_etag, next_body = server.render(draft)
+    assert next_etag != etag
+    assert b'Jan 21, 2026' in next_body and b'Jan 20, 2026' not in next_body
+
+
+def test_dated_draft_shows_its_file_name_date(server, tmp_path, content_path, monkeypatch):
+    draft = tmp_path / 'content-2026-01-05.txt'
+    draft.write_bytes(content_path.read_bytes())
+    on_day(monkeypatch, 20)
+    etag, body = server.render(draft)
+    assert b'Jan 05, 2026' in body
+    on_day(monkeypatch, 21)
+    assert server.render(draft) == (etag, body)
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+import build_digest
+
+
+def story(title, url, summary='', section='PUBLICATIONS', tags=''):
+    return [url, build_digest.story_signature(title, summary), title, section, 'Source', tags, summary]
+
+
+def sections(*items):
+    text = '===PUBLICATIONS===\n' + ''.join(
+        f'ITEM:\ntitle: {title}\nurl: {url}\nsummary: {summary}\n\n' for title, url, summary in items)
+    return build_digest.parse_content(text)
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_digest, 'CACHE_DIR', tmp_path / 'cache')
+    index = build_digest.StoryIndex(tmp_path / 'digests')
+    index.record('2026-01-20', [
+        story('DOE Awards $2.7 Billion for Domestic Uranium Enrichment', 'https://energy.gov/uranium',
+              'Three companies will expand enrichment capacity for reactor fuel.'),
+        story('China Connects 1 GW Offshore Solar Plant', 'https://example.cn/solar',
+              'The open-sea project in Shandong feeds the grid.', section='CHINA', tags='Solar'),
+    ])
+    yield index
+    index.close()
+
+
+def titles(repeats):
+    return [item['title'] for _, item, _ in repeats]
+
+
+def test_repeats_by_url_and_by_similar_text(index):
+    found = build_digest.find_repeats(sections(
+        ('A new headline', 'http://www.energy.gov/uranium/', 'Unrelated words here.'),
+        ('DOE Awards $2.7 Billion for Domestic Uranium Enrichment Expansion', 'https://other.example/a',
+         'Three companies will expand enrichment capacity for reactor fuel.'),
+        ('Offshore wind auction draws record bids', 'https://example.com/wind', 'Nothing seen before.'),
+    ), index, '2026-01-21')
+    assert titles(found) == ['A new headline', 'DOE Awards $2.7 Billion for Domestic Uranium Enrichment Expansion']
+    assert found[0][2] == ('2026-01-20', 'DOE Awards $2.7 Billion for Domestic Uranium Enrichment', 'same URL')
+    assert found[1][2][2].endswith('similar')
+
+
+def test_only_earlier_digests_count(index):
+    assert build_digest.find_repeats(sections(('Solar', 'https://example.cn/solar', '')),
+                                     index, '2026-01-20') == []
+
+
+def test_search_by_term_tag_and_section(index):
+    assert [row[2] for row in build_digest.search_stories(index, ['enrichment'])] == \
+        ['DOE Awards $2.7 Billion for Domestic Uranium Enrichment']
+    assert [row[2] for row in build_digest.search_stories(index, tags=['solar'])] == \
+        ['China Connects 1 GW Offshore Solar Plant']
+    assert [row[1] for row in build_digest.search_stories(index, sections=['CHINA'])] == ['CHINA']
+    assert build_digest.search_stories(index, ['hydrogen']) == []
+
+
+def test_appended_lines_are_picked_up(index):
+    index.connect()
+    index.record('2026-01-21', [story('Grid operator warns of winter shortfall', 'https://example.com/grid')])
+    assert [row[0] for row in build_digest.search_stories(index, ['shortfall'])] == ['2026-01-21']
+
+
+def test_in_place_edit_rebuilds_the_lookup_copy(index):
+    index.connect()
+    text = index.path.read_text()
+    with open(index.path, 'r+') as f:   # same file, same size: only the content changed
+        f.write(text.replace('Offshore Solar', 'Open-Sea Solar'))
+    st = os.stat(index.path)
+    os.utime(index.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+    assert [row[2] for row in build_digest.search_stories(index, ['open', 'sea'])] == \
+        ['China Connects 1 GW Open-Sea Solar Plant']
+    assert build_digest.search_stories(index, ['offshore']) == []
@@ -0,0 +1,38 @@
+import io
+import re
+from pathlib import Path
+
+import pytest
+
+import build_digest
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 'render'
+
+
+@pytest.mark.parametrize('compact, expected', [
+    (False, 'test-content.html'),
+    (True, 'test-content.compact.html'),
+])
+def test_render_matches_previous_renderer(content_path, compact, expected):
+    out = io.StringIO()
+    build_digest.render_digest(build_digest.parse_content(content_path.read_text()), out,
+                               'Jan 21, 2026', compactor=build_digest.Compactor() if compact else None)
+    assert out.getvalue() == (FIXTURES / expected).read_text()
+
+
+def test_fragments_fill_slots_verbatim():
+    source = build_digest.TEMPLATE_PATH.read_text()
+    fragments = build_digest.templates()
+    for name, body in re.findall(r'<!-- fragment: (\w+) -->(.*?)<!-- /fragment -->', source, re.S):
+        slots = set(re.findall(r'\{\{(\w+)\}\}', body))
+        values = {slot: f'<{slot} & {{{{x}}}}>' for slot in slots}
+        expected = re.sub(r'\{\{(\w+)\}\}', lambda m: values[m.group(1)], body)
+        assert getattr(fragments, name)(**values) == expected
+
+
+def test_slot_names_are_never_evaluated(tmp_path):
+    path = tmp_path / 'fragments.html'
+    path.write_text('<!-- fragment: tag -->{{__import__}}:{{class}}<!-- /fragment -->')
+    compiled = build_digest.compile_template(path.read_text())
+    tag = build_digest.fragment_function('tag', compiled['tag'])
+    assert tag(**{'__import__': 'a', 'class': 'b'}) == 'a:b'